@@ -1,87 +1,124 @@
+from __future__ import annotations
+
 import datetime
 import os
-import pickle
+from dataclasses import dataclass
+
+import numpy as np
 
 from src.client.binance_client import BinanceClient
+from src.types.candle_store import CandleStore, migrate_pickle
 from src.types.candlesticks import Candlesticks
 from src.utils.utils import bruce_buffer, one_minute_as_epoch
 
 
 def run_back_test():
+    from src.back_test.sweep import parameter_grid, run_sweep  # sweep imports this module
+
     filename = f"back_test_output_{datetime.datetime.now().strftime('%d_%m_%y_%H_%M')}.txt"
     days_from = 699
     days_to = None
     duration = 699 - (days_to if days_to is not None else 0)
 
-    candles_in_day = 1440
+    day_as_epoch = 24 * 60 * one_minute_as_epoch
 
     candles = get_cache_and_add_to_candles(days=700)  # one time operation with caching
 
     print(f"Length: {len(candles)}")
-    candles.shorten(from_limit=(days_from * candles_in_day),
-                    to_limit=(days_to * candles_in_day) if days_to is not None else None)
+    end_of_history = candles.closeTime[-1] + 1
+    candles = candles.time_slice(start=end_of_history - days_from * day_as_epoch,
+                                 end=(end_of_history - days_to * day_as_epoch) if days_to is not None else None)
     print(f"Length: {len(candles)}")
     bruce_buffer()
 
     print(
         f"PNL for {duration} days starting {days_from} days ago"
         f" {f'ending {days_to} days ago ' if days_to is not None else ''}using different strategies:")
-    for i in range(2):
-        if i == 0:
-            units = "hours"
-        else:
-            units = "days"
-        for j in range(1, 12):
-            for k in range(2, 6):
-                buys = 0
-                sells = 0
-                short_window = j
-                long_window = short_window * k
-                df = candles.create_ma_crossover_dataframe(short_window, long_window, units=units)
-                PNL = None
-                last_pos = None
-                for index, row in df.iterrows():
-                    if row['Position'] == 1:
-                        if PNL is None:
-                            PNL = 0
-                        PNL -= row['Close']  # minus buys
-                        buys += 1
-                        last_pos = 'buy'
-                    elif row['Position'] == -1:
-                        if PNL is not None:
-                            PNL += row['Close']  # add the sells
-                            sells += 1
-                            last_pos = 'sell'
-                # end by selling at current value?
-                if last_pos is not None:
-                    if last_pos == 'buy':
-                        # fake sell
-                        last_row = df.iloc[-1]
-                        PNL += last_row['Close']  # add a final sell to sort PNL
-
-                output = f"Units={units}, Short={short_window}, Long={long_window}, Buys={buys}, Sells={sells}, PNL={PNL}"
-                print(output)
-                append_string_to_file(filename, output)
+    # results are keyed by the candles back tested so re-running an interrupted sweep resumes it
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    results_path = f"{current_dir}/sweep_results_{candles.openTime[0]}_{candles.openTime[-1]}.csv"
+    ranked_results = run_sweep(candles, parameter_grid(), results_path=results_path)
+
+    print(ranked_results.to_string())
+    append_string_to_file(filename, ranked_results.to_string())
+    return ranked_results
+
+
+@dataclass
+class BackTestResult:
+    units: str
+    short_window: int
+    long_window: int
+    buys: int
+    sells: int
+    pnl: float | None  # None when no buy signal was found
+    timeframe: str = "1m"
+
+    def __str__(self):
+        return f"Units={self.units}, Short={self.short_window}, Long={self.long_window}, " \
+               f"Buys={self.buys}, Sells={self.sells}, PNL={self.pnl}"
+
+
+def back_test_crossover(df, units, short_window, long_window, timeframe="1m") -> BackTestResult:
+    """
+    PnL of trading every MA crossover signal in the dataframe
+
+    - Begins with no position and only starts trading from the first buy signal
+    - Buys subtract the close price and sells add it
+    - Ends with a fake sell at the last close if the final trade was a buy
+
+    :param df: MA Crossover dataframe from Candlesticks.create_ma_crossover_dataframe
+    :param units: units of the windows in days or hours
+    :param short_window: Short window size
+    :param long_window: Long window size
+    :param timeframe: candle interval the dataframe was built from
+    :return: BackTestResult
+    """
+    position = df['Position'].to_numpy()
+    close = df['Close'].to_numpy()
+
+    is_buy = position == 1
+    if not is_buy.any():
+        return BackTestResult(units, short_window, long_window, 0, 0, None, timeframe)
+
+    # sells before the first buy are ignored as there is nothing to sell
+    first_buy = np.argmax(is_buy)
+    is_sell = position == -1
+    is_sell[:first_buy] = False
+
+    trades = np.flatnonzero(is_buy | is_sell)
+    signed_closes = np.where(is_buy[trades], -close[trades], close[trades])
+    # cumsum adds in trade order so the total is identical to accumulating trade by trade
+    pnl = np.cumsum(signed_closes)[-1]
+    if is_buy[trades[-1]]:
+        pnl += close[-1]  # fake sell at the last close to sort PNL
+
+    return BackTestResult(units, short_window, long_window, int(is_buy.sum()), int(is_sell.sum()), float(pnl),
+                          timeframe)
+
+
+def candle_history_store() -> CandleStore:
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    return CandleStore(f'{current_dir}/candlestick_history')
 
 
 def save_candle_history(candles: Candlesticks):
-    current_dir = os.path.dirname(os.path.realpath(__file__))
-    file_path = f'{current_dir}/candlestick_history.pkl'
-    with open(file_path, 'wb') as file:
-        pickle.dump(candles, file)
-    print(f"Saved candle history to: {file_path}. Length={len(candles)}")
+    candle_history_store().write(candles)
 
 
 def read_candle_history():
-    all_candle_history = Candlesticks()
-    try:
-        with open(f'candlestick_history.pkl', 'rb') as file:
-            all_candle_history = pickle.load(file)
-        print(f"Read candle history of length: {len(all_candle_history)}")
-        return all_candle_history
-    except FileNotFoundError:
+    store = candle_history_store()
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    pickle_path = f'{current_dir}/candlestick_history.pkl'
+    if len(store) == 0 and os.path.exists(pickle_path):
+        migrate_pickle(pickle_path, store)  # one time move from the old pickle cache
+
+    all_candle_history = store.read()
+    if all_candle_history is None:
         print("No history found, fetching now.")
         return None
+    print(f"Read candle history of length: {len(all_candle_history)}")
+    return all_candle_history
 
 
 def get_cache_and_add_to_candles(**kwargs):
@@ -131,9 +168,9 @@ def get_cache_and_add_to_candles(**kwargs):
             # fetch only the new candles to append to the history
             new_candles = client.get_klines(startTime=(history_end_open_time + one_minute_as_epoch))
             if len(new_candles) != 0:
-                all_candle_history.add(new_candles)
-                save_candle_history(all_candle_history)
-                return all_candle_history
+                store = candle_history_store()
+                store.append(new_candles)  # writes only the new candles
+                return store.read()
             else:
                 print("Candle history is already up to date. Case 2. (shouldn't really reach here)")
     else:
@@ -141,7 +178,7 @@ def get_cache_and_add_to_candles(**kwargs):
         START TIME BEFORE HISTORY SO FETCHING AND SAVING EVERYTHING FROM START TO NOW. 
         """
         print('* FETCHING NEW HISTORY *')
-        new_candle_history = client.get_klines(**kwargs)
+        new_candle_history = client.backfill_klines(**kwargs)  # pages fetched concurrently
         save_candle_history(new_candle_history)
         return new_candle_history
 
@@ -162,5 +199,5 @@ def temp_get_klines():
 
 
 if __name__ == '__main__':
-    # get_cache_and_add_to_candles(days=701)  # 1008 calls gathers all history which only needs to be executed once
+    # get_cache_and_add_to_candles(days=701)  # 1008 pages gathers all history which only needs to be executed once
     run_back_test()
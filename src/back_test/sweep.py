@@ -0,0 +1,158 @@
+"""
+Parallel parameter sweep of the MA crossover back test.
+
+The candle columns needed by the back test are copied once into shared memory, each worker process attaches to them
+in its initializer, and tasks only send the small SweepParameters. Finished results are appended to a CSV file as they
+complete so an interrupted sweep resumes where it left off.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, fields
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.back_test.back_test import BackTestResult, back_test_crossover
+from src.types.candlesticks import Candlesticks
+from src.utils.utils import timeframe_to_epoch
+
+SHARED_COLUMNS = ("openTime", "close", "closeTime")  # all the back test reads
+
+_worker_shared_memory = []  # keeps worker attachments alive for the life of the process
+_worker_candles = {}  # timeframe -> Candlesticks within a worker, reused so tasks share rolling mean caches
+
+
+@dataclass(frozen=True)
+class SweepParameters:
+    units: str
+    short_window: int
+    long_window: int
+    timeframe: str = "1m"
+
+
+def parameter_grid(short_windows=range(1, 12), multipliers=range(2, 6), units=("hours", "days"),
+                   timeframes=("1m",)) -> list[SweepParameters]:
+    """
+    Every combination of the inputs, long window = short window * multiplier
+
+    :param short_windows: Short window sizes
+    :param multipliers: Multipliers of the short window giving the long window
+    :param units: units of the windows in days or hours
+    :param timeframes: candle intervals to back test on, must be multiples of the source candles
+    :return: list of SweepParameters
+    """
+    return [SweepParameters(unit, short_window, short_window * multiplier, timeframe)
+            for unit in units
+            for short_window in short_windows
+            for multiplier in multipliers
+            for timeframe in timeframes]
+
+
+def run_sweep(candles: Candlesticks, grid, results_path=None, processes=None) -> pd.DataFrame:
+    """
+    Back test every parameter combination across all cores
+
+    :param candles: Candlesticks to back test against
+    :param grid: list of SweepParameters
+    :param results_path: CSV file results are appended to. Combinations already in it are not re-run
+    :param processes: Number of worker processes, defaults to the number of cores
+    :return: Ranked dataframe of results, best PnL first
+    """
+    requested = set(grid)
+    results = read_sweep_results(results_path)
+    completed = {SweepParameters(r.units, r.short_window, r.long_window, r.timeframe) for r in results}
+    pending = [parameters for parameters in grid if parameters not in completed]
+    print(f"Sweep: {len(grid)} combinations, {len(grid) - len(pending)} already complete")
+
+    if len(pending) > 0:
+        shared = [_share(getattr(candles, column)) for column in SHARED_COLUMNS]
+        try:
+            shared_columns = [(column, block.name, values.dtype.str)
+                              for column, (block, values) in zip(SHARED_COLUMNS, shared)]
+            with ProcessPoolExecutor(max_workers=processes, initializer=_attach_worker,
+                                     initargs=(shared_columns, len(candles), candles.candleTimeframe)) as pool:
+                futures = [pool.submit(_run_parameters, parameters) for parameters in pending]
+                for future in as_completed(futures):
+                    result = future.result()
+                    print(result)
+                    results.append(result)
+                    if results_path is not None:
+                        append_sweep_result(results_path, result)
+        finally:
+            for block, _ in shared:
+                block.close()
+                block.unlink()
+
+    return rank_results([result for result in results
+                         if SweepParameters(result.units, result.short_window, result.long_window,
+                                            result.timeframe) in requested])
+
+
+def rank_results(results) -> pd.DataFrame:
+    columns = [field.name for field in fields(BackTestResult)]
+    ranked = pd.DataFrame([asdict(result) for result in results], columns=columns)
+    ranked = ranked.sort_values('pnl', ascending=False, na_position='last', ignore_index=True)
+    ranked.index = ranked.index + 1
+    ranked.index.name = 'rank'
+    return ranked
+
+
+def read_sweep_results(results_path) -> list[BackTestResult]:
+    if results_path is None or not os.path.exists(results_path):
+        return []
+    df = pd.read_csv(results_path)
+    df['pnl'] = df['pnl'].astype(object).where(df['pnl'].notna(), None)
+    return [BackTestResult(**row) for row in df.to_dict('records')]
+
+
+def append_sweep_result(results_path, result: BackTestResult):
+    write_header = not os.path.exists(results_path)
+    with open(results_path, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=[field.name for field in fields(BackTestResult)])
+        if write_header:
+            writer.writeheader()
+        writer.writerow(asdict(result))
+
+
+def _share(values: np.ndarray):
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    shared_values = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+    shared_values[:] = values
+    return block, shared_values
+
+
+def _attach_worker(shared_columns, length, source_timeframe):
+    columns = {}
+    for column, name, dtype in shared_columns:
+        block = shared_memory.SharedMemory(name=name)
+        _worker_shared_memory.append(block)
+        columns[column] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+
+    candles = Candlesticks(**columns)  # no copy, the columns already have the Candlesticks dtypes
+    candles.candleTimeframe = source_timeframe
+    _worker_candles.clear()
+    _worker_candles[source_timeframe] = candles
+
+
+def _candles_for_timeframe(timeframe) -> Candlesticks:
+    """
+    Close prices of a longer timeframe are the closes of the source candles ending on its boundaries
+    """
+    if timeframe not in _worker_candles:
+        source = next(iter(_worker_candles.values()))
+        on_boundary = (source.closeTime + 1) % timeframe_to_epoch(timeframe) == 0
+        candles = Candlesticks(**{column: getattr(source, column)[on_boundary] for column in SHARED_COLUMNS})
+        candles.candleTimeframe = timeframe
+        _worker_candles[timeframe] = candles
+    return _worker_candles[timeframe]
+
+
+def _run_parameters(parameters: SweepParameters) -> BackTestResult:
+    candles = _candles_for_timeframe(parameters.timeframe)
+    df = candles.create_ma_crossover_dataframe(parameters.short_window, parameters.long_window, parameters.units)
+    return back_test_crossover(df, parameters.units, parameters.short_window, parameters.long_window,
+                               parameters.timeframe)
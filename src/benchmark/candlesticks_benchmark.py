@@ -0,0 +1,91 @@
+"""
+Memory and speed benchmark of the columnar Candlesticks against the previous layout of twelve Python lists of the raw
+strings Binance returns.
+
+Usage: python3 src/benchmark/candlesticks_benchmark.py [number_of_candles]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+root_path = str(Path(__file__).parent.parent.parent)
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+import numpy as np
+
+from src.types.candlesticks import Candlesticks
+from src.utils.utils import one_minute_as_epoch
+
+
+def generate_klines(length):
+    rng = np.random.default_rng(51)
+    close = 1500 + np.cumsum(rng.normal(0, 1, length))
+    open_time = 1_600_000_000_000 + np.arange(length) * one_minute_as_epoch
+    return [[int(open_time[i]), f"{close[i]:.8f}", f"{close[i] + 1:.8f}", f"{close[i] - 1:.8f}", f"{close[i]:.8f}",
+             "12.34560000", int(open_time[i]) + one_minute_as_epoch - 1, "18518.40000000", 250, "6.17280000",
+             "9259.20000000", "0"] for i in range(length)]
+
+
+def list_layout(klines):
+    """
+    The previous ingest: one Python list per field, holding the raw API values
+    """
+    columns = [[] for _ in Candlesticks.COLUMNS]
+    for kline in klines:
+        for column, value in zip(columns, kline):
+            column.append(value)
+    return columns
+
+
+def measure_memory(function, response):
+    """
+    Memory retained by a layout once the decoded API response has been released
+    """
+    tracemalloc.start()
+    klines = json.loads(response)
+    result = function(klines)
+    del klines
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
+
+
+def measure_time(function, klines):
+    start = time.perf_counter()
+    result = function(klines)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(length):
+    klines = generate_klines(length)
+    print(f"Candles: {length}")
+
+    response = json.dumps(klines)
+    from_klines = lambda raw: Candlesticks.from_klines(raw, "1m")
+
+    columns, list_ingest = measure_time(list_layout, klines)
+    candles, columnar_ingest = measure_time(from_klines, klines)
+    _, list_bytes = measure_memory(list_layout, response)
+    _, columnar_bytes = measure_memory(from_klines, response)
+
+    # every consumer of the list layout re-parsed the strings, e.g. utils.moving_average
+    start = time.perf_counter()
+    list_mean = sum(float(price) for price in columns[4]) / length
+    list_mean_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar_mean = candles.close.mean()
+    columnar_mean_time = time.perf_counter() - start
+
+    print(f"{'':<24}{'lists':>14}{'columnar':>14}")
+    print(f"{'ingest (s)':<24}{list_ingest:>14.4f}{columnar_ingest:>14.4f}")
+    print(f"{'retained memory (MB)':<24}{list_bytes / 1e6:>14.1f}{columnar_bytes / 1e6:>14.1f}")
+    print(f"{'mean close (s)':<24}{list_mean_time:>14.4f}{columnar_mean_time:>14.4f}")
+    assert abs(list_mean - columnar_mean) < 1e-6
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
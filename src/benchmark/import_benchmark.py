@@ -0,0 +1,59 @@
+"""
+Startup benchmark of the script entry points: the time to import each script, without running it, in a fresh
+interpreter, and which heavy dependencies the import loaded. Exits with 1 when a script is over its budget.
+
+Usage: python3 src/benchmark/import_benchmark.py [repeats]
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+root_path = str(Path(__file__).parent.parent.parent)
+
+# seconds each script may take to import, they are run by cron or restarted by hand so startup is paid every run
+BUDGETS = {
+    "src/price-tracker.py": 0.5,
+    "src/live/multi_symbol_scheduler.py": 0.5,
+    "src/live/live_ma_crossover_notifier.py": 0.5,
+    "src/back_test/back_test.py": 0.5,
+}
+
+HEAVY_MODULES = ["pandas", "matplotlib", "matplotlib.pyplot", "plotly", "slack_sdk"]
+
+# imports the script as python3 <script> would, but under another name so its main block is not run
+IMPORT_SCRIPT = """
+import json, runpy, sys, time
+script = sys.argv[1]
+sys.path[:0] = [sys.argv[2], sys.argv[3]]
+start = time.perf_counter()
+runpy.run_path(script, run_name="import_benchmark")
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [name for name in sys.argv[4:] if name in sys.modules]}))
+"""
+
+
+def measure_import(script):
+    script_path = Path(root_path) / script
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT, str(script_path), str(script_path.parent),
+                             root_path, *HEAVY_MODULES], cwd=root_path, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(repeats):
+    over_budget = []
+    print(f"{'script':<42}{'import (s)':>12}{'budget (s)':>12}  heavy modules loaded")
+    for script, budget in BUDGETS.items():
+        results = [measure_import(script) for _ in range(repeats)]
+        seconds = min(result["seconds"] for result in results)  # the least noisy of the runs
+        print(f"{script:<42}{seconds:>12.3f}{budget:>12.3f}  {', '.join(results[0]['loaded']) or '-'}")
+        if seconds > budget:
+            over_budget.append(script)
+
+    if over_budget:
+        print(f"Over the import budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
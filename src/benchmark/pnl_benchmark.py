@@ -0,0 +1,94 @@
+"""
+Speed benchmark of the columnar PnL sums of the TradeLedger against the previous position summary, which built a dict
+per trade with repeated float() calls, then a DataFrame of them to group by side.
+
+Usage: python3 src/benchmark/pnl_benchmark.py [number_of_trades]
+"""
+import sys
+import time
+from pathlib import Path
+
+root_path = str(Path(__file__).parent.parent.parent)
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+import numpy as np
+import pandas as pd
+
+from src.types.trade_ledger import TradeLedger
+
+
+def generate_trades(length, symbol="ETHGBP"):
+    rng = np.random.default_rng(22)
+    is_buyer = (np.arange(length) // 3) % 2 == 0
+    price = np.round(1500 + rng.normal(0, 50, length), 2)
+    qty = np.round(rng.uniform(0.01, 0.5, length), 4)
+    commission = np.round(np.where(is_buyer, qty * 0.001, qty * price * 0.001), 8)
+    return [{"symbol": symbol, "id": i, "price": f"{price[i]:.8f}", "qty": f"{qty[i]:.8f}",
+             "commission": f"{commission[i]:.8f}", "isBuyer": bool(is_buyer[i])} for i in range(length)]
+
+
+def per_trade_summary(trade_history, live_px, precision=8):
+    """
+    The previous position summary of one symbol, with DataFrame.append replaced by pd.concat
+    """
+    symbol_data = []
+    for trade_info in trade_history:
+        coin_data = {}
+        coin_data['Symbol'] = trade_info['symbol']
+        coin_data['live_px'] = live_px
+        if trade_info['isBuyer'] == True:
+            coin_data['Side'] = 'Buy'
+            coin_data['QTY'] = float(trade_info['qty']) - float(trade_info['commission'])
+            coin_data['WAP'] = float(trade_info['price']) * coin_data['QTY']
+            coin_data['PnL'] = ((live_px - float(trade_info['price'])) * float(coin_data['QTY'])) - float(
+                trade_info['commission']) * float(trade_info['price'])
+            coin_data['FEE'] = float(trade_info['commission']) * float(trade_info['price'])
+        else:
+            coin_data['Side'] = 'Sell'
+            coin_data['QTY'] = float(trade_info['qty']) * -1
+            coin_data['WAP'] = float(trade_info['price']) * coin_data['QTY']
+            coin_data['PnL'] = ((live_px - float(trade_info['price'])) * float(coin_data['QTY'])) - float(
+                trade_info['commission'])
+            coin_data['FEE'] = float(trade_info['commission'])
+        symbol_data.append(coin_data)
+    symbol = trade_history[0]['symbol']
+    symbol_data = pd.DataFrame(symbol_data)
+    symbol_data = symbol_data.groupby(['Symbol', 'Side']).sum()
+    symbol_data['WAP'] = abs(symbol_data['WAP'] / symbol_data['QTY'])
+    symbol_data.reset_index(inplace=True)
+    symbol_data = symbol_data[['Symbol', 'Side', 'QTY', 'WAP', 'FEE', 'PnL']]
+    symbol_data[['QTY', 'WAP', 'FEE', 'PnL']] = (
+        symbol_data[['QTY', 'WAP', 'FEE', 'PnL']].astype(float)).round(precision)
+    total_df = pd.DataFrame([symbol, 'Total', round(symbol_data.QTY.sum(), precision), np.nan,
+                             round(symbol_data.FEE.sum(), precision),
+                             round(symbol_data.PnL.sum(), precision)], index=symbol_data.columns).T
+    return pd.concat([symbol_data, total_df], ignore_index=True)
+
+
+def columnar_summary(trade_history, live_px, precision=8):
+    ledger = TradeLedger()
+    ledger.add_trades(trade_history[0]['symbol'], trade_history)
+    return ledger.summary(trade_history[0]['symbol'], live_px, precision)
+
+
+def measure_time(function, trades, live_px):
+    start = time.perf_counter()
+    result = function(trades, live_px)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(lengths):
+    live_px = 1523.45
+    print(f"{'trades':<12}{'per trade (s)':>16}{'columnar (s)':>16}{'speedup':>10}")
+    for length in lengths:
+        trades = generate_trades(length)
+        expected, per_trade_time = measure_time(per_trade_summary, trades, live_px)
+        actual, columnar_time = measure_time(columnar_summary, trades, live_px)
+        print(f"{length:<12}{per_trade_time:>16.4f}{columnar_time:>16.4f}{per_trade_time / columnar_time:>9.1f}x")
+        pd.testing.assert_frame_equal(actual, expected.infer_objects(), check_dtype=False, rtol=1e-9)
+
+
+if __name__ == "__main__":
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    run_benchmark(sorted({length for length in [1_000, 10_000, 100_000] if length < largest} | {largest}))
@@ -0,0 +1,40 @@
+import asyncio
+import functools
+
+from src.client.binance_client import BinanceClient
+
+
+class AsyncBinanceClient:
+    """
+    Awaitable surface of BinanceClient so independent requests (balances, open orders, trade history, ticker) can be
+    issued concurrently with asyncio.gather, taking roughly as long as the slowest call rather than their sum.
+
+    Every BinanceClient method is available under the same name and runs on a worker thread, sharing the wrapped
+    client's pooled session and request weight limiter.
+    e.g. balance, orders = await asyncio.gather(client.account_balance_by_symbol("ETH"), client.show_open_orders())
+    """
+
+    def __init__(self, client: BinanceClient = None, **kwargs):
+        """
+        :param client: BinanceClient to wrap, otherwise one is created from kwargs e.g. test=False
+        """
+        self.client = client if client is not None else BinanceClient(**kwargs)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attribute, *args, **kwargs)
+
+        return call
+
+    async def snapshot(self):
+        """
+        Position summary and open orders requested concurrently
+
+        :return: (position summary DataFrame, open orders DataFrame)
+        """
+        return await asyncio.gather(self.position_summary(), self.show_open_orders())
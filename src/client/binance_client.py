@@ -1,27 +1,42 @@
+from __future__ import annotations
+
 import datetime
 import datetime as dt
+import hashlib
 import json
 import os
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
 from binance.error import ClientError
 from binance.spot import Spot
-from pandas import DataFrame
 
-from src.notify import notifier, slack_image_upload
+from src.client.rate_limiter import RequestWeightLimiter
+from src.client.session import InstrumentedHTTPAdapter
+from src.notify import notifier
+from src.notify.report_renderer import MarkdownReportRenderer
 from src.types.candlesticks import Candlesticks
-from src.utils.utils import Side, epoch_to_date, create_image_from_dataframe, OrderType, add_spacing, PositionType, \
-    round_down_to_decimal_place, one_minute_as_epoch
+from src.types.symbol_filters import SymbolFilterTable, SymbolFilters
+from src.types.trade_ledger import TradeLedger
+from src.utils.utils import Side, epoch_to_date, OrderType, add_spacing, PositionType, \
+    one_minute_as_epoch, timeframe_to_epoch
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 
 class BinanceClient:
-    PRECISION = 8  # from exchange_info ETH PRECISION is 8 for test and prod
-    TICK_SIZE = 0.01  # from exchange_info symbol filterType PRICE_FILTER
-    MIN_PRICE = 0.01
+    PRECISION = 8  # decimal places quantities and prices are displayed to
+    KLINES_LIMIT = 1000  # max candles per klines request
+    MY_TRADES_LIMIT = 1000  # max trades per my_trades request
+    TIMEOUT = 10  # seconds waiting for a response from Binance
+    ACCOUNT_CACHE_TTL = 5  # seconds an account snapshot is reused, about one decision cycle
+    LEDGER_TOLERANCE = 0.001  # quantity the trade ledger may differ from the balance by e.g. dust converted to BNB
 
     def __init__(self, **kwargs):
         if "test" in kwargs:
@@ -31,6 +46,12 @@ class BinanceClient:
 
         self.test = test  # allow usage globally
 
+        # trading pair for account, order and position calls
+        self.symbol = kwargs.get("symbol", "ETHUSDT" if test else "ETHGBP")
+        self._base_asset = kwargs.get("base_asset")  # overrides the base asset of the symbol's filters
+        # market data defaults to ETHUSDT as Binance removed the ETHGBP klines
+        self.kline_symbol = kwargs.get("symbol", "ETHUSDT")
+
         if test:
             key_path = os.path.dirname(__file__) + "/../keys/testnet-keys.json"
             base_url = "https://testnet.binance.vision"
@@ -43,9 +64,85 @@ class BinanceClient:
             API_KEY = keys["API_KEY"]
             API_SECRET = keys["API_SECRET"]
 
-        self.client = Spot(key=API_KEY, secret=API_SECRET, base_url=base_url)
+        self.client = Spot(key=API_KEY, secret=API_SECRET, base_url=base_url, timeout=self.TIMEOUT)
+        self.limiter = RequestWeightLimiter()
+        self.client.session.hooks["response"].append(self.limiter.response_hook)
+        # one pooled keep-alive session for the life of this client
+        self.session_adapter = InstrumentedHTTPAdapter()
+        self.client.session.mount("https://", self.session_adapter)
+        self.client.session.mount("http://", self.session_adapter)
+        # account snapshot shared by the balance lookups of one decision cycle
+        self._account_lock = threading.Lock()
+        self._account_snapshot = None
+        self._account_snapshot_time = 0.0
+        self.account_cache_hits = 0
+        self.account_cache_misses = 0
+        # price and quantity rules of every symbol, cached on disk per environment
+        filters_path = os.path.dirname(__file__) + f"/exchange_info_cache/{'test' if test else 'prod'}-filters.json"
+        self.symbol_filters = SymbolFilterTable(lambda: self.request("exchange_info"), cache_path=filters_path)
+        # running position and PnL aggregates of the account trades, synced incrementally. Kept per API key, as
+        # trades of another account (or of a reset testnet account) must never be added to it
+        account_id = hashlib.sha256(API_KEY.encode()).hexdigest()[:16]
+        self.trade_ledger = TradeLedger(
+            os.path.dirname(__file__) + f"/trade_ledger/{'test' if test else 'prod'}-{account_id}.json")
+        self._rebuilt_ledgers = set()  # symbols whose ledger was rebuilt by verify_trade_ledger
+        # open orders and PnL reports are sent as text unless another renderer is given e.g. ImageReportRenderer()
+        self.report_renderer = kwargs.get("report_renderer", MarkdownReportRenderer())
         print(f"Initialised BinanceClient with test mode: {test}")
 
+    def request(self, endpoint, *args, **kwargs):
+        """
+        Every Binance API call goes through here to stay within request weight limits and retry transient errors.
+        Calls to order endpoints also invalidate the cached account snapshot.
+
+        :param endpoint: Spot method name e.g. klines
+        :return: Response from Binance API
+        """
+        try:
+            return self.limiter.call(endpoint, getattr(self.client, endpoint), *args, **kwargs)
+        finally:
+            if endpoint in self.limiter.ORDER_ENDPOINTS:
+                self.invalidate_account_cache()  # balances change when orders are placed or cancelled, even on error
+
+    def _account_info(self):
+        """
+        Account information (balances etc.) reused for ACCOUNT_CACHE_TTL seconds, so one decision cycle costs one
+        account request. Invalidated whenever an order is placed or cancelled.
+
+        :return: Response from Binance account endpoint
+        """
+        with self._account_lock:
+            if self._account_snapshot is not None and \
+                    time.monotonic() - self._account_snapshot_time < self.ACCOUNT_CACHE_TTL:
+                self.account_cache_hits += 1
+                return self._account_snapshot
+            self.account_cache_misses += 1
+            self._account_snapshot = self.request("account", recvWindow=60000)  # TODO time sync and lower recvWindow
+            self._account_snapshot_time = time.monotonic()
+            return self._account_snapshot
+
+    def invalidate_account_cache(self):
+        with self._account_lock:
+            self._account_snapshot = None
+
+    def account_cache_stats(self) -> dict:
+        """
+        :return: dict of account cache hits and misses
+        """
+        return {"hits": self.account_cache_hits, "misses": self.account_cache_misses}
+
+    def connection_stats(self) -> dict:
+        """
+        Connection reuse counts and per endpoint latency of this client's session
+
+        :return: dict of stats, see InstrumentedHTTPAdapter.stats
+        """
+        stats = self.session_adapter.stats()
+        print(add_spacing(f"Binance session: {stats['requests']} requests, "
+                          f"{stats['new_connections']} new connections, "
+                          f"{stats['reused_connections']} reused. Latency (ms): {stats['latency_ms']}"))
+        return stats
+
     """
     MISC
     """
@@ -55,16 +152,34 @@ class BinanceClient:
         Current exchange trading rules and symbol information
         :return: Large dictionary of exchange information
         """
-        exchange_info = self.client.exchange_info()
+        exchange_info = self.request("exchange_info")
         return exchange_info
 
+    def filters(self, symbol=None) -> SymbolFilters:
+        """
+        Price and quantity rules for a symbol, from the cached exchange information
+
+        :param symbol: Symbol, defaults to the symbol of this client
+        :return: SymbolFilters
+        """
+        return self.symbol_filters.get(self.symbol if symbol is None else symbol)
+
+    @property
+    def base_asset(self) -> str:
+        """
+        Asset held once bought e.g. ETH for ETHGBP, from the symbol's filters unless base_asset was given
+        """
+        if self._base_asset is None:
+            self._base_asset = self.filters(self.symbol).base_asset
+        return self._base_asset
+
     """
     ACCOUNT INFORMATION
     """
 
     def all_account_info(self):
         print("Account Info")
-        acc_info = self.client.account(recvWindow=60000)  # TODO time sync and lower recvWindow
+        acc_info = self._account_info()
         for i in acc_info:
             if i == 'balances':
                 print("balance:")
@@ -73,14 +188,16 @@ class BinanceClient:
             else:
                 print(f"{i}: {acc_info[i]}")
 
-    def account_balance_by_symbol(self, symbol="ETH", include_locked=False) -> float:
+    def account_balance_by_symbol(self, symbol=None, include_locked=False) -> float:
         """
 
         :param include_locked: Include 'locked' balance such as current STOP order values
         :param symbol: Symbol (Note in account balance, the raw crypto symbol is used e.g. ETH not ETHGBP)
         :return: float for account balance of input symbol
         """
-        account_info = self.client.account(recvWindow=60000)
+        if symbol is None:
+            symbol = self.base_asset
+        account_info = self._account_info()
         for key, value in account_info.items():
             if key == 'balances':
                 for balance in value:
@@ -106,7 +223,7 @@ class BinanceClient:
         :return: PositionType (bought OR sold)
         """
         if symbol is None:
-            symbol = "ETH"
+            symbol = self.base_asset
         threshold = 0.00076  # £1 buys this much ETH
         return PositionType.sold if self.account_balance_by_symbol(symbol,
                                                                    include_locked) < threshold else PositionType.bought
@@ -115,8 +232,9 @@ class BinanceClient:
     POSITION/PNL INFORMATION
     """
 
-    def get_open_order_ids(self, order_type_filter=None, save_image=True) -> DataFrame:
-        open_orders = self.show_open_orders(order_type_filter=order_type_filter, save_image=save_image)
+    def get_open_order_ids(self, order_type_filter=None) -> DataFrame:
+        # only the IDs are needed, so nothing is rendered or sent to Slack
+        open_orders = self.show_open_orders(order_type_filter=order_type_filter, report=False)
 
         if len(open_orders) == 0:
             open_order_ids = []
@@ -127,12 +245,19 @@ class BinanceClient:
         print(open_order_ids)
         return open_order_ids
 
-    def show_open_orders(self, order_type_filter=None, save_image=True) -> DataFrame:
+    def show_open_orders(self, order_type_filter=None, report=True, renderer=None) -> DataFrame:
+        """
+        :param order_type_filter: OrderType to show, None for every open order
+        :param report: Render the orders with the renderer, and send them to Slack in the prod env
+        :param renderer: Report renderer, defaults to the client's report_renderer
+        :return: Dataframe of the open orders indexed by symbol
+        """
+        import pandas as pd
 
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+        symbol = self.symbol
 
         try:
-            response = self.client.get_open_orders(symbol, recvWindow=60000)
+            response = self.request("get_open_orders", symbol, recvWindow=60000)
             if len(response) == 0:
                 print(f"No live orders were found. Environment Test={self.test}, OrderTypeFilter={order_type_filter}")
                 return pd.DataFrame([])
@@ -173,15 +298,10 @@ class BinanceClient:
 
             open_orders.set_index('Symbol', inplace=True)
 
-            current_dir = os.path.dirname(os.path.realpath(__file__))
-            open_orders_path = f"{current_dir}/../live/current_open_orders_snapshot.png"
-
             print(open_orders)
-            if save_image:
-                create_image_from_dataframe(open_orders, open_orders_path, "Open Orders")
-            if not self.test:
-                slack_image_upload.upload_image(open_orders_path, "PnL", f"Number of Open Orders: {len(response)}",
-                                                "prod-data")
+            if report:
+                self._report(renderer, open_orders, "open_orders", "Open Orders",
+                             f"Number of Open Orders: {len(response)}")
             return open_orders
 
         except ClientError as error:
@@ -191,6 +311,17 @@ class BinanceClient:
                 )
             )
 
+    def _report(self, renderer, df, name, title, comment):
+        """
+        Renders a report table, and sends it to Slack in the prod env
+        """
+        if renderer is None:
+            renderer = self.report_renderer
+        if self.test:
+            renderer.render(df, name, title)
+        else:
+            renderer.publish(df, name, title, comment, "prod-data")
+
     def get_market_position(self, symbol=None):
         """
 
@@ -199,19 +330,12 @@ class BinanceClient:
         :return: float of position
         """
         if symbol is None:
-            symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+            symbol = self.symbol
 
-        qty = 0
         try:
-            trade_history = self.client.my_trades(symbol=symbol, recvWindow=60000)
-            if len(trade_history) == 0:
-                print(add_spacing(f"Current qty: {0}"))
-                return 0
-
-            for trade_info in trade_history:
-                trade_qty = float(trade_info['qty']) if trade_info['isBuyer'] == True else float(trade_info['qty']) * -1
-                qty += round(trade_qty, self.PRECISION)
-            rounded_qty = round(qty, self.PRECISION)
+            self.sync_trades(symbol)
+            self.verify_trade_ledger(symbol)
+            rounded_qty = self.trade_ledger.net_quantity(symbol, self.PRECISION)
             print(add_spacing(f"Current qty: {rounded_qty}"))
             return rounded_qty
 
@@ -222,6 +346,59 @@ class BinanceClient:
                 )
             )
 
+    def sync_trades(self, symbol=None, rebuild=False) -> int:
+        """
+        Adds the trades made since the last sync to the trade ledger, paging through my_trades by trade ID
+
+        :param symbol: Symbol, defaults to the symbol of this client
+        :param rebuild: Forget the ledger of the symbol and add every trade again, from the first trade
+        :return: Number of new trades
+        """
+        if symbol is None:
+            symbol = self.symbol
+
+        if rebuild:
+            self.trade_ledger.reset(symbol)
+        new_trades = 0
+        while True:
+            last_trade_id = self.trade_ledger.last_trade_id(symbol)
+            from_id = 0 if last_trade_id is None else last_trade_id + 1  # fromId=0 starts from the first trade
+            trades = self.request("my_trades", symbol=symbol, fromId=from_id, limit=self.MY_TRADES_LIMIT,
+                                   recvWindow=60000)
+            new_trades += self.trade_ledger.add_trades(symbol, trades)
+            if len(trades) < self.MY_TRADES_LIMIT:
+                break
+        if new_trades > 0 or rebuild:
+            self.trade_ledger.save()
+        return new_trades
+
+    def verify_trade_ledger(self, symbol=None) -> bool:
+        """
+        Checks the quantity the trade ledger holds against the account balance, and rebuilds the ledger from the first
+        trade when they differ by more than LEDGER_TOLERANCE e.g. after the testnet account was reset.
+        Deposits and withdrawals also move the balance, so a symbol is rebuilt at most once per client.
+
+        :param symbol: Symbol, defaults to the symbol of this client
+        :return: True if the ledger matches the balance
+        """
+        if symbol is None:
+            symbol = self.symbol
+        base_asset = self.base_asset if symbol == self.symbol else self.filters(symbol).base_asset
+
+        held_qty = self.trade_ledger.held_quantity(symbol, self.PRECISION)
+        balance = self.account_balance_by_symbol(base_asset, include_locked=True)
+        if abs(held_qty - balance) <= self.LEDGER_TOLERANCE:
+            return True
+        if symbol in self._rebuilt_ledgers:
+            print(add_spacing(f"Trade ledger of {symbol} holds {held_qty} {base_asset} but the balance is {balance}"))
+            return False
+
+        print(add_spacing(f"Trade ledger of {symbol} holds {held_qty} {base_asset} but the balance is {balance}, "
+                          f"rebuilding it from the first trade"))
+        self._rebuilt_ledgers.add(symbol)
+        self.sync_trades(symbol, rebuild=True)
+        return self.verify_trade_ledger(symbol)
+
     def get_market_position_type(self, symbol=None) -> PositionType:
         """
         Return PositionType meaning are we currently in a state of BOUGHT or SOLD our holdings
@@ -232,88 +409,43 @@ class BinanceClient:
         threshold = 0.00076  # £1 buys this much ETH
         return PositionType.sold if self.get_market_position(symbol) < threshold else PositionType.bought
 
-    def position_summary(self, symbol_list=None) -> pd.DataFrame:
+    def position_summary(self, symbol_list=None, renderer=None) -> DataFrame:
         """
 
         Function to return the position and PnL of each coin holding
 
         :param symbol_list: list of coins that you want included in the report
+        :param renderer: Report renderer, defaults to the client's report_renderer
         :return: Dataframe showing the coins in the index and pnl in the columns. DF will include WAP.
         """
 
         if symbol_list is None:
-            symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+            symbol = self.symbol
             symbol_list = [symbol]
 
         if len(symbol_list) == 0:
             raise Exception("No input symbols found. Please provide no parameter or at least one symbol.")
 
+        import pandas as pd
+
         total_df = None
         try:
             pnl_df = []
             for symbol in symbol_list:
-                trade_history = self.client.my_trades(symbol=symbol)
-                live_px = float(self.client.ticker_price(symbol=symbol)['price'])
-                symbol_data = []
-                test_df = pd.DataFrame(trade_history)
-                for trade_info in trade_history:
-                    coin_data = {}
-                    coin_data['Symbol'] = trade_info['symbol']
-                    coin_data['FEE'] = float(
-                        trade_info['commission'])  # Commision for sells are in GBP and Coin for Buys
-                    coin_data['live_px'] = live_px
-                    coin_data['trade_price'] = trade_info['price']
-
-                    if trade_info['isBuyer'] == True:  # Trade is a buy
-                        coin_data['Side'] = 'Buy'
-                        coin_data['QTY'] = float(trade_info['qty']) - float(
-                            trade_info['commission'])  # Remove commission from buy
-                        coin_data['WAP'] = float(trade_info['price']) * coin_data[
-                            'QTY']  # Create weight for working out the weighted average buy price
-                        coin_data['PnL'] = ((live_px - float(trade_info['price'])) * float(coin_data['QTY'])) - float(
-                            trade_info['commission']) * float(trade_info['price'])
-                        coin_data['FEE'] = float(trade_info['commission']) * float(
-                            trade_info['price'])  # Commision for sells are in GBP and Coin for Buys
-                        # Don't include the commission as it's already removed from the qty
-
-                    else:  # Trade is a Sell
-                        coin_data['Side'] = 'Sell'
-                        coin_data['QTY'] = float(trade_info['qty']) * -1  # if a sell make the qty negative
-                        coin_data['WAP'] = float(trade_info['price']) * coin_data[
-                            'QTY']  # Create weight for working out the weighted average buy price
-                        coin_data['PnL'] = ((live_px - float(trade_info['price'])) * float(coin_data['QTY'])) - float(
-                            trade_info['commission'])  # Sub the commission as it's a GBP cost
-                        coin_data['FEE'] = float(
-                            trade_info['commission'])  # Commision for sells are in GBP and Coin for Buys
-
-                    symbol_data.append(coin_data)
-                symbol_data = pd.DataFrame(symbol_data)
-                symbol_data = symbol_data.groupby(['Symbol', 'Side']).sum()
-                symbol_data['WAP'] = abs(symbol_data['WAP'] / symbol_data['QTY'])
-                symbol_data.reset_index(inplace=True)
-                symbol_data = symbol_data[['Symbol', 'Side', 'QTY', 'WAP', 'FEE', 'PnL']]
-                symbol_data[['QTY', 'WAP', 'FEE', 'PnL']] = (
-                    symbol_data[['QTY', 'WAP', 'FEE', 'PnL']].astype(float)).round(self.PRECISION)
-                total_df = pd.DataFrame([symbol, 'Total', round(symbol_data.QTY.sum(), self.PRECISION), np.nan,
-                                         round(symbol_data.FEE.sum(), self.PRECISION),
-                                         round(symbol_data.PnL.sum(), self.PRECISION)], index=symbol_data.columns).T
-                symbol_data = symbol_data.append(total_df)
+                self.sync_trades(symbol)  # only the trades since the last summary are requested
+                live_px = float(self.request("ticker_price", symbol=symbol)['price'])
+                symbol_data = self.trade_ledger.summary(symbol, live_px, self.PRECISION)
+                total_df = symbol_data.iloc[[-1]].reset_index(drop=True)
                 pnl_df.append(symbol_data)
 
             pnl_df = pd.concat(pnl_df, axis=1)
             pnl_df.set_index('Symbol', inplace=True)
             pnl_df = pnl_df.replace(np.nan, "-")
 
-            current_dir = os.path.dirname(os.path.realpath(__file__))
-            pnl_snapshot_path = f"{current_dir}/../live/current_pnl_snapshot.png"
-            create_image_from_dataframe(pnl_df, pnl_snapshot_path, f"PnL Summary - ETH Price: {live_px}")
-
             print(pnl_df)
-            if not self.test:
-                slack_image_upload.upload_image(pnl_snapshot_path, "PnL",
-                                                f"PnL Tables - PnL: {round(total_df.loc[0, 'PnL'], self.PRECISION)} "
-                                                f"Qty: {round(total_df.loc[0, 'QTY'], self.PRECISION)}",
-                                                "prod-data")
+            self._report(renderer, pnl_df, "pnl", f"PnL Summary - ETH Price: {live_px}",
+                         f"PnL Tables - PnL: {round(total_df.loc[0, 'PnL'], self.PRECISION)} "
+                         f"Qty: {round(total_df.loc[0, 'QTY'], self.PRECISION)}")
             return pnl_df
 
 
@@ -333,9 +465,9 @@ class BinanceClient:
             raise Exception("This function is not supported in test environment")
 
         if symbol is None:
-            symbol = "ETHGBP"  # only ETH supported for now
+            symbol = self.symbol
 
-        coin_info = self.client.coin_info()
+        coin_info = self.request("coin_info")
         for coin in coin_info:
             if coin["coin"] == symbol:
                 print(add_spacing(f"{symbol} balance: {coin['free']}"))
@@ -344,20 +476,23 @@ class BinanceClient:
 
     def avg_price(self, symbol=None) -> float:
         if symbol is None:
-            symbol = "ETHUSDT"  # only ETH supported for now
-        avg_price_response = self.client.avg_price(symbol)
+            symbol = self.kline_symbol
+        avg_price_response = self.request("avg_price", symbol)
         avg_price = float(avg_price_response["price"])
         print(f"Average price now: {avg_price}")
         return avg_price  # does not need rounding as it's straight from Binance
 
-    def ticker_price(self, symbol="ETHUSDT"):
-        print(self.client.ticker_price(symbol=symbol))
+    def ticker_price(self, symbol=None):
+        if symbol is None:
+            symbol = self.kline_symbol
+        print(self.request("ticker_price", symbol=symbol))
 
-    def get_klines(self, timeframe="1m", **kwargs) -> Candlesticks:
+    def get_klines(self, timeframe="1m", symbol=None, **kwargs) -> Candlesticks:
         """
         This is the main marketplace data return function
 
         :param timeframe: the interval of candlestick, e.g 1s, 1m, 5m, 1h, 1d, etc.
+        :param symbol: Symbol, defaults to the market data symbol of this client
         :param kwargs: period of time to begin candles from time now minus,  e.g days=1, hours=0, weeks=0, minutes=0
         :return: Candlesticks object. Containing list of candles.
         """
@@ -367,67 +502,82 @@ class BinanceClient:
         else:
             startTime = (datetime.datetime.now() - datetime.timedelta(**kwargs)).timestamp() * 1000
 
-        symbol = "ETHUSDT"  # TODO - Binance removed ETHGBP trade pair, needs reflecting throughout codebase
+        if symbol is None:
+            symbol = self.kline_symbol
 
         gathered_all_klines = False
-        all_candles = Candlesticks()
-        all_candles.candleTimeframe = timeframe
+        all_klines = []
 
         call_count = 1
         while not gathered_all_klines:
             print(f"Candle API call count: {call_count}")
             call_count += 1
 
-            attempts = 1
-            max_attempts = 5
-            while True:
-                try:
-                    klines = self.client.klines(interval=timeframe,
-                                                limit=1000,
-                                                symbol=symbol,
-                                                startTime=int(startTime),
-                                                endTime=int(timeNow))
-                    break
-                except Exception as e:
-                    print("get_klines_exception")
-                    if attempts >= max_attempts:
-                        raise Exception(f"Binance client failed 5 times to get klines. Connection Error: {e}")
-                    print(
-                        f"Caught connection error which could be down to flakiness. Attempts: {attempts}. \n"
-                        f"Retrying {max_attempts - attempts} more times. Error: {e}"
-                    )
-                    time.sleep(12)
-                attempts += 1
-
-            for kline in klines:
-                all_candles.openTime.append(kline[0])
-                all_candles.open.append(kline[1])
-                all_candles.high.append(kline[2])
-                all_candles.low.append(kline[3])
-                all_candles.close.append(kline[4])
-                all_candles.volume.append(kline[5])
-                all_candles.closeTime.append(kline[6])
-                all_candles.quoteAssetVolume.append(kline[7])
-                all_candles.numberOfTrades.append(kline[8])
-                all_candles.takerBuyBaseAssetVolume.append(kline[9])
-                all_candles.takerBuyQuoteAssetVolume.append(kline[10])
-                all_candles.ignore.append(kline[11])
+            klines = self._klines_page(symbol, timeframe, startTime, timeNow)
+            all_klines += klines
 
             # check if API response limit met
-            if len(klines) < 1000:
+            if len(klines) < self.KLINES_LIMIT:
                 gathered_all_klines = True
             else:
                 # TODO - CHECK THIS OPEN VALUE IS CORRECT (we may have duplicates)
-                startTime = all_candles.openTime[-1] + one_minute_as_epoch  # start from the next required candle time
-        return all_candles
+                startTime = all_klines[-1][0] + one_minute_as_epoch  # start from the next required candle time
+        return Candlesticks.from_klines(all_klines, timeframe)  # parse once all pages are gathered
+
+    def backfill_klines(self, timeframe="1m", workers=4, symbol=None, **kwargs) -> Candlesticks:
+        """
+        Concurrent version of get_klines for large histories.
+        The time range is split into pages of 1000 candles up front, which are fetched by a bounded pool of workers
+        within the request weight limit, then reassembled in order with any overlapping candles removed.
+
+        :param timeframe: the interval of candlestick, e.g 1s, 1m, 5m, 1h, 1d, etc.
+        :param workers: Maximum number of concurrent requests
+        :param symbol: Symbol, defaults to the market data symbol of this client
+        :param kwargs: period of time to begin candles from time now minus,  e.g days=1, hours=0, weeks=0, minutes=0
+        :return: Candlesticks object. Containing list of candles.
+        """
+        timeNow = int(datetime.datetime.now().timestamp() * 1000)
+        if "startTime" in kwargs:
+            startTime = int(kwargs['startTime'])  # must be epoch with milliseconds
+        else:
+            startTime = int((datetime.datetime.now() - datetime.timedelta(**kwargs)).timestamp() * 1000)
+
+        if symbol is None:
+            symbol = self.kline_symbol
+
+        page_span = self.KLINES_LIMIT * timeframe_to_epoch(timeframe)
+        pages = [(page_start, min(page_start + page_span, timeNow) - 1)
+                 for page_start in range(startTime, timeNow, page_span)]
+        print(f"Backfilling {len(pages)} pages of {timeframe} candles with {workers} workers")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pages_klines = pool.map(lambda page: self._klines_page(symbol, timeframe, *page), pages)  # keeps order
+            all_klines = [kline for klines in pages_klines for kline in klines]
+
+        all_candles = Candlesticks.from_klines(all_klines, timeframe)
+        _, first_of_each_open_time = np.unique(all_candles.openTime, return_index=True)  # sorted and deduplicated
+        if len(first_of_each_open_time) == len(all_candles):
+            return all_candles
+        candles = Candlesticks(**{column: values[first_of_each_open_time]
+                                  for column, values in all_candles.columns().items()})
+        candles.candleTimeframe = timeframe
+        return candles
+
+    def _klines_page(self, symbol, timeframe, startTime, endTime):
+        return self.request("klines",
+                             interval=timeframe,
+                             limit=self.KLINES_LIMIT,
+                             symbol=symbol,
+                             startTime=int(startTime),
+                             endTime=int(endTime))
 
     def ticker_24h(self):
         """
-        24hr Ticker Price Change Statistics for symbol (for now only ETH)
+        24hr Ticker Price Change Statistics for the symbol of this client
         :return: 24hour rolling window price change statistics.
         """
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
-        return self.client.ticker_24hr(symbol)
+        symbol = self.symbol
+        return self.request("ticker_24hr", symbol)
 
     """
     TRADE FUNCTIONS
@@ -435,19 +585,23 @@ class BinanceClient:
 
     def market_order(self, side: Side, qty: float, symbol=None):
         if symbol is None:
-            symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+            symbol = self.symbol
 
         if not isinstance(side, Side):
             raise TypeError('Side must be Equal to BUY or SELL')
 
-        qty = round_down_to_decimal_place(qty, 4)  # adhere to LOT_SIZE
+        filters = self.filters(symbol)
+        if side == side.buy:
+            qty = filters.round_quote_quantity(qty)  # spend in the quote asset
+        else:
+            qty = filters.round_quantity(qty)  # adhere to LOT_SIZE
 
         if side == side.buy:
             # allows you to BUY as many ETH as 'qty' of GBP will allow
-            additional_param = {"quoteOrderQty": str(qty)}
+            additional_param = {"quoteOrderQty": filters.format_quote_quantity(qty)}
         else:
             # specify the quantity of ETH you want to SELL
-            additional_param = {"quantity": str(qty)}
+            additional_param = {"quantity": filters.format_quantity(qty)}
 
         params = {
             "symbol": symbol,
@@ -461,7 +615,7 @@ class BinanceClient:
         print(f"Order to {side.value}  ({str(qty)} {symbol}):")
 
         try:
-            response = self.client.new_order(**params)
+            response = self.request("new_order", **params)
             fills = response['fills']
             qty, wap = self.get_qty_and_wap_from_fills(fills)
             order_message = f"{side.value} order filled. " \
@@ -497,9 +651,11 @@ class BinanceClient:
         if not self.test:
             raise Exception("This function is currently not enabled for production - no use case for stops")
 
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+        symbol = self.symbol
+        filters = self.filters(symbol)
 
-        quantity = str(1)  # TODO when using limits make this
+        quantity = filters.format_quantity(1)  # TODO when using limits make this
+        price = filters.format_price(price)  # adhere to PRICE_FILTER tickSize
 
         params = {
             "symbol": symbol,
@@ -512,7 +668,7 @@ class BinanceClient:
         }
 
         print(f"Placing order for {symbol}: quantity={quantity}, price={price}")
-        response = self.client.new_order(**params)
+        response = self.request("new_order", **params)
         print("\nResponse:")
         pprint(response)
 
@@ -524,36 +680,36 @@ class BinanceClient:
         :return: Response from Binance API
         """
 
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+        symbol = self.symbol
 
-        current_symbol_balance = self.account_balance_by_symbol("ETH")
+        current_symbol_balance = self.account_balance_by_symbol(self.base_asset)
         if current_symbol_balance == 0:
             msg = f"Symbol {symbol} holdings are 0. Stop order failed to place."
             print(msg)
             return msg
-        current_symbol_balance = round_down_to_decimal_place(current_symbol_balance, 4)  # adhere to LOT_SIZE = 0.0001
-        quantity = str(current_symbol_balance)
+        filters = self.filters(symbol)
+        quantity = filters.format_quantity(current_symbol_balance)  # adhere to LOT_SIZE
 
         price = stop_price * 0.95
-        price = round(price, 2)  # adhere to TICK_SIZE = 0.01
+        price = filters.round_price(price)  # adhere to PRICE_FILTER tickSize
 
-        if price < self.MIN_PRICE:
+        if price < filters.min_price:
             raise Exception("Cannot place a stop with price less than filter 'PRICE_FILTER' minPrice field")
 
-        stop_price = round(stop_price, 2)  # adhere to TICK_SIZE = 0.01
+        stop_price = filters.round_price(stop_price)  # adhere to PRICE_FILTER tickSize
         params = {
             "symbol": symbol,
             "side": Side.sell.value,  # for now always a sell order
             "type": OrderType.stop_loss_limit.value,
-            "quantity": str(quantity),
+            "quantity": quantity,
             "timestamp": int(round(dt.datetime.now().timestamp())),
             "timeInForce": "GTC",  # place stop until we remove
-            "stopPrice": stop_price,
-            "price": price,  # price for limit order 5% less than the stop_price
+            "stopPrice": filters.format_price(stop_price),
+            "price": filters.format_price(price),  # price for limit order 5% less than the stop_price
         }
 
         print(f"Placing stop order for {symbol}: quantity={quantity}, stop_price={stop_price}, price={price}")
-        response = self.client.new_order(**params)
+        response = self.request("new_order", **params)
         print("\nResponse:")
         pprint(response)
         return response
@@ -575,9 +731,9 @@ class BinanceClient:
         if order_type is None:
             return self.cancel_all_open_orders()
 
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+        symbol = self.symbol
 
-        open_orders_df = self.show_open_orders(order_type_filter=order_type, save_image=False)
+        open_orders_df = self.show_open_orders(order_type_filter=order_type, report=False)
 
         if len(open_orders_df) == 0:
             output = f"No orders of type {order_type.value} were found. Exiting."
@@ -586,7 +742,7 @@ class BinanceClient:
 
         order_ids = open_orders_df['OrderId'].tolist()
         for order_id in order_ids:
-            res = self.client.cancel_order(symbol=symbol, orderId=order_id)
+            res = self.request("cancel_order", symbol=symbol, orderId=order_id)
             if res['status'] != "CANCELED":
                 raise Exception("Order was not cancelled - FIX ME")
             msg = f"Cancelled order ID {order_id} for {symbol}. " \
@@ -607,16 +763,16 @@ class BinanceClient:
         :return: Response from Binance API
         """
 
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+        symbol = self.symbol
 
         # TODO try catch for if no orders are currently placed
 
-        open_orders = self.show_open_orders(save_image=False)
+        open_orders = self.show_open_orders(report=False)
 
         if len(open_orders) == 0:
             return f"You have no open orders, exiting."
 
-        response = self.client.cancel_open_orders(symbol)  # requires order to be open
+        response = self.request("cancel_open_orders", symbol)  # requires order to be open
         print(add_spacing("Response:"))
         print(response)
         return response
@@ -627,9 +783,9 @@ class BinanceClient:
         if qty_to_sell <= 0.0:
             raise Exception(f'Cannot sell negative or 0 crypto ({qty_to_sell})')
 
-        symbol = "ETHUSDT" if self.test else "ETHGBP"  # only ETH supported for now
+        symbol = self.symbol
 
-        qty_to_sell = round_down_to_decimal_place(qty_to_sell, 4)  # adhere to LOT_SIZE
+        qty_to_sell = self.filters(symbol).format_quantity(qty_to_sell)  # adhere to LOT_SIZE
 
         params = {
             "cancelOrderId": str(order_id_to_cancel),
@@ -642,7 +798,7 @@ class BinanceClient:
         }
 
         try:
-            response = self.client.cancel_and_replace(**params)
+            response = self.request("cancel_and_replace", **params)
             fills = response['newOrderResponse']['fills']
             qty, wap = self.get_qty_and_wap_from_fills(fills)
 
@@ -0,0 +1,218 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from src.notify import notifier
+from src.utils.utils import Side, OrderType, add_spacing
+
+
+def fill_summary(fills, base_asset):
+    """
+    :param fills: 'fills' of a Binance order response
+    :param base_asset: Asset bought or sold e.g. ETH
+    :return: (quantity filled, weighted average price, commission charged in the base asset)
+    """
+    qty = sum(float(fill['qty']) for fill in fills)
+    wap = sum(float(fill['qty']) * float(fill['price']) for fill in fills) / qty if qty > 0 else 0.0
+    base_commission = sum(float(fill['commission']) for fill in fills if fill.get('commissionAsset') == base_asset)
+    return qty, wap, base_commission
+
+
+@dataclass
+class ExecutionReport:
+    """
+    What one buy or sell did and when each stage of it happened, to measure signal to fill latency.
+
+    Timestamps are epoch seconds so the exchange's transactTime ('fill') is comparable with the local stages.
+    """
+    action: str  # "buy" or "sell"
+    symbol: str
+    timestamps: dict = field(default_factory=dict)  # stage -> epoch seconds, in the order the stages happened
+    messages: list = field(default_factory=list)  # sent once the orders are done
+    qty: float = 0.0
+    wap: float = 0.0
+    error: str = None
+
+    def mark(self, stage, timestamp=None):
+        self.timestamps[stage] = time.time() if timestamp is None else timestamp
+
+    def latency_ms(self) -> dict:
+        """
+        :return: dict of stage -> milliseconds since the first stage (the signal)
+        """
+        if len(self.timestamps) == 0:
+            return {}
+        start = next(iter(self.timestamps.values()))
+        return {stage: round(1000 * (timestamp - start), 1) for stage, timestamp in self.timestamps.items()}
+
+
+class OrderExecutor:
+    """
+    Order path of the MA crossover, built to get the order to Binance as soon as possible after a signal.
+
+    The symbol filters and the fixed parameters of each request are worked out once, when the executor is created.
+    A buy or sell then only adds the quantity (and prices) before sending, and the stop is priced from the fills of
+    the buy rather than further requests. Printing and Slack messages wait until the orders are done.
+
+    Each buy or sell returns an ExecutionReport with a timestamp for every stage:
+    signal -> decision -> order_sent -> order_response -> stop_sent -> stop_response -> published
+    plus 'fill', the time Binance filled the order.
+    """
+
+    STOP_LIMIT_RATIO = 0.95  # limit price of the stop order as a ratio of its stop price
+
+    def __init__(self, client, symbol=None, stop_multiplier=0.9, history=100):
+        """
+        :param client: BinanceClient the orders are sent with
+        :param symbol: Symbol traded, defaults to the symbol of the client
+        :param stop_multiplier: Stop price as a ratio of the buy price
+        :param history: Number of recent ExecutionReports kept for latency_stats
+        """
+        self.client = client
+        self.symbol = client.symbol if symbol is None else symbol
+        self.stop_multiplier = stop_multiplier
+        self.filters = client.filters(self.symbol)
+        # the timestamp and signature are added by the connector when each request is sent
+        self.market_buy_template = {"symbol": self.symbol, "side": Side.buy.value, "type": OrderType.market.value}
+        self.market_sell_template = {"symbol": self.symbol, "side": Side.sell.value, "type": OrderType.market.value}
+        self.stop_template = {"symbol": self.symbol, "side": Side.sell.value, "type": OrderType.stop_loss_limit.value,
+                              "timeInForce": "GTC"}
+        self.cancel_and_replace_template = {"symbol": self.symbol, "side": Side.sell.value,
+                                            "type": OrderType.market.value, "cancelReplaceMode": "STOP_ON_FAILURE"}
+        self.reports = deque(maxlen=history)
+
+    def buy(self, quote_qty=None, signal_time=None) -> ExecutionReport:
+        """
+        Market buy then a stop loss for the quantity bought, at stop_multiplier of the fill price
+
+        :param quote_qty: Quote asset to spend e.g. GBP, defaults to the full balance
+        :param signal_time: Epoch seconds the signal was known e.g. close time of the latest candle, defaults to now
+        :return: ExecutionReport
+        """
+        report = self._start_report("buy", signal_time)
+        try:
+            if quote_qty is None:
+                quote_qty = self.client.account_balance_by_symbol(self.filters.quote_asset)
+            quote_qty = self.filters.round_quote_quantity(quote_qty)
+            if quote_qty <= 0:
+                raise Exception(f"No {self.filters.quote_asset} to buy {self.symbol} with")
+
+            response = self._send(report, "order", "new_order",
+                                  {**self.market_buy_template,
+                                   "quoteOrderQty": self.filters.format_quote_quantity(quote_qty)})
+            qty, wap, base_commission = fill_summary(response['fills'], self.filters.base_asset)
+            report.qty, report.wap = qty, wap
+            report.messages.append(f"{Side.buy.value} order filled. Qty: {round(qty, self.client.PRECISION)} "
+                                   f"price: {round(wap, self.client.PRECISION)}")
+
+            # the stop covers what was bought, less the commission Binance took in the coin
+            stop_qty = self.filters.round_quantity(qty - base_commission)
+            stop_price = self.filters.round_price(wap * self.stop_multiplier)
+            limit_price = self.filters.round_price(stop_price * self.STOP_LIMIT_RATIO)
+            if stop_qty <= 0:
+                raise Exception(f"Bought quantity {qty} is too small for a stop order")
+            if limit_price < self.filters.min_price:
+                raise Exception("Cannot place a stop with price less than filter 'PRICE_FILTER' minPrice field")
+
+            self._send(report, "stop", "new_order",
+                       {**self.stop_template, "quantity": self.filters.format_quantity(stop_qty),
+                        "stopPrice": self.filters.format_price(stop_price),
+                        "price": self.filters.format_price(limit_price)})
+            report.messages.append(f"Placed stop order for {self.symbol}: quantity={stop_qty}, "
+                                   f"stop_price={stop_price}, price={limit_price}")
+            return report
+        except Exception as e:
+            report.error = str(e)
+            raise
+        finally:
+            self._publish(report)
+
+    def sell(self, signal_time=None) -> ExecutionReport:
+        """
+        Sells the full balance. A single stop is cancelled and replaced by the sell in one request, otherwise every
+        stop is cancelled before a market sell.
+
+        :param signal_time: Epoch seconds the signal was known e.g. close time of the latest candle, defaults to now
+        :return: ExecutionReport
+        """
+        report = self._start_report("sell", signal_time)
+        try:
+            open_orders = self.client.request("get_open_orders", self.symbol, recvWindow=60000)
+            stop_order_ids = [order['orderId'] for order in open_orders
+                              if order['type'] == OrderType.stop_loss_limit.value]
+
+            if len(stop_order_ids) == 1:
+                qty = self.filters.round_quantity(
+                    self.client.account_balance_by_symbol(self.filters.base_asset, include_locked=True))
+                if qty <= 0:
+                    raise Exception(f"Cannot sell negative or 0 crypto ({qty})")
+                response = self._send(report, "order", "cancel_and_replace",
+                                      {**self.cancel_and_replace_template, "cancelOrderId": str(stop_order_ids[0]),
+                                       "quantity": self.filters.format_quantity(qty)})
+                fills = response['newOrderResponse']['fills']
+                report.messages.append(f"Cancelled stop order ID: {stop_order_ids[0]}")
+            else:
+                for order_id in stop_order_ids:
+                    response = self.client.request("cancel_order", symbol=self.symbol, orderId=order_id)
+                    if response['status'] != "CANCELED":
+                        raise Exception(f"Stop order {order_id} was not cancelled, status: {response['status']}")
+                    report.messages.append(f"Cancelled stop order ID: {order_id}")
+                report.mark("stops_cancelled")
+                qty = self.filters.round_quantity(self.client.account_balance_by_symbol(self.filters.base_asset))
+                if qty <= 0:
+                    raise Exception(f"Cannot sell negative or 0 crypto ({qty})")
+                response = self._send(report, "order", "new_order",
+                                      {**self.market_sell_template, "quantity": self.filters.format_quantity(qty)})
+                fills = response['fills']
+
+            report.qty, report.wap, _ = fill_summary(fills, self.filters.base_asset)
+            report.messages.insert(0, f"{Side.sell.value} order filled. Qty: {round(report.qty, self.client.PRECISION)}"
+                                      f" price: {round(report.wap, self.client.PRECISION)}")
+            return report
+        except Exception as e:
+            report.error = str(e)
+            raise
+        finally:
+            self._publish(report)
+
+    def latency_stats(self) -> dict:
+        """
+        :return: dict of stage -> mean milliseconds since the signal, over the recent executions
+        """
+        latencies = {}
+        for report in self.reports:
+            for stage, latency in report.latency_ms().items():
+                latencies.setdefault(stage, []).append(latency)
+        return {stage: round(sum(values) / len(values), 1) for stage, values in latencies.items()}
+
+    def _start_report(self, action, signal_time):
+        report = ExecutionReport(action, self.symbol)
+        report.mark("signal", signal_time)
+        report.mark("decision")
+        return report
+
+    def _send(self, report, name, endpoint, params):
+        """
+        Sends one order request, marking when it was sent and when the response arrived
+        """
+        report.mark(f"{name}_sent")
+        response = self.client.request(endpoint, **params)
+        report.mark(f"{name}_response")
+        order_response = response.get('newOrderResponse', response)
+        if 'transactTime' in order_response and name == "order":
+            report.mark("fill", order_response['transactTime'] / 1000)
+        return response
+
+    def _publish(self, report):
+        """
+        Prints and sends the messages of an execution, after its orders are done
+        """
+        if report.error is not None:
+            report.messages.append(f"MA Crossover {report.action} failed: {report.error}")
+        report.mark("published")
+        self.reports.append(report)
+        message = "\n".join(report.messages)
+        if not self.client.test:
+            notifier.slack_notify(message, "prod-trades")
+        print(add_spacing(message))
+        print(f"Execution latency (ms since signal): {report.latency_ms()}")
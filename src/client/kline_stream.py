@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Iterator
+
+import websocket
+
+from src.types.candlesticks import Candlesticks
+from src.utils.utils import timeframe_to_epoch, add_spacing
+
+
+class KlineStream:
+    """
+    Closed candles pushed from the Binance kline WebSocket stream, instead of polling get_klines each minute.
+
+    Binance pushes the current candle every couple of seconds and flags the final update of each candle as closed, so
+    candles arrive as soon as they finalize. On every (re)connect any candles closed since the last one delivered are
+    fetched from the REST API so a dropped connection never leaves a gap.
+    https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-streams
+    """
+
+    STREAM_URL = "wss://stream.binance.com:9443"
+    TEST_STREAM_URL = "wss://testnet.binance.vision"
+
+    def __init__(self, client, symbol=None, timeframe="1m", stream_url=None, timeout=30, max_reconnect_delay=60):
+        """
+        :param client: BinanceClient used to gap fill from the REST API
+        :param symbol: Symbol to stream, defaults to the market data symbol of the client
+        :param timeframe: the interval of candlestick, e.g 1m, 15m, 1h
+        :param stream_url: Base WebSocket URL, defaults to the test or prod stream of the client
+        :param timeout: Seconds without a message before the connection is treated as dead
+        :param max_reconnect_delay: Maximum seconds to wait between reconnect attempts
+        """
+        if symbol is None:
+            symbol = client.kline_symbol
+
+        self.client = client
+        self.symbol = symbol
+        self.timeframe = timeframe
+        if stream_url is None:
+            stream_url = self.TEST_STREAM_URL if client.test else self.STREAM_URL
+        self.url = f"{stream_url}/ws/{symbol.lower()}@kline_{timeframe}"
+        self.timeout = timeout
+        self.max_reconnect_delay = max_reconnect_delay
+
+    def closed_candles(self, last_open_time) -> Iterator[Candlesticks]:
+        """
+        Yields newly closed candles forever, reconnecting whenever the stream drops
+
+        :param last_open_time: Open time of the last candle already held (epoch with 3 d.p)
+        :return: Iterator of Candlesticks, usually one candle each
+        """
+        reconnect_attempts = 0
+        while True:
+            try:
+                connection = websocket.create_connection(self.url, timeout=self.timeout)
+            except (websocket.WebSocketException, OSError) as e:
+                reconnect_attempts += 1
+                delay = min(self.max_reconnect_delay, 2 ** (reconnect_attempts - 1))
+                print(f"Kline stream failed to connect: {e}. Retrying in {delay} seconds")
+                time.sleep(delay)
+                continue
+            reconnect_attempts = 0
+            print(add_spacing(f"Kline stream connected: {self.url}"))
+
+            try:
+                missed_candles = self._gap_fill(last_open_time)
+                if len(missed_candles) > 0:
+                    last_open_time = missed_candles.openTime[-1]
+                    yield missed_candles
+
+                while True:
+                    kline = self._closed_kline(connection.recv())
+                    if kline is not None and kline[0] > last_open_time:
+                        last_open_time = kline[0]
+                        yield Candlesticks.from_klines([kline], self.timeframe)
+            except (websocket.WebSocketException, OSError) as e:
+                print(add_spacing(f"Kline stream disconnected: {e}. Reconnecting"))
+            finally:
+                connection.close()
+
+    def _gap_fill(self, last_open_time) -> Candlesticks:
+        """
+        Closed candles opening after last_open_time, from the REST API
+        """
+        start_time = last_open_time + timeframe_to_epoch(self.timeframe)
+        time_now = time.time() * 1000
+        if start_time >= time_now:
+            return Candlesticks(candleTimeframe=self.timeframe)
+        candles = self.client.get_klines(self.timeframe, symbol=self.symbol, startTime=start_time)
+        return candles.time_slice(end=time_now - timeframe_to_epoch(self.timeframe) + 1)  # drop the open candle
+
+    @staticmethod
+    def _closed_kline(message):
+        """
+        :return: kline list in the REST API order if the message is the final update of a candle, otherwise None
+        """
+        if not message:
+            raise websocket.WebSocketConnectionClosedException("Stream closed by server")
+        k = json.loads(message).get("k")
+        if k is None or not k["x"]:
+            return None
+        return [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], k["B"]]
@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+
+import requests
+from binance.error import ClientError, ServerError
+
+
+class RequestWeightLimiter:
+    """
+    Client side budget of Binance request weight and retry scheduler for every Binance API call
+
+    Binance counts the weight of every request made within each minute (REQUEST_WEIGHT in exchange_info rateLimits)
+    and bans IPs that exceed it. acquire() blocks the calling thread until the request fits within the budget of the
+    current window, so concurrent callers share one budget. The count is corrected from the X-MBX-USED-WEIGHT-1M
+    header of every response, which also includes weight used by anything else on this IP.
+
+    call() retries with exponential backoff and jitter on 429 (rate limited), 418 (IP banned) and, for requests that
+    are safe to repeat, connection and server errors.
+    """
+
+    # Spot method name -> request weight https://binance-docs.github.io/apidocs/spot/en/#limits
+    ENDPOINT_WEIGHTS = {
+        "account": 20,
+        "avg_price": 2,
+        "cancel_and_replace": 1,
+        "cancel_open_orders": 1,
+        "cancel_order": 1,
+        "coin_info": 10,
+        "exchange_info": 20,
+        "get_open_orders": 6,  # with a symbol
+        "klines": 2,
+        "my_trades": 20,
+        "new_order": 1,
+        "ticker_24hr": 2,  # with a symbol
+        "ticker_price": 2,  # with a symbol
+    }
+    # requests which may have been executed when the connection failed so must not be repeated blindly
+    ORDER_ENDPOINTS = {"new_order", "cancel_order", "cancel_open_orders", "cancel_and_replace"}
+    USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+    def __init__(self, weight_limit=6000, window_seconds=60, max_attempts=5, base_delay=1.0, max_delay=60.0):
+        self.weight_limit = weight_limit
+        self.window_seconds = window_seconds
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.used_weight = 0
+        self._window = None
+        self._blocked_until = 0.0  # set by a 429/418 Retry-After, pauses every caller
+        self._lock = threading.Lock()
+
+    def acquire(self, weight):
+        """
+        Block until a request of this weight can be sent, then count it
+
+        :param weight: Request weight of the endpoint
+        :return: (void)
+        """
+        if weight > self.weight_limit:
+            raise ValueError(f"Request weight {weight} is above the limit of {self.weight_limit}")
+        while True:
+            with self._lock:
+                now = time.time()
+                self._roll_window(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self.used_weight + weight <= self.weight_limit:
+                    self.used_weight += weight
+                    return
+                else:
+                    wait = (self._window + 1) * self.window_seconds - now
+            print(f"Request weight limit reached ({self.used_weight}/{self.weight_limit}). Waiting {wait:.1f} seconds")
+            time.sleep(wait)
+
+    def call(self, endpoint, function, *args, **kwargs):
+        """
+        Call a Binance API function within the weight limit, retrying errors which are safe to retry
+
+        :param endpoint: Spot method name, used to look up the request weight
+        :param function: Function making the request
+        :return: Response of the function
+        """
+        weight = self.ENDPOINT_WEIGHTS.get(endpoint, 1)
+        attempts = 1
+        while True:
+            self.acquire(weight)
+            try:
+                return function(*args, **kwargs)
+            except ClientError as error:
+                if error.status_code not in (418, 429):
+                    raise
+                retry_after = self._retry_after(error)
+                if retry_after is not None:
+                    with self._lock:
+                        self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+                exception = error
+            except (ConnectionError, ServerError, requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as error:
+                if endpoint in self.ORDER_ENDPOINTS:
+                    raise  # the order may have been placed
+                exception = error
+
+            if attempts >= self.max_attempts:
+                raise Exception(f"Binance client failed {attempts} times to call {endpoint}. Error: {exception}")
+            delay = self.backoff_delay(attempts)
+            print(f"Caught error calling {endpoint} which could be down to flakiness or rate limits. "
+                  f"Attempts: {attempts}. Retrying in {delay:.1f} seconds. Error: {exception}")
+            time.sleep(delay)
+            attempts += 1
+
+    def backoff_delay(self, attempts):
+        """
+        Exponential backoff with jitter, between half and all of base_delay * 2^(attempts - 1)
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def update_used_weight(self, used_weight):
+        with self._lock:
+            self._roll_window(time.time())
+            self.used_weight = max(self.used_weight, used_weight)
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        requests response hook syncing the weight used from Binance's header
+        """
+        used_weight = response.headers.get(self.USED_WEIGHT_HEADER)
+        if used_weight is not None:
+            self.update_used_weight(int(used_weight))
+
+    def _retry_after(self, error):
+        try:
+            return float(error.header["Retry-After"])
+        except (TypeError, KeyError, ValueError):
+            return None
+
+    def _roll_window(self, now):
+        window = int(now // self.window_seconds)
+        if window != self._window:
+            self._window = window
+            self.used_weight = 0
@@ -0,0 +1,81 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """
+    Keep-alive connection pool for the Binance session, so one BinanceClient can be held for the life of a process.
+
+    Stale connections (closed by the server while idle in the pool) are recovered transparently:
+    - urllib3 checks a pooled connection is still open before reusing it, and opens a new one if it was closed
+    - GET requests are also retried once on a new connection if it drops mid request. Other requests (orders) can't
+      safely be repeated so are never retried
+
+    Records the number of requests, how many needed a new connection, and the latency of each endpoint.
+    """
+
+    def __init__(self, pool_maxsize=10):
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize,
+                         max_retries=Retry(total=1, connect=1, read=1, status=0, redirect=0,
+                                           allowed_methods={"GET"}, raise_on_status=False))
+        self.requests = 0
+        self.new_connections = 0
+        self.latency = {}  # endpoint path -> [count, total seconds, max seconds]
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        pool = super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        if not getattr(pool.ConnectionCls, "counts_connects", False):
+            pool.ConnectionCls = _counting_connection_class(pool.ConnectionCls, self._local)
+        return pool
+
+    def send(self, request, **kwargs):
+        self._local.connects = 0
+        start = time.perf_counter()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            self._record(urlparse(request.url).path, time.perf_counter() - start, self._local.connects)
+
+    def stats(self) -> dict:
+        """
+        :return: dict of request/connection counts and per endpoint latency in milliseconds
+        """
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.requests - min(self.new_connections, self.requests),
+                "latency_ms": {path: {"count": count,
+                                      "mean": round(total / count * 1000, 1),
+                                      "max": round(maximum * 1000, 1)}
+                               for path, (count, total, maximum) in self.latency.items()},
+            }
+
+    def _record(self, path, latency, new_connections):
+        with self._stats_lock:
+            self.requests += 1
+            self.new_connections += new_connections
+            count, total, maximum = self.latency.get(path, [0, 0.0, 0.0])
+            self.latency[path] = [count + 1, total + latency, max(maximum, latency)]
+
+
+def _counting_connection_class(connection_class, local):
+    """
+    Subclass of a urllib3 connection class counting each new TCP connection (including reconnects of a pooled
+    connection which was dropped) on the sending thread's local state
+    """
+
+    class CountingConnection(connection_class):
+        counts_connects = True
+
+        def connect(self):
+            local.connects = getattr(local, "connects", 0) + 1
+            return super().connect()
+
+    return CountingConnection
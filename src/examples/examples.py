@@ -38,7 +38,7 @@ def _position_summary(test):
 
 def _show_open_orders(test=True, filter=None):
     client = BinanceClient(test=test)
-    client.show_open_orders(order_type_filter=filter, save_image=False)
+    client.show_open_orders(order_type_filter=filter, report=False)
 
 
 def get_test_market_position():
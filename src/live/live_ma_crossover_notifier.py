@@ -1,3 +1,4 @@
+import datetime
 import sys
 from pathlib import Path
 
@@ -6,99 +7,155 @@ if root_path not in sys.path:
     sys.path.append(root_path)
 
 from src.client.binance_client import BinanceClient
-from src.utils.utils import epoch_to_date, epoch_to_minutes, add_spacing, PositionType, Side, LastNotifiedState
+from src.client.execution import OrderExecutor
+from src.client.kline_stream import KlineStream
+from src.utils.utils import epoch_to_date, epoch_to_minutes, add_spacing, one_minute_as_epoch, PositionType, Side, \
+    LastNotifiedState
 from src.utils.ma_crossover_utils import send_update_snapshot, buy, sell, \
-    sleep_until_next_candle_released
+    sleep_until_next_candle_released, STOP_LOSS_MULTIPLIER
+from src.utils.snapshot_worker import SnapshotWorker
 
 
-def notify_ma_crossover(window_min, window_max, units, test=True):
+def notify_ma_crossover(window_min, window_max, units, test=True, stream=True):
     """
 
     Main function to notify in the case of a MA crossover.
     - Gets as many candles as required for window_max
-    - Keeps fetching each minute for new 1m interval candles
-    - Generates dataframe for current candles
+    - Receives each closed 1m interval candle from the kline stream (or polls for them each minute)
+    - Updates the streaming MA crossover with only the new candles
     - Notifies if position is buy or sell (also prints tail of current dataframe)
 
     :param test: Test env (True) or prod env (False)
     :param window_min:  Short window size
     :param window_max:  Long window size
     :param units: units of window_min/max in days or hours
+    :param stream: Receive candles from the WebSocket kline stream (True) or poll the REST API each minute (False)
     :return: (void) Notifies if we should buy or sell and executes
     """
     client = BinanceClient(test=test)
 
     # initialise 30 days of candles
     all_candles = client.get_klines(days=30)
+    if stream:
+        # the stream only delivers closed candles so drop the candle still open
+        time_now = datetime.datetime.now().timestamp() * 1000
+        all_candles = all_candles.time_slice(end=time_now - one_minute_as_epoch + 1)
+    all_candles.enable_ring_buffer()  # keeps the past 30 days of candles in place
+    ma_crossover_engine = all_candles.create_ma_crossover_engine(window_min, window_max, units)
 
     last_notified_state = LastNotifiedState.un_notified
+    snapshot_worker = SnapshotWorker()  # renders and uploads snapshots off the trading loop
+    executor = OrderExecutor(client, stop_multiplier=STOP_LOSS_MULTIPLIER)  # filters and order templates ready
+
+    if stream:
+        kline_stream = KlineStream(client, symbol=client.kline_symbol, timeframe=all_candles.candleTimeframe)
+        for new_candles in kline_stream.closed_candles(last_open_time=all_candles.openTime[-1]):
+            print(add_spacing(f"Received closed candles up to: {epoch_to_date(new_candles.closeTime[-1])}"))
+            last_notified_state = evaluate_new_candles(new_candles, all_candles, ma_crossover_engine, client,
+                                                       window_min, window_max, units, last_notified_state,
+                                                       snapshot_worker, executor)
+        return
 
     while True:
         new_start_time = all_candles.closeTime[-1]  # start from last candle closing time
         print(add_spacing(f"Fetching new candles with start time: {epoch_to_date(new_start_time)}"))
 
-        client = BinanceClient(test=test)  # needed as a connection keeps being reset with same object instance
         new_candles = client.get_klines(startTime=new_start_time)
         if len(new_candles) == 0:
             print(add_spacing("No new candles found. Sleeping."))
             sleep_until_next_candle_released(new_start_time)
             continue
 
-        all_candles.add(new_candles)
-
-        all_candles.shorten()  # shorten candles to past 30 days of data
-
-        # TODO we waste time computing entire dataframe here (should compute only last data point ideally)
-        ma_crossover_dataframe = all_candles.create_ma_crossover_dataframe(window_min, window_max, units)
-        print("Latest MA crossover data:")
-        print(ma_crossover_dataframe.tail())
-
-        suggested_position = all_candles.suggested_position_type(ma_crossover_dataframe)
-        current_position = client.get_account_balance_position_type(include_locked=True)
-
-        latest_row = ma_crossover_dataframe.iloc[-1]
-
-        print(add_spacing(f"Current position: {current_position}. Suggested position: {suggested_position}"))
-        if (suggested_position == Side.buy) & (current_position == PositionType.sold):
-            """
-            BUY
-            """
-            buy(window_min, window_max, units, latest_row, client)
-            last_notified_state = LastNotifiedState.un_notified
-
-        elif (suggested_position == Side.sell) & (current_position == PositionType.bought):
-            """
-            SELL
-            """
-            sell(window_min, window_max, units, latest_row, client)
-            last_notified_state = LastNotifiedState.un_notified
-
-        elif (suggested_position == Side.buy) & (current_position == PositionType.bought):
-            """
-            AVOIDING REPEAT BUY
-            """
-            symbol_qty = client.account_balance_by_symbol(include_locked=True)
-            if last_notified_state != LastNotifiedState.avoid_repeat_buy:
-                print(f"Buy signal not executed. Symbol quantity is greater than 0 ({round(symbol_qty, 8)})")
-                last_notified_state = LastNotifiedState.avoid_repeat_buy
-
-        elif (suggested_position == Side.sell) & (current_position == PositionType.sold):
-            """
-            AVOIDING REPEAT SELL
-            """
-            symbol_qty = client.account_balance_by_symbol(include_locked=True)
-            if last_notified_state != LastNotifiedState.avoid_repeat_sell:
-                print(f"Sell signal not executed. Symbol quantity already 0 ({round(symbol_qty, 8)})")
-                last_notified_state = LastNotifiedState.avoid_repeat_sell
+        last_notified_state = evaluate_new_candles(new_candles, all_candles, ma_crossover_engine, client,
+                                                   window_min, window_max, units, last_notified_state,
+                                                   snapshot_worker, executor)
 
-        else:
-            print(add_spacing('Suggested position is to hold. Doing nothing.'))
+        sleep_until_next_candle_released(new_start_time)
 
-        current_minutes_value = epoch_to_minutes(new_start_time)
-        if current_minutes_value % 10 == 0:  # every 10 minutes save current snapshot
-            send_update_snapshot(all_candles, client, window_min, window_max, units)
 
-        sleep_until_next_candle_released(new_start_time)
+def evaluate_new_candles(new_candles, all_candles, ma_crossover_engine, client, window_min, window_max, units,
+                         last_notified_state, snapshot_worker=None, executor=None) -> LastNotifiedState:
+    """
+    Adds the new candles, then buys, sells or holds on the latest MA crossover signal
+
+    :param new_candles: Candles received since the last evaluation
+    :param all_candles: Past 30 days of candles, new_candles are added to these
+    :param ma_crossover_engine: Streaming MA crossover seeded with all_candles
+    :param client: BinanceClient
+    :param window_min:  Short window size
+    :param window_max:  Long window size
+    :param units: units of window_min/max in days or hours
+    :param last_notified_state: LastNotifiedState from the previous evaluation
+    :param snapshot_worker: SnapshotWorker to send the snapshot in the background, None sends it inline
+    :param executor: OrderExecutor the orders are sent with, None creates one for each order
+    :return: LastNotifiedState to pass to the next evaluation
+    """
+    new_start_time = all_candles.closeTime[-1]
+
+    all_candles.add(new_candles)  # the ring buffer evicts candles older than 30 days
+
+    ma_crossover_engine.update_candles(new_candles)
+    ma_crossover_dataframe = ma_crossover_engine.dataframe()  # latest rows only
+    print("Latest MA crossover data:")
+    print(ma_crossover_dataframe.tail())
+
+    suggested_position = all_candles.suggested_position_type(ma_crossover_dataframe)
+    current_position = client.get_account_balance_position_type(include_locked=True)
+
+    latest_row = ma_crossover_dataframe.iloc[-1]
+    signal_time = all_candles.closeTime[-1] / 1000  # the signal is known once the latest candle closes
+
+    print(add_spacing(f"Current position: {current_position}. Suggested position: {suggested_position}"))
+    if (suggested_position == Side.buy) & (current_position == PositionType.sold):
+        """
+        BUY
+        """
+        buy(window_min, window_max, units, latest_row, client, executor, signal_time)
+        last_notified_state = LastNotifiedState.un_notified
+
+    elif (suggested_position == Side.sell) & (current_position == PositionType.bought):
+        """
+        SELL
+        """
+        sell(window_min, window_max, units, latest_row, client, executor, signal_time)
+        last_notified_state = LastNotifiedState.un_notified
+
+    elif (suggested_position == Side.buy) & (current_position == PositionType.bought):
+        """
+        AVOIDING REPEAT BUY
+        """
+        symbol_qty = client.account_balance_by_symbol(include_locked=True)
+        if last_notified_state != LastNotifiedState.avoid_repeat_buy:
+            print(f"Buy signal not executed. Symbol quantity is greater than 0 ({round(symbol_qty, 8)})")
+            last_notified_state = LastNotifiedState.avoid_repeat_buy
+
+    elif (suggested_position == Side.sell) & (current_position == PositionType.sold):
+        """
+        AVOIDING REPEAT SELL
+        """
+        symbol_qty = client.account_balance_by_symbol(include_locked=True)
+        if last_notified_state != LastNotifiedState.avoid_repeat_sell:
+            print(f"Sell signal not executed. Symbol quantity already 0 ({round(symbol_qty, 8)})")
+            last_notified_state = LastNotifiedState.avoid_repeat_sell
+
+    else:
+        print(add_spacing('Suggested position is to hold. Doing nothing.'))
+
+    current_minutes_value = epoch_to_minutes(new_start_time)
+    if current_minutes_value % 10 == 0:  # every 10 minutes save current snapshot
+        if snapshot_worker is None:
+            send_update_snapshot(all_candles, client, window_min, window_max, units)
+        else:
+            # a copy, as the ring buffer is overwritten by later candles
+            snapshot_worker.submit("snapshot", send_update_snapshot, all_candles.copy(), client, window_min,
+                                   window_max, units)
+            print(add_spacing(f"Snapshot worker: {snapshot_worker.metrics()}"))
+        client.connection_stats()
+        print(add_spacing(f"Account cache: {client.account_cache_stats()}"))
+        if executor is not None:
+            print(add_spacing(f"Execution latency (mean ms since signal): {executor.latency_stats()}"))
+
+    return last_notified_state
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+root_path = str(Path(__file__).parent.parent.parent)
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from src.client.binance_client import BinanceClient
+from src.types.candlesticks import Candlesticks
+from src.utils.utils import epoch_to_date, add_spacing, Side
+from src.utils.ma_crossover_utils import sleep_until_next_candle_released
+
+
+class MultiSymbolScheduler:
+    """
+    Runs the MA crossover across many symbols from one loop.
+
+    Each symbol keeps its own Candlesticks buffer and streaming MA crossover engine. Every tick the new candles of all
+    symbols are requested concurrently over one client, so the whole tick shares a single keep-alive session and
+    request weight limit, then the signal of every symbol is evaluated.
+    """
+
+    def __init__(self, symbols, window_min, window_max, units, timeframe="1m", client=None, workers=8, test=True):
+        """
+        :param symbols: Symbols to trade e.g. ["ETHUSDT", "BTCUSDT"]
+        :param window_min:  Short window size
+        :param window_max:  Long window size
+        :param units: units of window_min/max in days or hours
+        :param timeframe: the interval of candlestick, e.g 1m, 15m, 1h
+        :param client: BinanceClient to share, otherwise one is created for the test or prod env
+        :param workers: Maximum number of concurrent requests
+        :param test: Test env (True) or prod env (False)
+        """
+        if len(symbols) == 0:
+            raise Exception("No symbols found. Please provide at least one symbol.")
+        self.symbols = list(symbols)
+        self.window_min = window_min
+        self.window_max = window_max
+        self.units = units
+        self.timeframe = timeframe
+        self.client = client if client is not None else BinanceClient(test=test)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.candles = {}  # symbol -> Candlesticks
+        self.engines = {}  # symbol -> MACrossoverEngine
+
+    def initialise(self, **kwargs):
+        """
+        Fetches the history of every symbol concurrently and seeds their engines
+
+        :param kwargs: period of time to begin candles from time now minus,  e.g days=30
+        """
+        histories = self.pool.map(lambda symbol: self.client.get_klines(self.timeframe, symbol=symbol, **kwargs),
+                                  self.symbols)
+        for symbol, candles in zip(self.symbols, histories):
+            self.add_symbol(symbol, candles)
+
+    def add_symbol(self, symbol, candles: Candlesticks):
+        """
+        Starts tracking a symbol from the candle history given
+        """
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+        candles.enable_ring_buffer()  # keeps the past 30 days of candles in place
+        self.candles[symbol] = candles
+        self.engines[symbol] = candles.create_ma_crossover_engine(self.window_min, self.window_max, self.units)
+
+    def fetch_new_candles(self) -> dict:
+        """
+        New candles of every symbol since its last candle, requested concurrently
+
+        :return: dict of symbol -> Candlesticks
+        """
+        start_times = [self.candles[symbol].closeTime[-1] for symbol in self.symbols]
+        new_candles = self.pool.map(
+            lambda symbol, start_time: self.client.get_klines(self.timeframe, symbol=symbol, startTime=start_time),
+            self.symbols, start_times)
+        return dict(zip(self.symbols, new_candles))
+
+    def tick(self) -> dict:
+        """
+        Adds the new candles of every symbol and evaluates their MA crossover signals
+
+        :return: dict of symbol -> suggested position (Side.buy, Side.sell or None), for symbols with new candles
+        """
+        suggested_positions = {}
+        for symbol, new_candles in self.fetch_new_candles().items():
+            if len(new_candles) == 0:
+                continue
+            candles = self.candles[symbol]
+            candles.add(new_candles)  # the ring buffer evicts candles older than 30 days
+
+            engine = self.engines[symbol]
+            engine.update_candles(new_candles)
+            suggested_positions[symbol] = candles.suggested_position_type(engine.dataframe())
+        return suggested_positions
+
+    def run(self):
+        """
+        Evaluates every symbol each time new candles are released. Buy and sell signals are reported.
+        """
+        while True:
+            new_start_time = min(self.candles[symbol].closeTime[-1] for symbol in self.symbols)
+            print(add_spacing(f"Fetching new candles for {len(self.symbols)} symbols with start time: "
+                              f"{epoch_to_date(new_start_time)}"))
+
+            for symbol, suggested_position in self.tick().items():
+                if suggested_position in (Side.buy, Side.sell):
+                    print(add_spacing(f"{symbol} suggested position: {suggested_position}"))
+
+            sleep_until_next_candle_released(new_start_time)
+
+
+if __name__ == "__main__":
+    scheduler = MultiSymbolScheduler(["ETHUSDT", "BTCUSDT", "BNBUSDT"], 6, 12, units="days", test=False)
+    scheduler.initialise(days=30)
+    scheduler.run()
@@ -1,27 +1,42 @@
 import json
-import requests
 import os
+import threading
+
+import requests
+
+from src.notify.slack_dispatcher import SlackDispatcher
 
-auth_url = ""
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
 
 
 def google_mini_notify(text):
     requests.get("http://192.168.86.39:5000/say", params={"text": text})
 
 
-def slack_notify(text, channel='crypto-trading'):
-    global auth_url
-    if not auth_url:
-        with open(os.path.dirname(__file__) + "/../keys/slack-webhook.json") as f:
-            auth_url = json.loads(f.read())["auth_url"]
-    slack_payload = {"channel": f"#{channel}",
-                     "username": "dumbot",
-                     "text": "<!here> {}".format(text),
-                     "icon_emoji": ":slack:"}
-    requests.post(f"https://hooks.slack.com/services/{auth_url}",
-                  data=json.dumps(slack_payload))
+def slack_dispatcher() -> SlackDispatcher:
+    """
+    The dispatcher every Slack message of this process is sent through, created on first use
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            with open(os.path.dirname(__file__) + "/../keys/slack-webhook.json") as f:
+                auth_url = json.loads(f.read())["auth_url"]
+            _dispatcher = SlackDispatcher(f"https://hooks.slack.com/services/{auth_url}")
+    return _dispatcher
+
+
+def slack_notify(text, channel='crypto-trading', mention=True):
+    """
+    Queue a Slack message, sent in the background so the caller never waits on Slack
+
+    :param mention: Notify everyone active in the channel (@here), False for routine messages such as reports
+    """
+    slack_dispatcher().notify(text, channel, mention)
 
 
 if __name__ == "__main__":
     # google_mini_notify("stonks are through the roof right now!")
     slack_notify("Bot test", "crypto-trading")
+    slack_dispatcher().flush()
@@ -0,0 +1,74 @@
+import os
+
+from src.notify import notifier, slack_image_upload
+from src.utils.utils import format_markdown, create_image_from_dataframe
+
+
+class MarkdownReportRenderer:
+    """
+    Renders report tables (open orders, PnL) as a markdown code block sent as a Slack message.
+
+    Rendering is string formatting only, so it costs microseconds rather than the seconds a matplotlib table takes.
+    """
+
+    def render(self, df, name, title) -> str:
+        """
+        :param df: Table to render
+        :param name: Name of the report e.g. "open_orders"
+        :param title: Heading of the report e.g. "Open Orders"
+        :return: the report as markdown text
+        """
+        return f"*{title}*\n{format_markdown(df)}"
+
+    def publish(self, df, name, title, comment, channel="prod-data"):
+        """
+        Renders the table and sends it to Slack, without notifying the channel as reports are sent every few minutes
+
+        :param df: Table to report
+        :param name: Name of the report e.g. "open_orders"
+        :param title: Heading of the report e.g. "Open Orders"
+        :param comment: Summary line sent with the table e.g. "Number of Open Orders: 2"
+        :param channel: Channel name without the #
+        """
+        notifier.slack_notify(f"{comment}\n{self.render(df, name, title)}", channel, mention=False)
+
+
+class ImageReportRenderer:
+    """
+    Renders report tables as PNG images drawn with matplotlib and uploads them to Slack.
+
+    Drawing a table image takes seconds, so use it only when an image is wanted e.g.
+    client.position_summary(renderer=ImageReportRenderer())
+    """
+
+    def __init__(self, directory=None, dpi=200):
+        """
+        :param directory: Directory the images are saved to, defaults to src/live
+        :param dpi: Resolution of the images
+        """
+        self.directory = directory if directory is not None else os.path.dirname(
+            os.path.realpath(__file__)) + "/../live"
+        self.dpi = dpi
+
+    def render(self, df, name, title) -> str:
+        """
+        :param df: Table to render
+        :param name: Name of the report e.g. "open_orders"
+        :param title: Heading of the report e.g. "Open Orders"
+        :return: path of the saved image
+        """
+        file_path = f"{self.directory}/current_{name}_snapshot.png"
+        create_image_from_dataframe(df, file_path, title, dpi=self.dpi)
+        return file_path
+
+    def publish(self, df, name, title, comment, channel="prod-data"):
+        """
+        Renders the table and uploads the image to Slack
+
+        :param df: Table to report
+        :param name: Name of the report e.g. "open_orders"
+        :param title: Heading of the report e.g. "Open Orders"
+        :param comment: Summary line sent with the image e.g. "Number of Open Orders: 2"
+        :param channel: Channel name without the #
+        """
+        slack_image_upload.upload_image(self.render(df, name, title), title, comment, channel)
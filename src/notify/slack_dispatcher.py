@@ -0,0 +1,145 @@
+import atexit
+import json
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+
+class SlackDispatcher:
+    """
+    Sends Slack webhook messages from a background thread so callers (e.g. the order paths) never wait on Slack.
+
+    notify() only queues the message. Messages queued within batch_seconds of each other are sent as one post per
+    channel, apart from those without an @here mention, over one keep-alive session with timeouts. Failed posts are
+    retried with exponential backoff, honouring Slack's Retry-After when rate limited.
+    https://api.slack.com/messaging/webhooks
+    """
+
+    TIMEOUT = 5  # seconds waiting for Slack
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, webhook_url, batch_seconds=1.0, max_batch=20, max_attempts=4, base_delay=1.0,
+                 max_queue=1000, username="dumbot"):
+        """
+        :param webhook_url: Incoming webhook URL
+        :param batch_seconds: Time messages are gathered for after the first of a batch arrives
+        :param max_batch: Maximum messages in one batch
+        :param max_attempts: Attempts to send each post before it is dropped
+        :param base_delay: Seconds waited before the first retry, doubling each retry
+        :param max_queue: Messages held before new ones are dropped
+        :param username: Name the messages are posted as
+        """
+        self.webhook_url = webhook_url
+        self.batch_seconds = batch_seconds
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.username = username
+        self.session = requests.Session()
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        threading.Thread(target=self._run, name="slack-dispatcher", daemon=True).start()
+        atexit.register(self.flush, timeout=10)  # deliver what is queued before the process exits
+
+    def notify(self, text, channel='crypto-trading', mention=True):
+        """
+        Queue a message, returns immediately
+
+        :param text: Message text
+        :param channel: Channel name without the #
+        :param mention: Notify everyone active in the channel (@here), False for routine messages such as reports
+        """
+        try:
+            self._queue.put_nowait((channel, text, mention))
+        except queue.Full:
+            self.dropped += 1
+            print(f"Slack queue full, dropped message to #{channel}: {text}")
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Wait for every queued message to be sent (or given up on)
+
+        :return: True if the queue emptied within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                texts_by_post = OrderedDict()  # (channel, mention) in order of their first message
+                for channel, text, mention in batch:
+                    texts_by_post.setdefault((channel, mention), []).append(text)
+                for (channel, mention), texts in texts_by_post.items():
+                    self._post(channel, texts, mention)
+            except Exception as e:
+                # the thread must outlive any one batch, otherwise every later message is silently lost
+                self.failed += 1
+                print(f"Failed to send a batch of {len(batch)} Slack messages: {e!r}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _post(self, channel, texts, mention=True):
+        text = "\n".join(texts)
+        payload = {"channel": f"#{channel}",
+                   "username": self.username,
+                   "text": f"<!here> {text}" if mention else text,
+                   "icon_emoji": ":slack:"}
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = self.session.post(self.webhook_url, data=json.dumps(payload), timeout=self.TIMEOUT)
+                if response.status_code < 400:
+                    self.sent += 1
+                    return
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    print(f"Slack rejected message to #{channel} with status {response.status_code}: "
+                          f"{response.text}")
+                    break
+                delay = self.retry_delay(response.headers.get("Retry-After"), attempt)
+                print(f"Slack responded {response.status_code}, retrying in {delay} seconds")
+            except (requests.RequestException, ValueError) as e:
+                delay = self.backoff_delay(attempt)
+                print(f"Slack request failed ({e}), retrying in {delay} seconds")
+            if attempt < self.max_attempts:
+                time.sleep(delay)
+        self.failed += 1
+        print(f"Failed to send {len(texts)} messages to #{channel}")
+
+    def retry_delay(self, retry_after, attempts) -> float:
+        """
+        :param retry_after: Retry-After header, seconds or an HTTP date, None if not sent
+        :param attempts: Attempts made so far
+        :return: Seconds to wait, the backoff delay unless Retry-After is in seconds
+        """
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return self.backoff_delay(attempts)
+
+    def backoff_delay(self, attempts) -> float:
+        delay = self.base_delay * 2 ** (attempts - 1)
+        return random.uniform(delay / 2, delay)
@@ -1,22 +1,40 @@
+from __future__ import annotations
+
 import json
 import os
-
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 from src.notify import notifier
 
+if TYPE_CHECKING:
+    from slack_sdk import WebClient
+
 
 # If you're using this in production, you can change this back to INFO and add extra log entries as needed.
 # logging.basicConfig(level=logging.INFO)
 
 
+UPLOAD_TIMEOUT = 30  # seconds
+
+
+@lru_cache(maxsize=None)
+def slack_web_client() -> WebClient:
+    """
+    One WebClient for every upload, the token is read once
+    """
+    from slack_sdk import WebClient
+
+    with open(os.path.dirname(__file__) + "/../keys/slack-notifier-bot-oauth.json") as f:
+        SLACK_BOT_TOKEN = json.loads(f.read())["SLACK_BOT_TOKEN"]
+    return WebClient(SLACK_BOT_TOKEN, timeout=UPLOAD_TIMEOUT)
+
+
 def upload_image(file_path, title, comment, channel="crypto-trading"):
-    try:
-        with open(os.path.dirname(__file__) + "/../keys/slack-notifier-bot-oauth.json") as f:
-            SLACK_BOT_TOKEN = json.loads(f.read())["SLACK_BOT_TOKEN"]
+    from slack_sdk.errors import SlackApiError
 
-        client = WebClient(SLACK_BOT_TOKEN)
+    try:
+        client = slack_web_client()
 
         new_file_res = client.files_upload(
             channels=channel,
@@ -0,0 +1,150 @@
+"""
+Local stand-ins for the Binance REST API and kline WebSocket stream, serving generated klines so client code can be
+tested over real connections
+"""
+import base64
+import hashlib
+import json
+import socket
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from src.utils.utils import timeframe_to_epoch
+
+
+def generated_kline(open_time, interval):
+    price = f"{1000 + (open_time // interval) % 500:.8f}"
+    return [open_time, price, price, price, price, "1.00000000", open_time + interval - 1, price, 1, "0.5", "500.0",
+            "0"]
+
+
+class BinanceStub:
+    """
+    Serves /api/v3/klines for candles opening from first_open_time onwards. Responses obey startTime, endTime and
+    limit like Binance. Every request is recorded in self.requests.
+    """
+
+    def __init__(self, first_open_time=0, headers=None, keep_alive=True):
+        self.first_open_time = first_open_time
+        self.headers = headers or {}
+        self.keep_alive = keep_alive
+        self.requests = []
+        self.responses = []  # optional queue of (status, body) returned before generated klines
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                stub.requests.append((url.path, params))
+                if stub.responses:
+                    status, body = stub.responses.pop(0)
+                else:
+                    status, body = 200, stub.klines(params)
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in stub.headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+                # without keep alive the connection is dropped silently, like an idle connection reset by Binance
+                self.close_connection = not stub.keep_alive
+
+            do_POST = do_GET  # orders, answered from stub.responses
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def klines(self, params):
+        interval = timeframe_to_epoch(params["interval"])
+        start = max(int(params["startTime"]), self.first_open_time)
+        first_open = -(-start // interval) * interval  # candles open on interval boundaries
+        open_times = range(first_open, int(params["endTime"]) + 1, interval)
+        return [generated_kline(open_time, interval) for open_time in open_times][:int(params.get("limit", 500))]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def kline_event(open_time, interval, closed=True):
+    """
+    Kline stream message for the generated kline, closed=False for an update of a candle still open
+    """
+    kline = generated_kline(open_time, interval)
+    fields = ["t", "o", "h", "l", "c", "v", "T", "q", "n", "V", "Q", "B"]
+    k = dict(zip(fields, kline), s="ETHUSDT", i="1m", x=closed)
+    return json.dumps({"e": "kline", "E": open_time, "s": "ETHUSDT", "k": k})
+
+
+class KlineStreamStub:
+    """
+    Minimal WebSocket server. Each connection is sent the next list of messages in sessions then dropped without a
+    close frame, like a connection lost to Binance. Once sessions run out connections are held open silently.
+    """
+
+    WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.paths = []  # requested path of each connection
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.url = f"ws://127.0.0.1:{self.server.getsockname()[1]}"
+        self.open_connections = []
+
+    def serve(self):
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return  # server closed
+            self.handshake(connection)
+            if not self.sessions:
+                self.open_connections.append(connection)
+                continue
+            for message in self.sessions.pop(0):
+                connection.sendall(self.text_frame(message))
+            connection.close()
+
+    def handshake(self, connection):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            request += connection.recv(4096)
+        lines = request.decode().split("\r\n")
+        self.paths.append(lines[0].split(" ")[1])
+        headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+        digest = hashlib.sha1((headers["Sec-WebSocket-Key"] + self.WEBSOCKET_GUID).encode()).digest()
+        connection.sendall(("HTTP/1.1 101 Switching Protocols\r\n"
+                            "Upgrade: websocket\r\n"
+                            "Connection: Upgrade\r\n"
+                            f"Sec-WebSocket-Accept: {base64.b64encode(digest).decode()}\r\n\r\n").encode())
+
+    @staticmethod
+    def text_frame(message):
+        payload = message.encode()
+        if len(payload) < 126:
+            header = bytes([0x81, len(payload)])
+        else:
+            header = bytes([0x81, 126]) + len(payload).to_bytes(2, "big")
+        return header + payload  # frames from a server are not masked
+
+    def __enter__(self):
+        threading.Thread(target=self.serve, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.close()
+        for connection in self.open_connections:
+            connection.close()
@@ -0,0 +1,53 @@
+"""
+Local stand-in for a Slack incoming webhook, so notification code can be tested over real HTTP
+"""
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class SlackStub:
+    """
+    Accepts webhook posts and records each payload in self.posts. Optional queue of (status, headers) in
+    self.responses is returned before successful responses, and every response is delayed by delay seconds.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.posts = []
+        self.responses = []
+        self.connections = set()  # client ports, one per connection
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.connections.add(self.client_address[1])
+                time.sleep(stub.delay)
+                status, headers = stub.responses.pop(0) if stub.responses else (200, {})
+                if status == 200:
+                    stub.posts.append(json.loads(body))
+                content = b"ok" if status == 200 else b"error"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/services/test"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
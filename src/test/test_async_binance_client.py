@@ -0,0 +1,67 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.client.async_binance_client import AsyncBinanceClient
+from src.client.binance_client import BinanceClient
+
+
+def slow(result, seconds=0.3):
+    def call(*args, **kwargs):
+        time.sleep(seconds)
+        return result
+
+    return MagicMock(side_effect=call)
+
+
+class TestAsyncBinanceClient(unittest.TestCase):
+
+    def test_methods_are_awaitable_with_same_arguments(self):
+        client = BinanceClient()
+        client.account_balance_by_symbol = MagicMock(return_value=1.5)
+        async_client = AsyncBinanceClient(client)
+
+        balance = asyncio.run(async_client.account_balance_by_symbol("GBP", include_locked=True))
+
+        self.assertEqual(balance, 1.5)
+        client.account_balance_by_symbol.assert_called_once_with("GBP", include_locked=True)
+        self.assertTrue(async_client.test)  # plain attributes pass straight through
+
+    def test_independent_requests_run_concurrently(self):
+        client = BinanceClient()
+        client.account_balance_by_symbol = slow(1.5)
+        client.show_open_orders = slow("orders")
+        client.get_market_position = slow(0.1)
+        async_client = AsyncBinanceClient(client)
+
+        async def gather_all():
+            return await asyncio.gather(async_client.account_balance_by_symbol("ETH"),
+                                        async_client.show_open_orders(),
+                                        async_client.get_market_position())
+
+        start = time.perf_counter()
+        results = asyncio.run(gather_all())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(results, [1.5, "orders", 0.1])
+        self.assertLess(elapsed, 0.6)  # sequentially this takes 0.9 seconds
+
+    def test_snapshot(self):
+        client = BinanceClient()
+        client.position_summary = slow("summary")
+        client.show_open_orders = slow("orders")
+
+        start = time.perf_counter()
+        summary, orders = asyncio.run(AsyncBinanceClient(client).snapshot())
+
+        self.assertEqual((summary, orders), ("summary", "orders"))
+        self.assertLess(time.perf_counter() - start, 0.55)
+
+    def test_unknown_method_raises(self):
+        with self.assertRaises(AttributeError):
+            AsyncBinanceClient(BinanceClient()).not_a_method
+
+
+if __name__ == '__main__':
+    unittest.main()
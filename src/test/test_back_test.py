@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.back_test.back_test import back_test_crossover, BackTestResult
+from src.test.test_ma_crossover_engine import recorded_history
+
+
+def iterrows_back_test(df):
+    """
+    The original row by row PnL loop, kept as the reference implementation
+    """
+    buys = 0
+    sells = 0
+    PNL = None
+    last_pos = None
+    for index, row in df.iterrows():
+        if row['Position'] == 1:
+            if PNL is None:
+                PNL = 0
+            PNL -= row['Close']  # minus buys
+            buys += 1
+            last_pos = 'buy'
+        elif row['Position'] == -1:
+            if PNL is not None:
+                PNL += row['Close']  # add the sells
+                sells += 1
+                last_pos = 'sell'
+    if last_pos is not None:
+        if last_pos == 'buy':
+            last_row = df.iloc[-1]
+            PNL += last_row['Close']
+    return buys, sells, PNL
+
+
+def position_dataframe(positions, closes):
+    return pd.DataFrame({'Close': closes, 'Position': positions}, dtype=float)
+
+
+class TestBackTest(unittest.TestCase):
+
+    def assert_matches_loop(self, df):
+        buys, sells, pnl = iterrows_back_test(df)
+        result = back_test_crossover(df, "hours", 1, 2)
+
+        self.assertEqual((result.buys, result.sells), (buys, sells))
+        self.assertEqual(result.pnl, pnl)  # exact, not approximate
+
+    def test_matches_loop_on_history(self):
+        candles = recorded_history(20_000)
+        for short_window in range(1, 4):
+            for multiplier in range(2, 4):
+                df = candles.create_ma_crossover_dataframe(short_window, short_window * multiplier, "hours")
+                self.assert_matches_loop(df)
+
+    def test_sell_before_first_buy_is_ignored(self):
+        df = position_dataframe([np.nan, -1, 0, 1, 0, -1], [5, 7, 1, 2, 3, 4])
+
+        self.assert_matches_loop(df)
+        self.assertEqual(back_test_crossover(df, "hours", 1, 2).pnl, 2.0)
+
+    def test_ending_on_buy_fake_sells(self):
+        df = position_dataframe([np.nan, 1, -1, 1, 0], [1, 2, 3, 4, 10])
+
+        self.assert_matches_loop(df)
+        self.assertEqual(back_test_crossover(df, "hours", 1, 2).pnl, 7.0)
+
+    def test_no_buys(self):
+        df = position_dataframe([np.nan, 0, -1, 0], [1, 2, 3, 4])
+
+        self.assert_matches_loop(df)
+        self.assertEqual(back_test_crossover(df, "days", 1, 2), BackTestResult("days", 1, 2, 0, 0, None))
+
+    def test_result_output_line(self):
+        result = BackTestResult("hours", 1, 2, 4937, 4936, -871.5399999999909)
+
+        self.assertEqual(str(result), "Units=hours, Short=1, Long=2, Buys=4937, Sells=4936, PNL=-871.5399999999909")
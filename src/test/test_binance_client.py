@@ -5,7 +5,8 @@ from binance.spot import Spot
 
 from src.client.binance_client import BinanceClient
 from src.notify import notifier
-from src.utils.utils import Side, PositionType
+from src.types.symbol_filters import SymbolFilterTable
+from src.utils.utils import Side, PositionType, OrderType
 
 market_order_return_value = {
     "symbol": "BTCUSDT",
@@ -50,6 +51,66 @@ market_order_return_value = {
     ]
 }
 
+open_orders_return_value = [
+    {"orderId": 7, "symbol": "ETHGBP", "side": "SELL", "price": "1170.00", "origQty": "0.5", "executedQty": "0.0",
+     "status": "NEW", "timeInForce": "GTC", "type": "STOP_LOSS_LIMIT", "time": 1507725176595},
+    {"orderId": 8, "symbol": "ETHGBP", "side": "SELL", "price": "1500.00", "origQty": "0.1", "executedQty": "0.0",
+     "status": "NEW", "timeInForce": "GTC", "type": "LIMIT", "time": 1507725176595}
+]
+
+exchange_info_return_value = {
+    "symbols": [
+        {
+            "symbol": "ETHUSDT",
+            "baseAsset": "ETH",
+            "baseAssetPrecision": 8,
+            "quoteAsset": "USDT",
+            "quoteAssetPrecision": 8,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "1000000.00000000",
+                 "tickSize": "0.01000000"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00010000", "maxQty": "9000.00000000",
+                 "stepSize": "0.00010000"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00000000"}
+            ]
+        },
+        {
+            "symbol": "ETHGBP",
+            "baseAsset": "ETH",
+            "baseAssetPrecision": 8,
+            "quoteAsset": "GBP",
+            "quoteAssetPrecision": 8,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "1000000.00000000",
+                 "tickSize": "0.01000000"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00010000", "maxQty": "9000.00000000",
+                 "stepSize": "0.00010000"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00000000"}
+            ]
+        },
+        {
+            "symbol": "SOLUSDT",
+            "baseAsset": "SOL",
+            "baseAssetPrecision": 8,
+            "quoteAsset": "USDT",
+            "quoteAssetPrecision": 8,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "10000.00000000",
+                 "tickSize": "0.01000000"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00100000", "maxQty": "9000000.00000000",
+                 "stepSize": "0.00100000"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00000000"}
+            ]
+        }
+    ]
+}
+
+
+def with_filters(binance_client):
+    binance_client.symbol_filters = SymbolFilterTable(lambda: exchange_info_return_value)  # not cached to disk
+    return binance_client
+
+
 kline = [
     1499040000000,
     "0.01634790",
@@ -123,7 +184,7 @@ class TestBinanceClient(unittest.TestCase):
                 tested_binance_client.get_klines(timeframe="1m", hours=17)
 
     def test_market_order(self):
-        tested_binance_client = BinanceClient(test=True)
+        tested_binance_client = with_filters(BinanceClient(test=True))
 
         with patch.object(tested_binance_client, 'client', mocked_spot_class):
             self.assertEqual(tested_binance_client.client, mocked_spot_class)
@@ -152,7 +213,7 @@ class TestBinanceClient(unittest.TestCase):
             self.assertEqual(actual_position_type, expected_position_type)
 
     def test_get_account_balance_position_type_bought(self):
-        tested_binance_client = BinanceClient(test=True)
+        tested_binance_client = with_filters(BinanceClient(test=True))
 
         with patch.object(tested_binance_client, 'account_balance_by_symbol', new=account_balance_by_symbol_bought):
             actual_balance_position_type = tested_binance_client.get_account_balance_position_type()
@@ -161,10 +222,83 @@ class TestBinanceClient(unittest.TestCase):
             self.assertEqual(actual_balance_position_type, expected_balance_position_type)
 
     def test_get_account_balance_position_type_sold(self):
-        tested_binance_client = BinanceClient(test=True)
+        tested_binance_client = with_filters(BinanceClient(test=True))
 
         with patch.object(tested_binance_client, 'account_balance_by_symbol', new=account_balance_by_symbol_sold):
             actual_balance_position_type = tested_binance_client.get_account_balance_position_type()
             expected_balance_position_type = PositionType.sold
 
             self.assertEqual(actual_balance_position_type, expected_balance_position_type)
+
+    def test_account_cache_shared_within_cycle(self):
+        tested_binance_client = with_filters(BinanceClient(test=True))
+        account_spot_class = Spot()
+        account_spot_class.account = MagicMock(return_value={"balances": [
+            {"asset": "ETH", "free": "0.5", "locked": "0.25"}, {"asset": "GBP", "free": "100.0", "locked": "0.0"}]})
+        account_spot_class.new_order = MagicMock(return_value=market_order_return_value)
+
+        with patch.object(tested_binance_client, 'client', account_spot_class):
+            self.assertEqual(tested_binance_client.get_account_balance_position_type(include_locked=True),
+                             PositionType.bought)
+            self.assertEqual(tested_binance_client.account_balance_by_symbol("ETH"), 0.5)
+            self.assertEqual(tested_binance_client.account_balance_by_symbol("GBP"), 100.0)
+            self.assertEqual(account_spot_class.account.call_count, 1)
+            self.assertEqual(tested_binance_client.account_cache_stats(), {"hits": 2, "misses": 1})
+
+            # placing an order invalidates the cached balances
+            tested_binance_client.market_order(Side.sell, 0.5, "ETHUSDT")
+            tested_binance_client.account_balance_by_symbol("ETH")
+            self.assertEqual(account_spot_class.account.call_count, 2)
+
+            # and so does the TTL expiring
+            tested_binance_client._account_snapshot_time -= BinanceClient.ACCOUNT_CACHE_TTL
+            tested_binance_client.account_balance_by_symbol("ETH")
+            self.assertEqual(account_spot_class.account.call_count, 3)
+            self.assertEqual(tested_binance_client.account_cache_stats(), {"hits": 2, "misses": 3})
+
+    def test_orders_rounded_with_symbol_filters(self):
+        tested_binance_client = with_filters(BinanceClient(test=True))
+        order_spot_class = Spot()
+        order_spot_class.new_order = MagicMock(return_value=market_order_return_value)
+        order_spot_class.account = MagicMock(return_value={"balances": [
+            {"asset": "ETH", "free": "1.23456789", "locked": "0.0"}]})
+
+        with patch.object(tested_binance_client, 'client', order_spot_class):
+            tested_binance_client.market_order(Side.sell, 1.23456789)
+            self.assertEqual(order_spot_class.new_order.call_args.kwargs["quantity"], "1.2345")
+
+            tested_binance_client.place_stop_order(1234.5678)
+            stop_order = order_spot_class.new_order.call_args.kwargs
+            self.assertEqual(stop_order["quantity"], "1.2345")
+            self.assertEqual(stop_order["stopPrice"], "1234.57")
+            self.assertEqual(stop_order["price"], "1172.84")
+
+    def test_stop_order_prices_sent_in_fixed_point(self):
+        tested_binance_client = with_filters(BinanceClient(test=True))
+        order_spot_class = Spot()
+        order_spot_class.new_order = MagicMock(return_value=market_order_return_value)
+        order_spot_class.account = MagicMock(return_value={"balances": [
+            {"asset": "ETH", "free": "0.5", "locked": "0.0"}]})
+
+        with patch.object(tested_binance_client, 'client', order_spot_class):
+            tested_binance_client.place_stop_order(1234.5600000001)
+            tested_binance_client.place_limit_order(Side.buy, 0.1 + 0.2)
+
+        stop_order, limit_order = [call.kwargs for call in order_spot_class.new_order.call_args_list]
+        self.assertEqual({key: stop_order[key] for key in ("quantity", "stopPrice", "price")},
+                         {"quantity": "0.5000", "stopPrice": "1234.56", "price": "1172.83"})
+        self.assertEqual((limit_order["quantity"], limit_order["price"]), ("1.0000", "0.30"))
+
+    def test_open_order_ids_are_not_reported(self):
+        tested_binance_client = BinanceClient(test=False, report_renderer=MagicMock())
+        orders_spot_class = Spot()
+        orders_spot_class.get_open_orders = MagicMock(return_value=open_orders_return_value)
+
+        with patch.object(tested_binance_client, 'client', orders_spot_class):
+            self.assertEqual(tested_binance_client.get_open_order_ids(order_type_filter=OrderType.stop_loss_limit),
+                             [7])
+            tested_binance_client.report_renderer.publish.assert_not_called()
+
+            open_orders = tested_binance_client.show_open_orders()
+            tested_binance_client.report_renderer.publish.assert_called_once_with(
+                open_orders, "open_orders", "Open Orders", "Number of Open Orders: 2", "prod-data")
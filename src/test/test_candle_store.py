@@ -0,0 +1,103 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.types.candle_store import CandleStore, migrate_pickle
+from src.types.candlesticks import Candlesticks
+from src.utils.utils import one_minute_as_epoch
+
+
+def minute_candles(start, length):
+    open_time = start + np.arange(length) * one_minute_as_epoch
+    candles = Candlesticks(**{column: np.arange(length) + 0.5 for column in Candlesticks.COLUMNS})
+    candles.openTime = open_time
+    candles.closeTime = open_time + one_minute_as_epoch - 1
+    candles.numberOfTrades = np.arange(length, dtype=np.int32)
+    candles.candleTimeframe = "1m"
+    return candles
+
+
+class TestCandleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = CandleStore(os.path.join(self.directory.name, "history"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_empty_store(self):
+        self.assertEqual(len(self.store), 0)
+        self.assertIsNone(self.store.read())
+
+    def test_write_and_read(self):
+        candles = minute_candles(0, 100)
+        self.store.write(candles)
+
+        stored = self.store.read()
+        self.assertEqual(len(stored), 100)
+        self.assertEqual(stored.candleTimeframe, "1m")
+        for column, dtype in Candlesticks.COLUMNS.items():
+            self.assertEqual(getattr(stored, column).dtype, dtype)
+            np.testing.assert_array_equal(getattr(stored, column), getattr(candles, column))
+
+    def test_append_writes_only_new_candles(self):
+        self.store.write(minute_candles(0, 100))
+        close_path = os.path.join(self.store.path, "close.bin")
+        self.assertEqual(os.path.getsize(close_path), 100 * 8)
+
+        self.store.append(minute_candles(100 * one_minute_as_epoch, 50))
+
+        self.assertEqual(os.path.getsize(close_path), 150 * 8)
+        stored = self.store.read()
+        self.assertEqual(len(stored), 150)
+        self.assertEqual(stored.openTime[100], 100 * one_minute_as_epoch)
+        self.assertTrue(np.all(np.diff(stored.openTime) == one_minute_as_epoch))
+
+    def test_append_overlapping_candles_fails(self):
+        self.store.write(minute_candles(0, 100))
+
+        self.assertRaises(Exception, self.store.append, minute_candles(50 * one_minute_as_epoch, 10))
+        self.assertEqual(len(self.store), 100)
+
+    def test_append_different_timeframe_fails(self):
+        self.store.write(minute_candles(0, 10))
+        candles = minute_candles(10 * one_minute_as_epoch, 10)
+        candles.candleTimeframe = "15m"
+
+        self.assertRaises(Exception, self.store.append, candles)
+
+    def test_interrupted_append_is_discarded(self):
+        self.store.write(minute_candles(0, 10))
+        with open(os.path.join(self.store.path, "close.bin"), 'ab') as file:
+            file.write(b"\x00" * 24)  # records written without updating the metadata
+
+        self.assertEqual(len(self.store.read()), 10)
+        self.store.append(minute_candles(10 * one_minute_as_epoch, 5))
+
+        stored = self.store.read()
+        np.testing.assert_array_equal(stored.close[10:], minute_candles(0, 5).close)
+
+    def test_migrate_list_layout_pickle(self):
+        legacy = Candlesticks.__new__(Candlesticks)  # old objects held lists of the raw API strings
+        legacy.__dict__.update({column: [] for column in Candlesticks.COLUMNS})
+        legacy.openTime = [0, 60_000]
+        legacy.closeTime = [59_999, 119_999]
+        legacy.close = ["1.50000000", "2.25000000"]
+        legacy.numberOfTrades = [3, 4]
+        for column in ["open", "high", "low", "volume", "quoteAssetVolume", "takerBuyBaseAssetVolume",
+                       "takerBuyQuoteAssetVolume", "ignore"]:
+            setattr(legacy, column, ["0", "1"])
+        legacy.candleTimeframe = "1m"
+        pickle_path = os.path.join(self.directory.name, "candlestick_history.pkl")
+        with open(pickle_path, 'wb') as file:
+            pickle.dump(legacy, file)
+
+        migrated = migrate_pickle(pickle_path, self.store)
+
+        self.assertEqual(migrated.close.tolist(), [1.5, 2.25])
+        self.assertEqual(migrated.numberOfTrades.tolist(), [3, 4])
+        self.assertEqual(self.store.read().closeTime.tolist(), [59_999, 119_999])
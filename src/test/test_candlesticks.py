@@ -1,35 +1,62 @@
 import unittest
+from unittest.mock import patch
 
+import matplotlib.pyplot
+import numpy as np
 import pandas as pd
 
 from src.types.candlesticks import Candlesticks
-from src.utils.utils import Side
+from src.utils.utils import Side, one_minute_as_epoch, price_decimals
 
 
 def variable_length_candlesticks(length):
-    candles = Candlesticks()
-
     values = [i for i in range(1, length + 1)]
-
-    candles.openTime += values
-    candles.open += values
-    candles.high += values
-    candles.low += values
-    candles.close += values
-    candles.volume += values
-    candles.closeTime += values
-    candles.quoteAssetVolume += values
-    candles.numberOfTrades += values
-    candles.takerBuyBaseAssetVolume += values
-    candles.takerBuyQuoteAssetVolume += values
-    candles.ignore += values
+    return Candlesticks(**{column: values for column in Candlesticks.COLUMNS})
+
+
+def flat_history(length, seed=0):
+    """
+    2 d.p. prices like Binance's which mostly stay flat, so windows often have exactly equal means
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.where(rng.random(length) < 0.004, np.round(rng.normal(0, 3, length), 2), 0.0)
+    close = np.round(1834.17 + np.cumsum(steps), 2)
+    open_time = 1_674_650_400_000 + np.arange(length) * one_minute_as_epoch
+    candles = Candlesticks(openTime=open_time, close=close, closeTime=open_time + one_minute_as_epoch - 1)
+    candles.candleTimeframe = "1m"
     return candles
 
 
+def exact_signal(close, short_window, long_window):
+    """
+    Short > Long of the rolling means, compared exactly in integer cents
+    """
+    cumsum = np.concatenate(([0], np.cumsum(np.rint(np.asarray(close) * 100).astype(np.int64))))
+    short_sums = (cumsum[short_window:] - cumsum[:-short_window])[long_window - short_window:]
+    long_sums = cumsum[long_window:] - cumsum[:-long_window]
+    return np.where(short_sums * long_window > long_sums * short_window, 1.0, 0.0)
+
+
 def some_candle():
     return variable_length_candlesticks(1)
 
 
+kline = [
+    1499040000000,
+    "0.01634790",
+    "0.80000000",
+    "0.01575800",
+    "0.01577100",
+    "148976.11427815",
+    1499644799999,
+    "2434.19055334",
+    308,
+    "1756.87402397",
+    "28.46694368",
+    "17928899.62484339"
+]
+
+
 class TestCandlesticks(unittest.TestCase):
 
     def test_shorten_candles_success(self):
@@ -39,7 +66,7 @@ class TestCandlesticks(unittest.TestCase):
         candles.shorten(required_length)
 
         self.assertEqual(len(candles), required_length)
-        self.assertEqual(candles.open, [8, 9, 10])
+        self.assertEqual(candles.open.tolist(), [8, 9, 10])
 
     def test_shorten_candles_does_not_shorten_if_less_than_limit(self):
         starting_length = 3
@@ -49,7 +76,7 @@ class TestCandlesticks(unittest.TestCase):
         candles.shorten(required_length)
 
         self.assertEqual(len(candles), starting_length)
-        self.assertEqual(candles.open, [1, 2, 3])
+        self.assertEqual(candles.open.tolist(), [1, 2, 3])
 
     def test_shorten_fails_with_negative_value(self):
         starting_length = 5
@@ -167,25 +194,22 @@ class TestCandlesticks(unittest.TestCase):
         self.assertEqual(actual, 1)
 
     def test_add_candles(self):
-        candles1 = Candlesticks()
-        candles1.closeTime += [0]
+        candles1 = Candlesticks(closeTime=[0])
 
         candles2 = some_candle()
         candles1.add(candles2)
 
-        self.assertEqual(candles1.closeTime, [0, 1])
+        self.assertEqual(candles1.closeTime.tolist(), [0, 1])
 
     def test_add_candles_with_invalid_start_date_throws_exception(self):
-        candles1 = Candlesticks()
-        candles1.closeTime += [5]  # later closing time
+        candles1 = Candlesticks(closeTime=[5])  # later closing time
 
         candles2 = some_candle()
 
         self.assertRaises(Exception, candles1.add, candles2)
 
     def test_adding_candles_with_different_timeframes_fails(self):
-        candles1 = Candlesticks()
-        candles1.closeTime += [1]
+        candles1 = Candlesticks(closeTime=[1])
         candles1.candleTimeframe = "FOO"
 
         candles2 = some_candle()
@@ -208,3 +232,198 @@ class TestCandlesticks(unittest.TestCase):
         candles.candleTimeframe = '1m'
         actual = candles.suggested_position_type(df)
         self.assertEqual(actual, Side.sell)
+
+    def test_from_klines_parses_typed_columns(self):
+        candles = Candlesticks.from_klines([kline, kline], "1m")
+
+        self.assertEqual(len(candles), 2)
+        self.assertEqual(candles.candleTimeframe, "1m")
+        self.assertEqual(candles.openTime.dtype, np.int64)
+        self.assertEqual(candles.close.dtype, np.float64)
+        self.assertEqual(candles.numberOfTrades.dtype, np.int32)
+        self.assertEqual(candles.close.tolist(), [0.015771, 0.015771])
+        self.assertEqual(candles.closeTime[-1], 1499644799999)
+
+    def test_from_klines_empty(self):
+        candles = Candlesticks.from_klines([], "1m")
+
+        self.assertEqual(len(candles), 0)
+        self.assertEqual(candles.close.dtype, np.float64)
+
+    def test_shorten_candles_with_to_limit(self):
+        candles = variable_length_candlesticks(10)
+
+        candles.shorten(5, 2)
+
+        self.assertEqual(candles.open.tolist(), [6, 7, 8])
+        self.assertEqual(candles.closeTime.tolist(), [6, 7, 8])
+
+    def test_to_dataframe_does_not_copy(self):
+        candles = variable_length_candlesticks(5)
+
+        df = candles.to_dataframe()
+
+        self.assertEqual(list(df.columns), list(Candlesticks.COLUMNS))
+        self.assertTrue(np.shares_memory(df['close'].to_numpy(), candles.close))
+
+    def test_rolling_mean_matches_pandas(self):
+        rng = np.random.default_rng(51)
+        close = 2000 + np.cumsum(rng.normal(0, 5, 50_000))
+        candles = Candlesticks(close=close)
+
+        for window in [1, 2, 60, 1440, 50_000, 50_001]:
+            expected = pd.Series(close).rolling(window=window).mean().to_numpy()
+            np.testing.assert_allclose(candles.rolling_mean(window), expected, rtol=1e-12)
+
+    def test_rolling_mean_is_memoized(self):
+        candles = variable_length_candlesticks(10)
+
+        self.assertIs(candles.rolling_mean(3), candles.rolling_mean(3))
+        self.assertEqual(candles.rolling_mean(3).tolist()[2:5], [2.0, 3.0, 4.0])
+
+    def test_rolling_mean_invalidated_on_add_and_shorten(self):
+        candles = variable_length_candlesticks(3)
+        candles.candleTimeframe = "1m"
+        self.assertEqual(candles.rolling_mean(2)[-1], 2.5)
+
+        new_candle = Candlesticks(**{column: [10] for column in Candlesticks.COLUMNS})
+        new_candle.candleTimeframe = "1m"
+        candles.add(new_candle)
+        self.assertEqual(candles.rolling_mean(2)[-1], 6.5)
+
+        candles.shorten(3, 1)
+        self.assertEqual(candles.rolling_mean(2)[-1], 2.5)
+
+        candles.close = np.array([4.0, 8.0])
+        self.assertEqual(candles.rolling_mean(2)[-1], 6.0)
+
+    def test_flat_windows_signal_parity_with_pandas(self):
+        candles = flat_history(20_000)
+        close = pd.Series(candles.close)
+
+        for short_hours, long_hours in [(1, 2), (1, 3), (2, 5)]:
+            df = candles.create_ma_crossover_dataframe(short_hours, long_hours, "hours")
+            short_window, long_window = short_hours * 60, long_hours * 60
+            expected = exact_signal(candles.close, short_window, long_window)
+            pandas_signal = np.where(close.rolling(short_window).mean() > close.rolling(long_window).mean(), 1.0, 0.0)
+
+            self.assertGreater((expected[1:] != expected[:-1]).sum(), 20)  # must contain crossovers
+            np.testing.assert_array_equal(df['Signal'].to_numpy(), expected)
+            np.testing.assert_array_equal(df['Signal'].to_numpy(), pandas_signal[long_window - 1:])
+
+    def test_price_decimals(self):
+        self.assertEqual(price_decimals(np.array([1834.17, 1834.1, 1834.0])), 2)
+        self.assertEqual(price_decimals(np.array([0.00001234])), 8)
+        self.assertIsNone(price_decimals(np.array([1 / 3])))
+
+    def test_rolling_mean_invalid_window(self):
+        candles = variable_length_candlesticks(3)
+
+        self.assertRaises(ValueError, candles.rolling_mean, 0)
+
+    def test_time_slice_across_gap(self):
+        minute = 60_000
+        open_time = np.concatenate((np.arange(0, 60), np.arange(120, 180))) * minute  # one hour of maintenance
+        candles = Candlesticks(openTime=open_time, close=np.arange(120.0), closeTime=open_time + minute - 1)
+        candles.candleTimeframe = "1m"
+
+        last_hour = candles.time_slice(start=120 * minute)
+        self.assertEqual(len(last_hour), 60)
+        self.assertEqual(last_hour.openTime[0], 120 * minute)
+
+        around_gap = candles.time_slice(start=30 * minute, end=150 * minute)
+        self.assertEqual(len(around_gap), 60)
+        self.assertEqual(around_gap.close[[0, -1]].tolist(), [30.0, 89.0])
+        self.assertEqual(around_gap.candleTimeframe, "1m")
+
+    def test_time_slice_returns_views(self):
+        candles = variable_length_candlesticks(10)
+
+        sliced = candles.time_slice(3, 6)
+
+        self.assertEqual(sliced.openTime.tolist(), [3, 4, 5])
+        for column in Candlesticks.COLUMNS:
+            self.assertTrue(np.shares_memory(getattr(sliced, column), getattr(candles, column)))
+
+    def test_time_slice_outside_range(self):
+        candles = variable_length_candlesticks(10)
+
+        self.assertEqual(len(candles.time_slice(20, 30)), 0)
+        self.assertEqual(len(candles.time_slice(8, 2)), 0)
+        self.assertEqual(len(candles.time_slice()), 10)
+
+    def test_ring_buffer_evicts_oldest_candles(self):
+        candles = variable_length_candlesticks(3)
+        candles.candleTimeframe = "1m"
+        candles.enable_ring_buffer(capacity=5)
+
+        for first in range(4, 20, 2):
+            new_candles = Candlesticks(**{column: [first, first + 1] for column in Candlesticks.COLUMNS})
+            new_candles.candleTimeframe = "1m"
+            candles.add(new_candles)
+            expected = list(range(max(1, first + 2 - 5), first + 2))
+            self.assertEqual(candles.openTime.tolist(), expected)
+            self.assertEqual(candles.close.tolist(), expected)
+
+        self.assertEqual(len(candles), 5)
+        self.assertEqual(candles.rolling_mean(2).tolist()[-1], 18.5)
+        self.assertEqual(candles.openTime.dtype, np.int64)
+
+    def test_ring_buffer_adds_in_place(self):
+        candles = variable_length_candlesticks(10)
+        candles.candleTimeframe = "1m"
+        candles.enable_ring_buffer(capacity=10)
+        backing = candles.close.base
+
+        for value in range(11, 40):
+            new_candle = Candlesticks(**{column: [value] for column in Candlesticks.COLUMNS})
+            new_candle.candleTimeframe = "1m"
+            candles.add(new_candle)
+            self.assertIs(candles.close.base, backing)  # no reallocation
+            self.assertTrue(candles.close.flags.c_contiguous)
+
+        self.assertEqual(candles.close.tolist(), list(range(30, 40)))
+
+    def test_ring_buffer_keeps_last_candles_of_large_add(self):
+        candles = variable_length_candlesticks(2)
+        candles.candleTimeframe = "1m"
+        candles.enable_ring_buffer(capacity=4)
+
+        new_candles = Candlesticks(**{column: range(3, 13) for column in Candlesticks.COLUMNS})
+        new_candles.candleTimeframe = "1m"
+        candles.add(new_candles)
+
+        self.assertEqual(candles.openTime.tolist(), [9, 10, 11, 12])
+
+    def test_copy_is_detached(self):
+        candles = variable_length_candlesticks(3)
+        candles.candleTimeframe = "1m"
+        candles.enable_ring_buffer(capacity=3)
+
+        snapshot = candles.copy()
+        new_candle = Candlesticks(**{column: [4] for column in Candlesticks.COLUMNS})
+        new_candle.candleTimeframe = "1m"
+        candles.add(new_candle)
+
+        self.assertEqual(snapshot.open.tolist(), [1, 2, 3])
+        self.assertEqual(snapshot.candleTimeframe, "1m")
+        self.assertEqual(candles.open.tolist(), [2, 3, 4])
+
+    def test_crossover_graph_plots_markers_at_signals_only(self):
+        close = np.concatenate((np.full(10, 10.0), np.full(10, 20.0), np.full(10, 5.0)))
+        candles = Candlesticks(close=close, closeTime=np.arange(1, 31) * 3_600_000 - 1)
+        candles.candleTimeframe = "1h"
+        df = candles.create_ma_crossover_dataframe(2, 4, "hours")
+
+        with patch('matplotlib.pyplot') as plt:
+            candles.create_crossover_graph(2, 4, "hours", save=False)
+
+        markers = {call.kwargs['label']: call.args for call in plt.plot.call_args_list}
+        buy_x, buy_y = markers['buy'][:2]
+        sell_x, sell_y = markers['sell'][:2]
+        self.assertEqual(list(buy_x), list(df.index[df['Position'] == 1.0]))
+        self.assertEqual(list(buy_y), list(df['Short'][df['Position'] == 1.0]))
+        self.assertEqual(list(sell_x), list(df.index[df['Position'] == -1.0]))
+        self.assertEqual(list(sell_y), list(df['Long'][df['Position'] == -1.0]))
+        self.assertEqual((len(buy_x), len(sell_x)), (1, 1))
+        self.assertEqual(len(markers['Close Price'][0]), len(df))  # fewer candles than max_points
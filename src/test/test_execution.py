@@ -0,0 +1,161 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from binance.spot import Spot
+
+from src.client.binance_client import BinanceClient
+from src.client.execution import OrderExecutor, fill_summary
+from src.test.test_binance_client import with_filters, market_order_return_value
+
+buy_order_return_value = {
+    "symbol": "ETHUSDT",
+    "orderId": 30,
+    "transactTime": 1507725176595,
+    "status": "FILLED",
+    "type": "MARKET",
+    "side": "BUY",
+    "fills": [
+        {"price": "2000.00", "qty": "0.30000000", "commission": "0.00030000", "commissionAsset": "ETH"},
+        {"price": "2010.00", "qty": "0.20000000", "commission": "0.00020000", "commissionAsset": "ETH"}
+    ]
+}
+
+
+def stop_order(order_id):
+    return {"orderId": order_id, "symbol": "ETHUSDT", "type": "STOP_LOSS_LIMIT"}
+
+
+def trading_spot(balances, open_orders=()):
+    spot = Spot()
+    spot.account = MagicMock(return_value={"balances": balances})
+    spot.new_order = MagicMock(side_effect=lambda **params: buy_order_return_value if params["side"] == "BUY"
+                               else market_order_return_value)
+    spot.get_open_orders = MagicMock(return_value=list(open_orders))
+    spot.cancel_order = MagicMock(return_value={"status": "CANCELED"})
+    spot.cancel_and_replace = MagicMock(return_value={"newOrderResponse": market_order_return_value})
+    spot.avg_price = MagicMock()
+    return spot
+
+
+class TestOrderExecutor(unittest.TestCase):
+
+    def executor_with_spot(self, spot):
+        client = with_filters(BinanceClient(test=True))
+        client.client = spot
+        return OrderExecutor(client)
+
+    def test_fill_summary(self):
+        qty, wap, base_commission = fill_summary(buy_order_return_value['fills'], "ETH")
+
+        self.assertAlmostEqual(qty, 0.5)
+        self.assertAlmostEqual(wap, 2004.0)
+        self.assertAlmostEqual(base_commission, 0.0005)
+        self.assertEqual(fill_summary(market_order_return_value['fills'], "ETH")[2], 0)  # charged in USDT
+
+    def test_buy_places_stop_from_the_fills(self):
+        spot = trading_spot([{"asset": "USDT", "free": "1002.123456789", "locked": "0.0"}])
+        executor = self.executor_with_spot(spot)
+
+        report = executor.buy(signal_time=time.time() - 1)
+
+        buy_order, stop = [call.kwargs for call in spot.new_order.call_args_list]
+        self.assertEqual(buy_order, {"symbol": "ETHUSDT", "side": "BUY", "type": "MARKET",
+                                     "quoteOrderQty": "1002.12345678"})
+        self.assertEqual(stop, {"symbol": "ETHUSDT", "side": "SELL", "type": "STOP_LOSS_LIMIT", "timeInForce": "GTC",
+                                "quantity": "0.4995", "stopPrice": "1803.60", "price": "1713.42"})
+        spot.avg_price.assert_not_called()  # the stop is priced from the fills
+        self.assertEqual(spot.account.call_count, 1)
+        self.assertEqual((report.qty, report.wap), (0.5, 2004.0))
+        self.assertEqual(list(report.timestamps), ["signal", "decision", "order_sent", "order_response", "fill",
+                                                   "stop_sent", "stop_response", "published"])
+        self.assertEqual(report.timestamps["fill"], 1507725176.595)
+        latency = report.latency_ms()
+        self.assertGreaterEqual(latency["order_sent"], 1000)
+        self.assertLessEqual(latency["order_sent"], latency["stop_sent"])
+
+    def test_notified_after_the_orders(self):
+        spot = trading_spot([{"asset": "USDT", "free": "1000.0", "locked": "0.0"}])
+        client = with_filters(BinanceClient(test=False, symbol="ETHUSDT"))
+        client.client = spot
+        executor = OrderExecutor(client)
+
+        with patch('src.client.execution.notifier') as notifier:
+            notifier.slack_notify.side_effect = lambda *args: self.assertEqual(spot.new_order.call_count, 2)
+            executor.buy()
+
+        message, channel = notifier.slack_notify.call_args.args
+        self.assertEqual(notifier.slack_notify.call_count, 1)
+        self.assertTrue(message.startswith("BUY order filled. Qty: 0.5 price: 2004.0"))
+        self.assertEqual(channel, "prod-trades")
+
+    def test_failed_buy_is_reported(self):
+        executor = self.executor_with_spot(trading_spot([{"asset": "USDT", "free": "0.0", "locked": "0.0"}]))
+
+        with self.assertRaises(Exception):
+            executor.buy()
+
+        self.assertEqual(executor.reports[-1].error, "No USDT to buy ETHUSDT with")
+        executor.client.client.new_order.assert_not_called()
+
+    def test_sell_with_single_stop(self):
+        spot = trading_spot([{"asset": "ETH", "free": "0.0", "locked": "1.23456"}], open_orders=[stop_order(1234)])
+        executor = self.executor_with_spot(spot)
+
+        report = executor.sell()
+
+        self.assertEqual(spot.cancel_and_replace.call_args.kwargs,
+                         {"symbol": "ETHUSDT", "side": "SELL", "type": "MARKET", "cancelReplaceMode": "STOP_ON_FAILURE",
+                          "cancelOrderId": "1234", "quantity": "1.2345"})
+        spot.new_order.assert_not_called()
+        self.assertEqual(report.qty, 6.0)
+
+    def test_sell_with_no_stops(self):
+        spot = trading_spot([{"asset": "ETH", "free": "1.5", "locked": "0.0"}])
+        executor = self.executor_with_spot(spot)
+
+        executor.sell()
+
+        spot.cancel_order.assert_not_called()
+        spot.cancel_and_replace.assert_not_called()
+        self.assertEqual(spot.new_order.call_args.kwargs,
+                         {"symbol": "ETHUSDT", "side": "SELL", "type": "MARKET", "quantity": "1.5000"})
+
+    def test_sell_with_multiple_stops(self):
+        spot = trading_spot([{"asset": "ETH", "free": "1.5", "locked": "0.0"}],
+                            open_orders=[stop_order(123), stop_order(456),
+                                         {"orderId": 789, "symbol": "ETHUSDT", "type": "LIMIT"}])
+        executor = self.executor_with_spot(spot)
+
+        report = executor.sell()
+
+        self.assertEqual([call.kwargs["orderId"] for call in spot.cancel_order.call_args_list], [123, 456])
+        self.assertEqual(spot.new_order.call_args.kwargs["quantity"], "1.5000")
+        self.assertIn("stops_cancelled", report.timestamps)
+
+    def test_sell_stops_when_a_stop_is_not_cancelled(self):
+        spot = trading_spot([{"asset": "ETH", "free": "1.5", "locked": "0.0"}],
+                            open_orders=[stop_order(123), stop_order(456)])
+        spot.cancel_order = MagicMock(side_effect=[{"status": "CANCELED"}, {"status": "FILLED"}])
+        executor = self.executor_with_spot(spot)
+
+        with self.assertRaises(Exception):
+            executor.sell()
+
+        spot.new_order.assert_not_called()
+        self.assertEqual(executor.reports[-1].error, "Stop order 456 was not cancelled, status: FILLED")
+
+    def test_latency_stats(self):
+        spot = trading_spot([{"asset": "ETH", "free": "1.5", "locked": "0.0"}])
+        executor = self.executor_with_spot(spot)
+
+        executor.sell(signal_time=time.time() - 2)
+        executor.sell(signal_time=time.time() - 4)
+
+        stats = executor.latency_stats()
+        self.assertGreaterEqual(stats["order_sent"], 3000)
+        self.assertEqual(stats["signal"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import time
 import unittest
 
-from src.utils.utils import epoch_to_date, convert_to_hours, epoch_to_minutes
+import numpy as np
+import pandas as pd
+
+from src.utils.utils import epoch_to_date, convert_to_hours, epoch_to_minutes, epoch_to_datetime_index, \
+    min_max_decimation
 
 
 class TestHelpers(unittest.TestCase):
@@ -21,6 +27,44 @@ class TestHelpers(unittest.TestCase):
         expected_date = "2023-01-26 14:04:00"
         self.assertEqual(actual_date, expected_date)
 
+    def test_epoch_to_datetime_index(self):
+        index = epoch_to_datetime_index([1674650471000, 1674741839999])
+
+        self.assertIsInstance(index, pd.DatetimeIndex)
+        self.assertEqual(list(index.strftime('%Y-%m-%d %H:%M:%S')), ["2023-01-25 12:41:11", "2023-01-26 14:04:00"])
+
+    def test_epoch_to_datetime_index_matches_epoch_to_date_across_dst(self):
+        original_tz = os.environ.get("TZ")
+        # minutes either side of the UK clocks going forward, 2023-03-26 01:00 UTC
+        epochs = np.arange(1679788800000, 1679796000000, 60_000) + 59_999
+        try:
+            for tz in ["Europe/London", "America/New_York", "Australia/Lord_Howe"]:
+                os.environ["TZ"] = tz
+                time.tzset()
+                expected = [epoch_to_date(epoch) for epoch in epochs]
+                self.assertEqual(list(epoch_to_datetime_index(epochs).strftime('%Y-%m-%d %H:%M:%S')), expected)
+        finally:
+            if original_tz is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = original_tz
+            time.tzset()
+
+    def test_min_max_decimation_keeps_extremes(self):
+        rng = np.random.default_rng(18)
+        values = np.cumsum(rng.normal(0, 1, 43_200))
+
+        points = min_max_decimation(values, 2_000)
+
+        self.assertLessEqual(len(points), 2_002)
+        self.assertTrue(np.all(np.diff(points) > 0))
+        self.assertEqual((points[0], points[-1]), (0, len(values) - 1))
+        self.assertIn(np.argmin(values), points)
+        self.assertIn(np.argmax(values), points)
+
+    def test_min_max_decimation_short_input_unchanged(self):
+        self.assertEqual(min_max_decimation(np.arange(5.0), 10).tolist(), [0, 1, 2, 3, 4])
+
     def test_day_to_hour_conversion(self):
         window_min = 2
         window_max = 4
@@ -0,0 +1,74 @@
+import time
+import unittest
+from unittest.mock import MagicMock, call
+
+import numpy as np
+from binance.spot import Spot
+
+from src.client.binance_client import BinanceClient
+from src.client.rate_limiter import RequestWeightLimiter
+from src.test.binance_stub import BinanceStub
+from src.utils.utils import one_minute_as_epoch
+
+
+def start_minutes_ago(minutes):
+    return int(time.time() * 1000) - minutes * one_minute_as_epoch
+
+
+class TestKlineBackfill(unittest.TestCase):
+
+    def client_for(self, stub):
+        client = BinanceClient(test=True)
+        client.client = Spot(base_url=stub.url)
+        return client
+
+    def test_backfill_matches_serial_get_klines(self):
+        with BinanceStub() as stub:
+            client = self.client_for(stub)
+
+            start = start_minutes_ago(3_500)
+            serial = client.get_klines(startTime=start)
+            serial_requests = len(stub.requests)
+            concurrent = client.backfill_klines(startTime=start, workers=8)
+
+        self.assertGreater(len(serial), 2 * BinanceClient.KLINES_LIMIT)
+        self.assertGreater(serial_requests, 2)
+        # the range may grow by a candle between the two calls
+        np.testing.assert_array_equal(concurrent.openTime[:len(serial) - 1], serial.openTime[:-1])
+        np.testing.assert_array_equal(concurrent.close[:len(serial) - 1], serial.close[:-1])
+        self.assertTrue(np.all(np.diff(concurrent.openTime) == one_minute_as_epoch))
+        self.assertEqual(concurrent.candleTimeframe, "1m")
+
+    def test_backfill_pages_cover_range_without_overlap(self):
+        with BinanceStub() as stub:
+            client = self.client_for(stub)
+            start = start_minutes_ago(2_500)
+            client.backfill_klines(startTime=start, workers=4)
+
+        pages = sorted((int(params["startTime"]), int(params["endTime"])) for _, params in stub.requests)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0][0], start)
+        for (_, previous_end), (next_start, _) in zip(pages, pages[1:]):
+            self.assertEqual(next_start, previous_end + 1)
+        for start, end in pages:
+            self.assertLessEqual(end - start + 1, BinanceClient.KLINES_LIMIT * one_minute_as_epoch)
+
+    def test_backfill_deduplicates_overlapping_pages(self):
+        with BinanceStub() as stub:
+            client = self.client_for(stub)
+            # every page is returned twice to overlap
+            original_page = client._klines_page
+            client._klines_page = lambda *args: original_page(*args) * 2
+            candles = client.backfill_klines(startTime=start_minutes_ago(1_500), workers=2)
+
+        self.assertIn(len(candles), [1_500, 1_501])
+        self.assertTrue(np.all(np.diff(candles.openTime) == one_minute_as_epoch))
+
+    def test_backfill_counts_request_weight(self):
+        with BinanceStub() as stub:
+            client = self.client_for(stub)
+            client.limiter.acquire = MagicMock(wraps=client.limiter.acquire)
+            client.backfill_klines(startTime=start_minutes_ago(2_500), workers=4)
+
+        self.assertEqual(client.limiter.acquire.call_args_list,
+                         [call(RequestWeightLimiter.ENDPOINT_WEIGHTS["klines"])] * 3)
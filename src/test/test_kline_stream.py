@@ -0,0 +1,95 @@
+import itertools
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.client.kline_stream import KlineStream
+from src.test.binance_stub import KlineStreamStub, kline_event, generated_kline
+from src.types.candlesticks import Candlesticks
+from src.utils.utils import one_minute_as_epoch
+
+
+def rest_client(**kwargs):
+    return MagicMock(**{"kline_symbol": "ETHUSDT", **kwargs})
+
+
+def minute_open_time(minutes_from_now):
+    now = int(time.time() * 1000)
+    return (now // one_minute_as_epoch + minutes_from_now) * one_minute_as_epoch
+
+
+class TestKlineStream(unittest.TestCase):
+
+    def stream_for(self, stub, client):
+        return KlineStream(client, timeframe="1m", stream_url=stub.url, timeout=5)
+
+    def test_yields_only_closed_candles(self):
+        t0 = minute_open_time(60)  # opens after time now so there is nothing to gap fill
+        t1 = t0 + one_minute_as_epoch
+        session = [kline_event(t0, one_minute_as_epoch, closed=False),
+                   kline_event(t0, one_minute_as_epoch),
+                   kline_event(t1, one_minute_as_epoch, closed=False),
+                   kline_event(t1, one_minute_as_epoch)]
+        client = rest_client()
+        with KlineStreamStub([session]) as stub:
+            candles = list(itertools.islice(self.stream_for(stub, client).closed_candles(t0 - one_minute_as_epoch), 2))
+
+        self.assertEqual([c.openTime.tolist() for c in candles], [[t0], [t1]])
+        expected = Candlesticks.from_klines([generated_kline(t0, one_minute_as_epoch)], "1m")
+        for column, values in expected.columns().items():
+            np.testing.assert_array_equal(getattr(candles[0], column), values)
+        self.assertEqual(candles[0].candleTimeframe, "1m")
+        self.assertEqual(stub.paths, ["/ws/ethusdt@kline_1m"])
+        client.get_klines.assert_not_called()
+
+    def test_reconnect_gap_fills_missed_candles(self):
+        t0, t1, t2, t3 = (minute_open_time(minutes) for minutes in (-10, -9, -8, -7))
+        first_session = [kline_event(t0, one_minute_as_epoch)]  # then dropped while t1 and t2 close
+        second_session = [kline_event(t2, one_minute_as_epoch), kline_event(t3, one_minute_as_epoch)]
+        missed = Candlesticks.from_klines([generated_kline(t, one_minute_as_epoch) for t in (t1, t2)], "1m")
+        client = rest_client()
+        client.get_klines.side_effect = [Candlesticks(candleTimeframe="1m"), missed]
+
+        with KlineStreamStub([first_session, second_session]) as stub:
+            stream = self.stream_for(stub, client).closed_candles(t0 - one_minute_as_epoch)
+            candles = list(itertools.islice(stream, 3))
+            stream.close()
+
+        # t2 is pushed again after reconnecting but was already gap filled
+        self.assertEqual([c.openTime.tolist() for c in candles], [[t0], [t1, t2], [t3]])
+        self.assertEqual(len(stub.paths), 2)
+        self.assertEqual([c.kwargs["startTime"] for c in client.get_klines.call_args_list],
+                         [t0, t0 + one_minute_as_epoch])
+        self.assertEqual({c.kwargs["symbol"] for c in client.get_klines.call_args_list}, {"ETHUSDT"})
+
+    def test_gap_fill_drops_candle_still_open(self):
+        open_minute = minute_open_time(0)
+        klines = [generated_kline(t, one_minute_as_epoch) for t in (open_minute - one_minute_as_epoch, open_minute)]
+        client = rest_client()
+        client.get_klines.return_value = Candlesticks.from_klines(klines, "1m")
+        stream = KlineStream(client, stream_url="ws://unused")
+
+        candles = stream._gap_fill(open_minute - 2 * one_minute_as_epoch)
+
+        self.assertEqual(candles.openTime.tolist(), [open_minute - one_minute_as_epoch])
+
+    def test_default_stream_url_follows_client_environment(self):
+        self.assertEqual(KlineStream(rest_client(test=True)).url, "wss://testnet.binance.vision/ws/ethusdt@kline_1m")
+        self.assertEqual(KlineStream(rest_client(test=False), symbol="ETHGBP", timeframe="15m").url,
+                         "wss://stream.binance.com:9443/ws/ethgbp@kline_15m")
+
+    def test_gap_fill_requests_the_streamed_symbol(self):
+        client = rest_client(kline_symbol="BTCUSDT")
+        client.get_klines.return_value = Candlesticks(candleTimeframe="1m")
+        stream = KlineStream(client, stream_url="ws://unused")
+
+        stream._gap_fill(minute_open_time(-5))
+
+        self.assertEqual(stream.url, "ws://unused/ws/btcusdt@kline_1m")
+        self.assertEqual(client.get_klines.call_args.kwargs["symbol"], "BTCUSDT")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+root_path = str(Path(__file__).parent.parent.parent)
+
+HEAVY_MODULES = ["pandas", "matplotlib", "plotly", "slack_sdk"]
+
+
+def heavy_modules_loaded(module):
+    """
+    Heavy dependencies loaded by importing the module in a fresh interpreter
+    """
+    code = f"import sys, {module}; print(','.join(name for name in {HEAVY_MODULES} if name in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=root_path, capture_output=True, text=True, check=True)
+    return [name for name in output.stdout.strip().split(",") if name]
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_client_import_loads_no_heavy_modules(self):
+        self.assertEqual(heavy_modules_loaded("src.client.binance_client"), [])
+
+    def test_live_scripts_import_loads_no_heavy_modules(self):
+        self.assertEqual(heavy_modules_loaded("src.live.live_ma_crossover_notifier"), [])
+        self.assertEqual(heavy_modules_loaded("src.live.multi_symbol_scheduler"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.test.test_candlesticks import flat_history
+from src.types.candlesticks import Candlesticks
+from src.types.ma_crossover_engine import MACrossoverEngine
+from src.utils.utils import one_minute_as_epoch, Side
+
+
+def recorded_history(length, timeframe="1m"):
+    """
+    Deterministic random walk standing in for recorded price history
+    """
+    rng = np.random.default_rng(51)
+    close = 1500 + np.cumsum(rng.normal(0, 2, length))
+    open_time = 1_674_650_400_000 + np.arange(length) * one_minute_as_epoch
+    candles = Candlesticks(openTime=open_time, close=close, closeTime=open_time + one_minute_as_epoch - 1)
+    candles.candleTimeframe = timeframe
+    return candles
+
+
+def split(candles, at):
+    first = Candlesticks(openTime=candles.openTime[:at], close=candles.close[:at], closeTime=candles.closeTime[:at])
+    second = Candlesticks(openTime=candles.openTime[at:], close=candles.close[at:], closeTime=candles.closeTime[at:])
+    first.candleTimeframe = second.candleTimeframe = candles.candleTimeframe
+    return first, second
+
+
+class TestMACrossoverEngine(unittest.TestCase):
+
+    def assert_parity(self, engine_rows, expected):
+        self.assertEqual(list(engine_rows.index), list(expected.index))
+        np.testing.assert_allclose(engine_rows['Short'], expected['Short'], rtol=1e-10)
+        np.testing.assert_allclose(engine_rows['Long'], expected['Long'], rtol=1e-10)
+        np.testing.assert_array_equal(engine_rows['Close'], expected['Close'])
+        np.testing.assert_array_equal(engine_rows['Signal'], expected['Signal'])
+        np.testing.assert_array_equal(engine_rows['Position'], expected['Position'])
+
+    def test_parity_with_dataframe_over_history(self):
+        candles = recorded_history(6_000)
+        expected = candles.create_ma_crossover_dataframe(1, 3, "hours")
+
+        engine = MACrossoverEngine(60, 180, history=len(expected))
+        engine.update_candles(candles)
+
+        self.assertTrue((expected['Position'] != 0).sum() > 10)  # history must contain crossovers
+        self.assertEqual(list(engine.dataframe().columns), list(expected.columns))
+        self.assert_parity(engine.dataframe(), expected)
+
+    def test_flat_price_parity_with_pandas(self):
+        candles = flat_history(20_000)
+        close = pd.Series(candles.close)
+        short_mean, long_mean = close.rolling(60).mean(), close.rolling(180).mean()
+        signal = pd.Series(np.where(short_mean > long_mean, 1.0, 0.0))[179:]
+        expected = candles.create_ma_crossover_dataframe(1, 3, "hours")
+
+        engine = MACrossoverEngine(60, 180, history=len(expected))
+        engine.update_candles(candles)
+
+        self.assertTrue((expected['Position'] != 0).sum() > 20)  # flat history must contain crossovers
+        np.testing.assert_array_equal(engine.dataframe()['Signal'], signal)
+        np.testing.assert_array_equal(engine.dataframe()['Position'], signal.diff())
+        self.assert_parity(engine.dataframe(), expected)
+
+    def test_parity_when_streaming_new_candles(self):
+        candles = recorded_history(3_000)
+        seed, new_candles = split(candles, 2_500)
+        expected = candles.create_ma_crossover_dataframe(1, 2, "hours")
+
+        engine = seed.create_ma_crossover_engine(1, 2, "hours")
+        for i in range(len(new_candles)):
+            engine.update(new_candles.close[i], new_candles.closeTime[i])
+            self.assert_parity(engine.dataframe(), expected.iloc[:len(expected) - len(new_candles) + i + 1].tail(10))
+
+    def test_suggested_position_matches_dataframe(self):
+        candles = recorded_history(4_000)
+        expected = candles.create_ma_crossover_dataframe(1, 2, "hours")
+        engine = candles.create_ma_crossover_engine(1, 2, "hours")
+
+        self.assertEqual(candles.suggested_position_type(engine.dataframe()), candles.suggested_position_type(expected))
+
+    def test_no_rows_until_long_window_filled(self):
+        engine = MACrossoverEngine(2, 3)
+
+        self.assertIsNone(engine.update(1, 1))
+        self.assertIsNone(engine.update(2, 2))
+        self.assertEqual(len(engine.dataframe()), 0)
+
+        close_time, close, short, long, signal, position = engine.update(6, 3)
+        self.assertEqual((short, long, signal), (4.0, 3.0, 1.0))
+        self.assertTrue(np.isnan(position))
+
+    def test_crossover_position(self):
+        engine = MACrossoverEngine(1, 2)
+        for close_time, close in enumerate([1, 2, 3, 1]):
+            engine.update(close, close_time)
+
+        self.assertEqual(engine.dataframe()['Position'].tolist()[1:], [0.0, -1.0])
+        self.assertEqual(Candlesticks(candleTimeframe="1m").suggested_position_type(engine.dataframe()), Side.sell)
+
+    def test_invalid_window(self):
+        self.assertRaises(ValueError, MACrossoverEngine, 0, 2)
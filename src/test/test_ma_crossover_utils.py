@@ -5,7 +5,6 @@ from src.client.binance_client import BinanceClient
 from src.notify import notifier, slack_image_upload
 from src.types.candlesticks import Candlesticks
 from src.utils import ma_crossover_utils
-from src.utils.utils import Side, OrderType
 
 """
 GLOBAL MOCKS
@@ -19,64 +18,54 @@ ma_crossover_utils.notify_current_transaction = MagicMock(return_value="Not noti
 class TestMACrossoverUtils(unittest.TestCase):
 
     def test_ma_utils_buy(self):
-        mocked_binance_client = BinanceClient()
-        mocked_binance_client.market_order = MagicMock(return_value=None)
-        fiat_total_amount = float(10.0)
-        mocked_binance_client.account_balance_by_symbol = MagicMock(return_value=fiat_total_amount)
-        mocked_binance_client.cancel_all_open_orders_for_type = MagicMock(return_value=None)
-        mocked_binance_client.avg_price = MagicMock(return_value=float(1000.00))
-        mocked_binance_client.place_stop_order = MagicMock(return_value=None)
+        executor = MagicMock()
+        executor.buy.side_effect = lambda **kwargs: ma_crossover_utils.notify_current_transaction.assert_not_called()
+        ma_crossover_utils.notify_current_transaction.reset_mock()
 
-        ma_crossover_utils.buy(1, 2, "hours", None, mocked_binance_client)
+        ma_crossover_utils.buy(1, 2, "hours", None, BinanceClient(), executor, signal_time=1234.5)
 
-        mocked_binance_client.account_balance_by_symbol.assert_called_with("GBP")
-        mocked_binance_client.market_order.assert_called_with(Side.buy, fiat_total_amount)
-        mocked_binance_client.place_stop_order.assert_called_with(float(900.0))
+        executor.buy.assert_called_with(signal_time=1234.5)
+        self.assertTrue(ma_crossover_utils.notify_current_transaction.called)  # after the order
 
-    def test_ma_utils_sell_with_single_stop(self):
-        mocked_binance_client = BinanceClient()
-        order_id = 1234
-        mocked_binance_client.get_open_order_ids = MagicMock(return_value=[order_id])
-        crypto_total_amount = float(1.5)
-        mocked_binance_client.account_balance_by_symbol = MagicMock(return_value=crypto_total_amount)
-        mocked_binance_client.cancel_and_replace_with_sell = MagicMock(return_value=None)
+    def test_ma_utils_sell(self):
+        executor = MagicMock()
+        executor.sell.side_effect = lambda **kwargs: ma_crossover_utils.notify_current_transaction.assert_not_called()
+        ma_crossover_utils.notify_current_transaction.reset_mock()
 
-        ma_crossover_utils.sell(1, 2, "hours", None, mocked_binance_client)
+        ma_crossover_utils.sell(1, 2, "hours", None, BinanceClient(), executor, signal_time=1234.5)
 
-        mocked_binance_client.get_open_order_ids.assert_called_with(order_type_filter=OrderType.stop_loss_limit)
-        mocked_binance_client.account_balance_by_symbol.assert_called_with("ETH", include_locked=True)
-        mocked_binance_client.cancel_and_replace_with_sell.assert_called_with(order_id_to_cancel=order_id,
-                                                                              qty_to_sell=crypto_total_amount)
+        executor.sell.assert_called_with(signal_time=1234.5)
+        self.assertTrue(ma_crossover_utils.notify_current_transaction.called)
 
-    def test_ma_utils_sell_with_no_stops(self):
-        mocked_binance_client = BinanceClient()
-        mocked_binance_client.get_open_order_ids = MagicMock(return_value=[])
-        crypto_total_amount = float(1.5)
-        mocked_binance_client.cancel_all_open_orders_for_type = MagicMock(return_value=None)
-        mocked_binance_client.account_balance_by_symbol = MagicMock(return_value=crypto_total_amount)
-        mocked_binance_client.market_order = MagicMock(return_value=None)
+    def test_ma_utils_sell_failure_notified_once(self):
+        executor = MagicMock()
+        executor.sell.side_effect = Exception("TEST - order rejected")
+        notifier.slack_notify.reset_mock()
+        ma_crossover_utils.notify_current_transaction.reset_mock()
 
-        ma_crossover_utils.sell(1, 2, "hours", None, mocked_binance_client)
+        ma_crossover_utils.sell(1, 2, "hours", None, BinanceClient(), executor)
 
-        mocked_binance_client.cancel_all_open_orders_for_type.assert_called_with(OrderType.stop_loss_limit)
-        mocked_binance_client.get_open_order_ids.assert_called_with(order_type_filter=OrderType.stop_loss_limit)
-        mocked_binance_client.account_balance_by_symbol.assert_called_with("ETH")
-        mocked_binance_client.market_order.assert_called_with(Side.sell, crypto_total_amount)
+        notifier.slack_notify.assert_not_called()  # the executor sends its own failure, once
+        ma_crossover_utils.notify_current_transaction.assert_not_called()  # never reported as executed
 
-    def test_ma_utils_sell_with_multiple_stops(self):
-        mocked_binance_client = BinanceClient()
-        mocked_binance_client.get_open_order_ids = MagicMock(return_value=[123, 456])
-        crypto_total_amount = float(1.5)
-        mocked_binance_client.cancel_all_open_orders_for_type = MagicMock(return_value=None)
-        mocked_binance_client.account_balance_by_symbol = MagicMock(return_value=crypto_total_amount)
-        mocked_binance_client.market_order = MagicMock(return_value=None)
-
-        ma_crossover_utils.sell(1, 2, "hours", None, mocked_binance_client)
-
-        mocked_binance_client.get_open_order_ids.assert_called_with(order_type_filter=OrderType.stop_loss_limit)
-        mocked_binance_client.cancel_all_open_orders_for_type.assert_called_with(OrderType.stop_loss_limit)
-        mocked_binance_client.account_balance_by_symbol.assert_called_with("ETH")
-        mocked_binance_client.market_order.assert_called_with(Side.sell, crypto_total_amount)
+    def test_ma_utils_failure_to_create_executor_notified(self):
+        client = BinanceClient()
+        client.filters = MagicMock(side_effect=Exception("TEST - exchange info unavailable"))
+        notifier.slack_notify.reset_mock()
+
+        ma_crossover_utils.buy(1, 2, "hours", None, client)
+
+        notifier.slack_notify.assert_called_once_with("MA Crossover buy process failed - please investigate!!",
+                                                      "prod-trades")
+
+    def test_ma_utils_buy_failure_not_reported_as_executed(self):
+        executor = MagicMock()
+        executor.buy.side_effect = Exception("TEST - no USDT to buy with")
+        ma_crossover_utils.notify_current_transaction.reset_mock()
+
+        ma_crossover_utils.buy(1, 2, "hours", None, BinanceClient(), executor)
+
+        ma_crossover_utils.notify_current_transaction.assert_not_called()
 
     def test_send_update_snapshot(self):
         mocked_binance_client = BinanceClient()
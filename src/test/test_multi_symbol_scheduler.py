@@ -0,0 +1,61 @@
+import time
+import unittest
+
+from binance.spot import Spot
+
+from src.client.binance_client import BinanceClient
+from src.live.multi_symbol_scheduler import MultiSymbolScheduler
+from src.test.binance_stub import BinanceStub
+from src.test.test_binance_client import with_filters
+from src.utils.utils import one_minute_as_epoch, Side
+
+SYMBOLS = ["ETHUSDT", "BTCUSDT", "BNBUSDT"]
+
+
+class TestMultiSymbolScheduler(unittest.TestCase):
+
+    def scheduler_for(self, stub):
+        client = BinanceClient(test=True)
+        client.client = Spot(base_url=stub.url)
+        return MultiSymbolScheduler(SYMBOLS, 1, 2, "hours", client=client)
+
+    def test_initialise_fetches_every_symbol(self):
+        with BinanceStub() as stub:
+            scheduler = self.scheduler_for(stub)
+            scheduler.initialise(minutes=300)
+
+        self.assertEqual(sorted(params["symbol"] for _, params in stub.requests), sorted(SYMBOLS))
+        for symbol in SYMBOLS:
+            self.assertGreaterEqual(len(scheduler.candles[symbol]), 300)
+            self.assertEqual(scheduler.candles[symbol].candleTimeframe, "1m")
+
+    def test_tick_adds_new_candles_of_every_symbol(self):
+        with BinanceStub() as stub:
+            scheduler = self.scheduler_for(stub)
+            history = scheduler.client.get_klines(minutes=300)
+            behind = int(time.time() * 1000) - 5 * one_minute_as_epoch
+            for symbol in SYMBOLS:
+                scheduler.add_symbol(symbol, history.time_slice(end=behind))
+            stub.requests.clear()
+
+            suggested_positions = scheduler.tick()
+
+        self.assertEqual(sorted(params["symbol"] for _, params in stub.requests), sorted(SYMBOLS))
+        self.assertEqual(sorted(suggested_positions), sorted(SYMBOLS))
+        for symbol in SYMBOLS:
+            self.assertIn(suggested_positions[symbol], (Side.buy, Side.sell, None))
+            candles = scheduler.candles[symbol]
+            self.assertGreaterEqual(candles.openTime[-1], behind)
+            self.assertEqual(scheduler.engines[symbol].dataframe().index[-1],
+                             scheduler.candles[symbol].create_ma_crossover_dataframe(1, 2, "hours").index[-1])
+
+    def test_client_symbol(self):
+        self.assertEqual(BinanceClient(test=True).symbol, "ETHUSDT")
+        self.assertEqual(BinanceClient(test=False).symbol, "ETHGBP")
+        client = BinanceClient(test=True, symbol="BTCUSDT", base_asset="BTC")
+        self.assertEqual((client.symbol, client.kline_symbol, client.base_asset), ("BTCUSDT", "BTCUSDT", "BTC"))
+        self.assertEqual(with_filters(BinanceClient(test=True, symbol="SOLUSDT")).base_asset, "SOL")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+from binance.error import ClientError
+from binance.spot import Spot
+
+from src.client.binance_client import BinanceClient
+from src.client.rate_limiter import RequestWeightLimiter
+from src.test.binance_stub import BinanceStub
+
+
+class TestRequestWeightLimiter(unittest.TestCase):
+
+    def test_acquire_within_limit_does_not_wait(self):
+        limiter = RequestWeightLimiter(weight_limit=10, window_seconds=60)
+
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire(2)
+
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(limiter.used_weight, 10)
+
+    def test_acquire_over_limit_waits_for_next_window(self):
+        limiter = RequestWeightLimiter(weight_limit=3, window_seconds=0.2)
+        limiter.acquire(2)
+        window = limiter._window
+
+        limiter.acquire(2)
+
+        self.assertGreater(limiter._window, window)
+        self.assertEqual(limiter.used_weight, 2)
+
+    def test_weight_above_limit_fails(self):
+        limiter = RequestWeightLimiter(weight_limit=3)
+
+        self.assertRaises(ValueError, limiter.acquire, 4)
+
+    def test_call_retries_connection_errors_with_backoff(self):
+        limiter = RequestWeightLimiter(base_delay=0.01)
+        function = MagicMock(side_effect=[ConnectionError("TEST"), requests.exceptions.Timeout("TEST"), "response"])
+
+        self.assertEqual(limiter.call("klines", function, symbol="ETHUSDT"), "response")
+        self.assertEqual(function.call_count, 3)
+        function.assert_called_with(symbol="ETHUSDT")
+        self.assertEqual(limiter.used_weight, 3 * RequestWeightLimiter.ENDPOINT_WEIGHTS["klines"])
+
+    def test_call_gives_up_after_max_attempts(self):
+        limiter = RequestWeightLimiter(max_attempts=3, base_delay=0.01)
+        function = MagicMock(side_effect=ConnectionError("TEST"))
+
+        self.assertRaises(Exception, limiter.call, "account", function)
+        self.assertEqual(function.call_count, 3)
+
+    def test_orders_are_not_retried_on_connection_errors(self):
+        limiter = RequestWeightLimiter(base_delay=0.01)
+        function = MagicMock(side_effect=ConnectionError("TEST"))
+
+        self.assertRaises(ConnectionError, limiter.call, "new_order", function)
+        self.assertEqual(function.call_count, 1)
+
+    def test_other_client_errors_are_not_retried(self):
+        limiter = RequestWeightLimiter(base_delay=0.01)
+        function = MagicMock(side_effect=ClientError(400, -2010, "Account has insufficient balance", {}))
+
+        self.assertRaises(ClientError, limiter.call, "new_order", function)
+        self.assertEqual(function.call_count, 1)
+
+    def test_rate_limited_call_waits_for_retry_after(self):
+        limiter = RequestWeightLimiter(base_delay=0.01)
+        function = MagicMock(side_effect=[ClientError(429, -1003, "Too many requests", {"Retry-After": "0.3"}),
+                                          "response"])
+
+        start = time.monotonic()
+        self.assertEqual(limiter.call("new_order", function), "response")
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+
+    def test_backoff_delay_grows_with_jitter(self):
+        limiter = RequestWeightLimiter(base_delay=1, max_delay=8)
+
+        for attempts, (low, high) in enumerate([(0.5, 1), (1, 2), (2, 4), (4, 8), (4, 8)], start=1):
+            delay = limiter.backoff_delay(attempts)
+            self.assertTrue(low <= delay <= high, f"{delay} not within {low} and {high}")
+
+    def test_used_weight_synced_from_response_headers(self):
+        with BinanceStub(headers={"X-MBX-USED-WEIGHT-1M": "1234"}) as stub:
+            client = BinanceClient(test=True)
+            client.client = Spot(base_url=stub.url)
+            client.client.session.hooks["response"].append(client.limiter.response_hook)
+
+            client.get_klines(minutes=5)
+
+        self.assertEqual(client.limiter.used_weight, 1234)
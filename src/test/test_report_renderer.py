@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.notify.report_renderer import MarkdownReportRenderer, ImageReportRenderer
+
+open_orders = pd.DataFrame([["ETHGBP", 7, "SELL", 1170.0, "STOP_LOSS_LIMIT"]],
+                           columns=["Symbol", "OrderId", "Side", "Price", "Type"]).set_index("Symbol")
+
+
+class TestReportRenderer(unittest.TestCase):
+
+    def test_markdown_report(self):
+        report = MarkdownReportRenderer().render(open_orders, "open_orders", "Open Orders")
+
+        lines = report.split("\n")
+        self.assertEqual(lines[:2], ["*Open Orders*", "```"])
+        self.assertEqual(lines[-1], "```")
+        self.assertIn("STOP_LOSS_LIMIT", report)
+        self.assertIn("1170", report)
+
+    @patch('src.notify.report_renderer.notifier')
+    def test_markdown_report_published_as_message(self, notifier):
+        MarkdownReportRenderer().publish(open_orders, "open_orders", "Open Orders", "Number of Open Orders: 1")
+
+        text, channel = notifier.slack_notify.call_args.args
+        self.assertTrue(text.startswith("Number of Open Orders: 1\n*Open Orders*\n```"))
+        self.assertEqual(channel, "prod-data")
+        self.assertEqual(notifier.slack_notify.call_args.kwargs, {"mention": False})  # reports never ping @here
+
+    @patch('src.notify.report_renderer.slack_image_upload')
+    def test_image_report_uploaded(self, slack_image_upload):
+        with tempfile.TemporaryDirectory() as directory:
+            ImageReportRenderer(directory, dpi=50).publish(open_orders, "open_orders", "Open Orders",
+                                                           "Number of Open Orders: 1")
+            file_path = f"{directory}/current_open_orders_snapshot.png"
+
+            self.assertTrue(os.path.exists(file_path))
+            slack_image_upload.upload_image.assert_called_once_with(file_path, "Open Orders",
+                                                                    "Number of Open Orders: 1", "prod-data")
+
+
+if __name__ == '__main__':
+    unittest.main()
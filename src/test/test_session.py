@@ -0,0 +1,65 @@
+import unittest
+
+from binance.spot import Spot
+
+from src.client.binance_client import BinanceClient
+from src.client.session import InstrumentedHTTPAdapter
+from src.test.binance_stub import BinanceStub
+from src.test.test_binance_client import market_order_return_value
+
+
+def client_for(stub):
+    client = BinanceClient(test=True)
+    client.client = Spot(base_url=stub.url, timeout=BinanceClient.TIMEOUT)
+    client.session_adapter = InstrumentedHTTPAdapter()
+    client.client.session.mount("http://", client.session_adapter)
+    return client
+
+
+class TestSession(unittest.TestCase):
+
+    def test_client_session_reuses_connection(self):
+        with BinanceStub() as stub:
+            client = client_for(stub)
+            for _ in range(3):
+                client.get_klines(minutes=5)
+
+            stats = client.connection_stats()
+
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused_connections"], 2)
+        self.assertEqual(stats["latency_ms"]["/api/v3/klines"]["count"], 3)
+
+    def test_dropped_connections_are_replaced(self):
+        with BinanceStub(keep_alive=False) as stub:
+            client = client_for(stub)
+            candles = [client.get_klines(minutes=5) for _ in range(3)]
+
+            stats = client.connection_stats()
+
+        self.assertTrue(all(len(c) > 0 for c in candles))
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 3)
+
+    def test_order_after_a_dropped_connection_opens_a_new_one(self):
+        with BinanceStub(keep_alive=False) as stub:
+            client = client_for(stub)
+            client.client = Spot(key="key", secret="secret", base_url=stub.url, timeout=BinanceClient.TIMEOUT)
+            client.client.session.mount("http://", client.session_adapter)
+            client.get_klines(minutes=5)
+            stub.responses = [(200, market_order_return_value)]
+
+            response = client.request("new_order", symbol="ETHUSDT", side="SELL", type="MARKET", quantity="0.5000")
+
+            stats = client.connection_stats()
+
+        self.assertEqual(response, market_order_return_value)
+        self.assertEqual(stub.requests[-1][0], "/api/v3/order")
+        self.assertEqual((stats["requests"], stats["new_connections"]), (2, 2))
+
+    def test_binance_client_mounts_instrumented_adapter(self):
+        client = BinanceClient(test=True)
+
+        self.assertIs(client.client.session.get_adapter("https://testnet.binance.vision"), client.session_adapter)
+        self.assertEqual(client.client.timeout, BinanceClient.TIMEOUT)
@@ -0,0 +1,128 @@
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from src.notify.slack_dispatcher import SlackDispatcher
+from src.test.slack_stub import SlackStub
+
+
+class TestSlackDispatcher(unittest.TestCase):
+
+    def test_notify_does_not_wait_on_slack(self):
+        with SlackStub(delay=0.5) as stub:
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0)
+
+            start = time.perf_counter()
+            dispatcher.notify("MA Crossover buy process executed", "prod-trades")
+            self.assertLess(time.perf_counter() - start, 0.1)
+
+            self.assertTrue(dispatcher.flush(timeout=5))
+
+        self.assertEqual(stub.posts, [{"channel": "#prod-trades", "username": "dumbot",
+                                       "text": "<!here> MA Crossover buy process executed", "icon_emoji": ":slack:"}])
+
+    def test_burst_is_batched_per_channel(self):
+        with SlackStub() as stub:
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0.3)
+            for i in range(5):
+                dispatcher.notify(f"trade {i}", "prod-trades")
+                dispatcher.notify(f"data {i}", "prod-data")
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual([post["channel"] for post in stub.posts], ["#prod-trades", "#prod-data"])
+        self.assertEqual(stub.posts[0]["text"], "<!here> trade 0\ntrade 1\ntrade 2\ntrade 3\ntrade 4")
+        self.assertEqual(stub.posts[1]["text"], "<!here> data 0\ndata 1\ndata 2\ndata 3\ndata 4")
+        self.assertEqual(len(stub.connections), 1)  # one keep-alive session
+        self.assertEqual(dispatcher.sent, 2)
+
+    def test_messages_without_mention_are_posted_apart(self):
+        with SlackStub() as stub:
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0.3)
+            dispatcher.notify("PnL Tables", "prod-data", mention=False)
+            dispatcher.notify("Stop order failed", "prod-data")
+            dispatcher.notify("Open Orders", "prod-data", mention=False)
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual([post["text"] for post in stub.posts],
+                         ["PnL Tables\nOpen Orders", "<!here> Stop order failed"])
+
+    def test_batches_are_limited_in_size(self):
+        with SlackStub() as stub:
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0.3, max_batch=2)
+            for i in range(5):
+                dispatcher.notify(f"trade {i}")
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual([post["text"].count("trade") for post in stub.posts], [2, 2, 1])
+
+    def test_retries_server_errors_and_rate_limits(self):
+        with SlackStub() as stub:
+            stub.responses = [(500, {}), (429, {"Retry-After": "0"})]
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0, base_delay=0.01)
+            dispatcher.notify("Cancelled order ID 1")
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual(len(stub.posts), 1)
+        self.assertEqual((dispatcher.sent, dispatcher.failed), (1, 0))
+
+    def test_retry_after_as_http_date_falls_back_to_backoff(self):
+        with SlackStub() as stub:
+            stub.responses = [(429, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})]
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0, base_delay=0.01)
+            dispatcher.notify("Rate limited")
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual((dispatcher.sent, dispatcher.failed), (1, 0))
+
+    def test_later_messages_delivered_after_a_failed_post(self):
+        with SlackStub() as stub:
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0, max_attempts=1)
+            post = dispatcher.session.post
+            failures = [requests.exceptions.ChunkedEncodingError("Connection broken"), RuntimeError("unexpected")]
+
+            def failing_post(*args, **kwargs):
+                if failures:
+                    raise failures.pop(0)
+                return post(*args, **kwargs)
+
+            with patch.object(dispatcher.session, "post", side_effect=failing_post):
+                for text in ["first", "second", "third"]:
+                    dispatcher.notify(text)
+                self.assertTrue(dispatcher.flush(timeout=5))
+
+        self.assertEqual([post["text"] for post in stub.posts], ["<!here> third"])
+        self.assertEqual((dispatcher.sent, dispatcher.failed), (1, 2))
+
+    def test_gives_up_after_max_attempts(self):
+        with SlackStub() as stub:
+            stub.responses = [(503, {})] * 3
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0, max_attempts=3, base_delay=0.01)
+            dispatcher.notify("No live orders")
+            dispatcher.notify("Next message")
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual((dispatcher.sent, dispatcher.failed), (1, 1))
+        self.assertEqual(stub.posts[0]["text"], "<!here> Next message")
+
+    def test_client_errors_are_not_retried(self):
+        with SlackStub() as stub:
+            stub.responses = [(400, {})]
+            dispatcher = SlackDispatcher(stub.url, batch_seconds=0, base_delay=0.01)
+            dispatcher.notify("invalid")
+            dispatcher.flush(timeout=5)
+
+        self.assertEqual((dispatcher.sent, dispatcher.failed, len(stub.responses)), (0, 1, 0))
+
+    def test_unreachable_slack_is_retried_then_dropped(self):
+        dispatcher = SlackDispatcher("http://127.0.0.1:9/services/test", batch_seconds=0, max_attempts=2,
+                                     base_delay=0.01)
+        dispatcher.notify("Bot test")
+
+        self.assertTrue(dispatcher.flush(timeout=5))
+        self.assertEqual(dispatcher.failed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.utils.snapshot_worker import SnapshotWorker
+
+
+class TestSnapshotWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = SnapshotWorker(max_queue=2)
+        self.release = threading.Event()
+        self.blocking_job = MagicMock(side_effect=lambda: self.release.wait(5))
+
+    def tearDown(self):
+        self.release.set()
+        self.worker.stop(timeout=5)
+
+    def block_worker(self):
+        self.worker.submit("block", self.blocking_job)
+        while not self.worker.metrics()["running"]:
+            time.sleep(0.001)
+
+    def test_submit_returns_before_job_runs(self):
+        self.block_worker()
+        job = MagicMock()
+
+        start = time.perf_counter()
+        self.worker.submit("snapshot", job, 1, units="days")
+        self.assertLess(time.perf_counter() - start, 0.1)
+        job.assert_not_called()
+
+        self.release.set()
+        self.assertTrue(self.worker.join(timeout=5))
+        job.assert_called_once_with(1, units="days")
+        self.assertNotEqual(threading.current_thread().name, "snapshot-worker")
+
+    def test_waiting_jobs_with_same_key_are_coalesced(self):
+        self.block_worker()
+        job = MagicMock()
+        for minute in [10, 20, 30]:
+            self.worker.submit("snapshot", job, minute)
+        self.assertEqual(self.worker.metrics()["queue_depth"], 1)
+
+        self.release.set()
+        self.worker.join(timeout=5)
+
+        job.assert_called_once_with(30)  # only the latest snapshot is rendered
+        metrics = self.worker.metrics()
+        self.assertEqual((metrics["submitted"], metrics["coalesced"], metrics["completed"]), (4, 2, 2))
+
+    def test_full_queue_drops_oldest_job(self):
+        self.block_worker()
+        jobs = [MagicMock() for _ in range(3)]
+        for i, job in enumerate(jobs):
+            self.worker.submit(f"report-{i}", job)
+
+        self.release.set()
+        self.worker.join(timeout=5)
+
+        jobs[0].assert_not_called()
+        jobs[1].assert_called_once()
+        jobs[2].assert_called_once()
+        self.assertEqual(self.worker.metrics()["dropped"], 1)
+
+    def test_failed_job_does_not_stop_worker(self):
+        self.worker.submit("failing", MagicMock(side_effect=Exception("TEST - upload failed"), __name__="failing"))
+        job = MagicMock()
+        self.worker.submit("snapshot", job)
+        self.worker.join(timeout=5)
+
+        job.assert_called_once()
+        metrics = self.worker.metrics()
+        self.assertEqual((metrics["failed"], metrics["completed"], metrics["queue_depth"]), (1, 1, 0))
+        self.assertIsNotNone(metrics["mean_latency_ms"])
+
+    def test_submit_after_stop_raises(self):
+        self.worker.stop(timeout=5)
+        with self.assertRaises(Exception):
+            self.worker.submit("snapshot", MagicMock())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from src.back_test.back_test import back_test_crossover, BackTestResult
+from src.back_test.sweep import parameter_grid, run_sweep, append_sweep_result, read_sweep_results, SweepParameters
+from src.test.test_ma_crossover_engine import recorded_history
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.candles = recorded_history(12_000)
+        self.grid = parameter_grid(short_windows=range(1, 3), multipliers=range(2, 4), units=("hours",),
+                                   timeframes=("1m", "15m"))
+
+    def test_parameter_grid_order(self):
+        grid = parameter_grid(short_windows=range(1, 3), multipliers=range(2, 4), units=("hours", "days"))
+
+        self.assertEqual(len(grid), 8)
+        self.assertEqual(grid[0], SweepParameters("hours", 1, 2, "1m"))
+        self.assertEqual(grid[3], SweepParameters("hours", 2, 6, "1m"))
+        self.assertEqual(grid[-1], SweepParameters("days", 2, 6, "1m"))
+
+    def test_parallel_sweep_matches_serial_back_test(self):
+        ranked = run_sweep(self.candles, self.grid, processes=2)
+
+        self.assertEqual(len(ranked), len(self.grid))
+        self.assertTrue(ranked['pnl'].is_monotonic_decreasing)
+        for result in ranked.itertuples():
+            candles = self.candles
+            if result.timeframe == "15m":
+                on_boundary = (candles.closeTime + 1) % (15 * 60 * 1000) == 0
+                candles = type(candles)(openTime=candles.openTime[on_boundary], close=candles.close[on_boundary],
+                                        closeTime=candles.closeTime[on_boundary], candleTimeframe="15m")
+            df = candles.create_ma_crossover_dataframe(result.short_window, result.long_window, result.units)
+            expected = back_test_crossover(df, result.units, result.short_window, result.long_window,
+                                           result.timeframe)
+            self.assertEqual((result.buys, result.sells, result.pnl), (expected.buys, expected.sells, expected.pnl))
+
+    def test_sweep_resumes_from_results_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results_path = os.path.join(directory, "results.csv")
+            already_run = BackTestResult("hours", 1, 2, 1, 1, 12345.0, "1m")
+            append_sweep_result(results_path, already_run)
+
+            ranked = run_sweep(self.candles, self.grid, results_path=results_path, processes=2)
+
+            self.assertEqual(len(read_sweep_results(results_path)), len(self.grid))
+            self.assertEqual(ranked.iloc[0]['pnl'], 12345.0)  # not re-run
+            self.assertEqual(len(ranked), len(self.grid))
+
+    def test_results_file_round_trip_with_no_pnl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results_path = os.path.join(directory, "results.csv")
+            result = BackTestResult("days", 3, 9, 0, 0, None, "1h")
+            append_sweep_result(results_path, result)
+
+            self.assertEqual(read_sweep_results(results_path), [result])
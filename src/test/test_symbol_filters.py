@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.test.test_binance_client import exchange_info_return_value
+from src.types.symbol_filters import SymbolFilters, SymbolFilterTable, decimal_places
+
+
+class TestSymbolFilters(unittest.TestCase):
+
+    def setUp(self):
+        self.filters = SymbolFilters.from_exchange_info(exchange_info_return_value["symbols"][0])
+
+    def test_from_exchange_info(self):
+        self.assertEqual((self.filters.symbol, self.filters.base_asset, self.filters.quote_asset),
+                         ("ETHUSDT", "ETH", "USDT"))
+        self.assertEqual((self.filters.tick_size, self.filters.min_price, self.filters.price_decimals),
+                         (0.01, 0.01, 2))
+        self.assertEqual((self.filters.step_size, self.filters.min_qty, self.filters.quantity_decimals),
+                         (0.0001, 0.0001, 4))
+        self.assertEqual(self.filters.min_notional, 5.0)
+        self.assertEqual(self.filters.quote_precision, 8)
+
+    def test_decimal_places(self):
+        self.assertEqual(decimal_places("0.01000000"), 2)
+        self.assertEqual(decimal_places("0.00001000"), 5)
+        self.assertEqual(decimal_places("1.00000000"), 0)
+        self.assertEqual(decimal_places("10.00000000"), 0)
+
+    def test_round_quantity_rounds_down_to_step(self):
+        self.assertEqual(self.filters.round_quantity(1.23456789), 1.2345)
+        self.assertEqual(self.filters.round_quantity(0.3), 0.3)  # 0.3 / 0.0001 is 2999.9999999999995
+        self.assertEqual(self.filters.round_quantity(0.00009), 0.0)
+
+    def test_round_price_to_nearest_tick(self):
+        self.assertEqual(self.filters.round_price(1234.5678), 1234.57)
+        self.assertEqual(self.filters.round_price(1234.5612), 1234.56)
+
+    def test_round_quote_quantity_rounds_down(self):
+        self.assertEqual(self.filters.round_quote_quantity(10.123456789), 10.12345678)
+
+    def test_quantities_formatted_in_fixed_point(self):
+        self.assertEqual(str(0.00005), "5e-05")
+        self.assertEqual(self.filters.format_quantity(0.00005), "0.0000")
+        self.assertEqual(self.filters.format_quantity(0.00012345), "0.0001")
+        self.assertEqual(self.filters.format_quantity(1.5), "1.5000")
+        self.assertEqual(self.filters.format_quote_quantity(0.00001), "0.00001000")
+        self.assertEqual(self.filters.format_quote_quantity(10.123456789), "10.12345678")
+        self.assertEqual(self.filters.format_price(1234.5600000001), "1234.56")
+        self.assertEqual(self.filters.format_price(1803.6), "1803.60")
+        self.assertEqual(self.filters.format_price(0.00001), "0.00")
+
+
+class TestSymbolFilterTable(unittest.TestCase):
+
+    def test_fetched_once_and_cached_on_disk(self):
+        fetch = MagicMock(return_value=exchange_info_return_value)
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "filters", "test-filters.json")
+            table = SymbolFilterTable(fetch, cache_path=cache_path)
+            self.assertEqual(table.get("ETHUSDT").tick_size, 0.01)
+            self.assertEqual(table.get("ETHUSDT").step_size, 0.0001)
+            self.assertEqual(fetch.call_count, 1)
+
+            # a new table (e.g. after a restart) reads the disk cache instead of fetching
+            reloaded = SymbolFilterTable(fetch, cache_path=cache_path)
+            self.assertEqual(reloaded.get("ETHUSDT"), table.get("ETHUSDT"))
+            self.assertEqual(fetch.call_count, 1)
+
+    def test_refreshed_when_stale(self):
+        fetch = MagicMock(return_value=exchange_info_return_value)
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "test-filters.json")
+            SymbolFilterTable(fetch, cache_path=cache_path).get("ETHUSDT")
+
+            table = SymbolFilterTable(fetch, cache_path=cache_path, refresh_seconds=0)
+            table.get("ETHUSDT")
+            self.assertEqual(fetch.call_count, 2)
+
+    def test_unknown_symbol_raises(self):
+        table = SymbolFilterTable(MagicMock(return_value=exchange_info_return_value))
+        with self.assertRaises(Exception):
+            table.get("NOTASYMBOL")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+from binance.spot import Spot
+
+from src.client.binance_client import BinanceClient
+from src.test.test_binance_client import with_filters
+from src.types.trade_ledger import TradeLedger, trade_sums
+
+
+def trade_history(length, symbol="ETHGBP", seed=21):
+    """
+    Alternating runs of buys and sells of my_trades responses, with commissions like Binance charges them
+    """
+    rng = np.random.default_rng(seed)
+    trades = []
+    for i in range(length):
+        is_buyer = bool((i // 3) % 2 == 0)
+        price = round(1500 + rng.normal(0, 50), 2)
+        qty = round(rng.uniform(0.01, 0.5), 4)
+        commission = round(qty * 0.001, 8) if is_buyer else round(qty * price * 0.001, 8)
+        trades.append({"symbol": symbol, "id": 1000 + i, "orderId": 5000 + i, "price": f"{price:.8f}",
+                       "qty": f"{qty:.8f}", "commission": f"{commission:.8f}", "isBuyer": is_buyer})
+    return trades
+
+
+def legacy_summary(trade_history, live_px, precision=8):
+    """
+    The per symbol table position_summary built from the full trade history before the ledger.
+    DataFrame.append, which pandas has removed, is replaced with pd.concat.
+    """
+    symbol_data = []
+    for trade_info in trade_history:
+        coin_data = {}
+        coin_data['Symbol'] = trade_info['symbol']
+        coin_data['live_px'] = live_px
+        if trade_info['isBuyer'] == True:
+            coin_data['Side'] = 'Buy'
+            coin_data['QTY'] = float(trade_info['qty']) - float(trade_info['commission'])
+            coin_data['WAP'] = float(trade_info['price']) * coin_data['QTY']
+            coin_data['PnL'] = ((live_px - float(trade_info['price'])) * float(coin_data['QTY'])) - float(
+                trade_info['commission']) * float(trade_info['price'])
+            coin_data['FEE'] = float(trade_info['commission']) * float(trade_info['price'])
+        else:
+            coin_data['Side'] = 'Sell'
+            coin_data['QTY'] = float(trade_info['qty']) * -1
+            coin_data['WAP'] = float(trade_info['price']) * coin_data['QTY']
+            coin_data['PnL'] = ((live_px - float(trade_info['price'])) * float(coin_data['QTY'])) - float(
+                trade_info['commission'])
+            coin_data['FEE'] = float(trade_info['commission'])
+        symbol_data.append(coin_data)
+    symbol = trade_history[0]['symbol']
+    symbol_data = pd.DataFrame(symbol_data)
+    symbol_data = symbol_data.groupby(['Symbol', 'Side']).sum()
+    symbol_data['WAP'] = abs(symbol_data['WAP'] / symbol_data['QTY'])
+    symbol_data.reset_index(inplace=True)
+    symbol_data = symbol_data[['Symbol', 'Side', 'QTY', 'WAP', 'FEE', 'PnL']]
+    symbol_data[['QTY', 'WAP', 'FEE', 'PnL']] = (
+        symbol_data[['QTY', 'WAP', 'FEE', 'PnL']].astype(float)).round(precision)
+    total_df = pd.DataFrame([symbol, 'Total', round(symbol_data.QTY.sum(), precision), np.nan,
+                             round(symbol_data.FEE.sum(), precision),
+                             round(symbol_data.PnL.sum(), precision)], index=symbol_data.columns).T
+    return pd.concat([symbol_data, total_df])
+
+
+def legacy_market_position(trade_history, precision=8):
+    qty = 0
+    for trade_info in trade_history:
+        trade_qty = float(trade_info['qty']) if trade_info['isBuyer'] == True else float(trade_info['qty']) * -1
+        qty += round(trade_qty, precision)
+    return round(qty, precision)
+
+
+def assert_same_table(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True).infer_objects(),
+                                  check_dtype=False, rtol=1e-9)
+
+
+def held_balance(history, asset="ETH"):
+    """
+    Account response holding the quantity the trades leave, as if the account only ever traded
+    """
+    held = sum(float(trade['qty']) - float(trade['commission']) if trade['isBuyer'] else -float(trade['qty'])
+               for trade in history)
+    return {"balances": [{"asset": asset, "free": f"{held:.8f}", "locked": "0.00000000"}]}
+
+
+def paged_my_trades(history):
+    def my_trades(symbol, fromId, limit, **kwargs):
+        return [trade for trade in history if trade['id'] >= fromId][:limit]
+
+    return MagicMock(side_effect=my_trades)
+
+
+class TestTradeLedger(unittest.TestCase):
+
+    def test_summary_matches_legacy_table(self):
+        history = trade_history(500)
+        ledger = TradeLedger()
+        for start in range(0, 500, 137):  # synced in several increments
+            ledger.add_trades("ETHGBP", history[start:start + 137])
+
+        assert_same_table(ledger.summary("ETHGBP", 1523.45), legacy_summary(history, 1523.45))
+        self.assertEqual(ledger.net_quantity("ETHGBP"), legacy_market_position(history))
+
+    def test_buys_only(self):
+        history = [trade for trade in trade_history(30) if trade['isBuyer']]
+        ledger = TradeLedger()
+        ledger.add_trades("ETHGBP", history)
+
+        assert_same_table(ledger.summary("ETHGBP", 1600.0), legacy_summary(history, 1600.0))
+
+    def test_trade_sums_commission_rules(self):
+        trades = [{"id": 1, "price": "2000.0", "qty": "1.0", "commission": "0.001", "isBuyer": True},
+                  {"id": 2, "price": "2100.0", "qty": "0.5", "commission": "1.05", "isBuyer": False}]
+
+        sums = trade_sums(trades)
+
+        # buy commission is in the coin: taken off the quantity and valued at the trade price
+        self.assertAlmostEqual(sums['Buy']['QTY'], 0.999)
+        self.assertAlmostEqual(sums['Buy']['WAP'], 2000.0 * 0.999)
+        self.assertAlmostEqual(sums['Buy']['FEE'], 2.0)
+        self.assertAlmostEqual(sums['Buy']['tradedQty'], 1.0)
+        # sell commission is in the quote asset
+        self.assertAlmostEqual(sums['Sell']['QTY'], -0.5)
+        self.assertAlmostEqual(sums['Sell']['WAP'], -1050.0)
+        self.assertAlmostEqual(sums['Sell']['FEE'], 1.05)
+        self.assertAlmostEqual(sums['Sell']['tradedQty'], -0.5)
+
+    def test_trades_already_added_are_skipped(self):
+        history = trade_history(20)
+        ledger = TradeLedger()
+
+        self.assertEqual(ledger.add_trades("ETHGBP", history[:15]), 15)
+        self.assertEqual(ledger.add_trades("ETHGBP", history[10:]), 5)
+        self.assertEqual(ledger.last_trade_id("ETHGBP"), history[-1]['id'])
+        assert_same_table(ledger.summary("ETHGBP", 1500.0), legacy_summary(history, 1500.0))
+
+    def test_no_trades(self):
+        ledger = TradeLedger()
+
+        summary = ledger.summary("ETHGBP", 1500.0)
+
+        self.assertEqual(summary['Side'].tolist(), ['Total'])
+        self.assertEqual(summary['QTY'].tolist(), [0])
+        self.assertIsNone(ledger.last_trade_id("ETHGBP"))
+        self.assertEqual(ledger.net_quantity("ETHGBP"), 0)
+
+    def test_reset(self):
+        ledger = TradeLedger()
+        ledger.add_trades("ETHGBP", trade_history(20))
+        ledger.add_trades("ETHUSDT", trade_history(20, symbol="ETHUSDT"))
+
+        ledger.reset("ETHGBP")
+        self.assertIsNone(ledger.last_trade_id("ETHGBP"))
+        self.assertEqual(ledger.last_trade_id("ETHUSDT"), 1019)
+
+        ledger.reset()
+        self.assertIsNone(ledger.last_trade_id("ETHUSDT"))
+
+    def test_held_quantity_is_net_of_coin_commission(self):
+        history = trade_history(40)
+        ledger = TradeLedger()
+        ledger.add_trades("ETHGBP", history)
+
+        held = float(held_balance(history)["balances"][0]["free"])
+        self.assertAlmostEqual(ledger.held_quantity("ETHGBP"), held, places=8)
+        self.assertLess(ledger.held_quantity("ETHGBP"), ledger.net_quantity("ETHGBP"))
+
+    def test_saved_and_reloaded(self):
+        history = trade_history(50)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger", "test.json")
+            ledger = TradeLedger(path)
+            ledger.add_trades("ETHGBP", history)
+            ledger.save()
+
+            reloaded = TradeLedger(path)
+
+        self.assertEqual(reloaded.last_trade_id("ETHGBP"), history[-1]['id'])
+        assert_same_table(reloaded.summary("ETHGBP", 1500.0), ledger.summary("ETHGBP", 1500.0))
+
+
+class TestTradeSync(unittest.TestCase):
+
+    def client_with_history(self, history):
+        client = with_filters(BinanceClient(test=False))
+        client.trade_ledger = TradeLedger()
+        spot = Spot()
+        spot.my_trades = paged_my_trades(history)
+        spot.ticker_price = MagicMock(return_value={"symbol": "ETHGBP", "price": "1550.00"})
+        spot.account = MagicMock(side_effect=lambda **kwargs: held_balance(history))
+        client.client = spot
+        return client
+
+    def test_ledger_kept_per_account(self):
+        client = BinanceClient(test=True)
+
+        account_id = hashlib.sha256(client.client.key.encode()).hexdigest()[:16]
+        self.assertEqual(os.path.basename(client.trade_ledger.path), f"test-{account_id}.json")
+
+    def test_position_rebuilt_when_ledger_disagrees_with_balance(self):
+        history = trade_history(300)
+        client = self.client_with_history(history)
+        # trades the account made before the testnet was reset, with IDs the new trades will not reach for a while
+        client.trade_ledger.add_trades("ETHGBP", [{**trade, "id": trade['id'] + 10_000} for trade in history[:3]])
+
+        self.assertEqual(client.get_market_position(), legacy_market_position(history))
+        self.assertEqual([c.kwargs["fromId"] for c in client.client.my_trades.call_args_list], [11_003, 0])
+
+    def test_non_eth_symbol_checked_against_its_own_balance(self):
+        history = trade_history(50, symbol="SOLUSDT")
+        client = with_filters(BinanceClient(test=False, symbol="SOLUSDT"))
+        client.trade_ledger = TradeLedger()
+        spot = Spot()
+        spot.my_trades = paged_my_trades(history)
+        balances = held_balance(history, asset="SOL")["balances"] + [{"asset": "ETH", "free": "2.0", "locked": "0.0"}]
+        spot.account = MagicMock(return_value={"balances": balances})
+        client.client = spot
+
+        self.assertEqual(client.base_asset, "SOL")
+        self.assertEqual(client.get_market_position(), legacy_market_position(history))
+        self.assertEqual([c.kwargs["fromId"] for c in spot.my_trades.call_args_list], [0])  # never rebuilt
+
+    def test_ledger_rebuilt_once_when_balance_moved_by_a_deposit(self):
+        history = trade_history(30)
+        client = self.client_with_history(history)
+        client.client.account = MagicMock(return_value={"balances": [{"asset": "ETH", "free": "5.0", "locked": "0.0"}]})
+
+        client.get_market_position()
+        client.get_market_position()
+
+        self.assertEqual([c.kwargs["fromId"] for c in client.client.my_trades.call_args_list], [0, 0, 1030])
+        self.assertEqual(client.get_market_position(), legacy_market_position(history))
+
+    def test_sync_pages_from_last_trade_id(self):
+        history = trade_history(2_500)
+        client = self.client_with_history(history)
+
+        self.assertEqual(client.sync_trades(), 2_500)
+        self.assertEqual([c.kwargs["fromId"] for c in client.client.my_trades.call_args_list], [0, 2000, 3000])
+
+        history.extend(trade_history(2_503)[2_500:])
+        client.client.my_trades.reset_mock()
+        self.assertEqual(client.sync_trades(), 3)
+        self.assertEqual([c.kwargs["fromId"] for c in client.client.my_trades.call_args_list], [3500])
+
+    def test_position_summary_requests_only_new_trades(self):
+        history = trade_history(300)
+        client = self.client_with_history(history)
+        client.report_renderer = MagicMock()
+
+        first = client.position_summary()
+        history.extend(trade_history(310)[300:])
+        second = client.position_summary()
+
+        self.assertEqual(client.client.my_trades.call_args_list[-1].kwargs["fromId"], history[299]['id'] + 1)
+        expected = legacy_summary(history, 1550.0).set_index('Symbol').replace(np.nan, "-")
+        assert_same_table(second, expected)
+        self.assertNotEqual(first.loc[first['Side'] == 'Total', 'QTY'].iloc[0],
+                            second.loc[second['Side'] == 'Total', 'QTY'].iloc[0])
+        self.assertEqual(client.get_market_position(), legacy_market_position(history))
+        self.assertEqual(client.report_renderer.publish.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
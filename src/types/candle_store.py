@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+
+import numpy as np
+
+from src.types.candlesticks import Candlesticks
+
+
+class CandleStore:
+    """
+    Append-only columnar store of Candlesticks on disk
+
+    Each Candlesticks column is a raw binary file of fixed width records in its column dtype, alongside metadata.json
+    holding the candle timeframe and the number of candles written. Reads memory-map the column files so opening
+    millions of candles takes milliseconds, and appends only write the bytes of the new candles.
+    """
+
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, path):
+        """
+        :param path: Directory of the store, created on first write
+        """
+        self.path = path
+
+    def __len__(self):
+        return self._metadata()["length"]
+
+    def read(self) -> Candlesticks | None:
+        """
+        Memory-maps the stored candles. Columns are read only, Candlesticks.add and shorten return new arrays.
+
+        :return: Candlesticks or None if nothing is stored
+        """
+        metadata = self._metadata()
+        if metadata["length"] == 0:
+            return None
+
+        columns = {column: np.memmap(self._column_path(column), dtype=dtype, mode='r', shape=(metadata["length"],))
+                   for column, dtype in Candlesticks.COLUMNS.items()}
+        candles = Candlesticks(**columns)
+        candles.candleTimeframe = metadata["candleTimeframe"]
+        return candles
+
+    def write(self, candles: Candlesticks):
+        """
+        Replaces everything stored with the candles
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self._write_metadata(0, candles.candleTimeframe)
+        self._write_columns(candles, 0)
+        self._write_metadata(len(candles), candles.candleTimeframe)
+        print(f"Saved candle history to: {self.path}. Length={len(candles)}")
+
+    def append(self, candles: Candlesticks):
+        """
+        Appends candles after those stored, writing only the new records
+        """
+        metadata = self._metadata()
+        if metadata["length"] == 0:
+            return self.write(candles)
+        if len(candles) == 0:
+            return
+
+        if metadata["candleTimeframe"] != candles.candleTimeframe:
+            raise Exception(f"Cannot add candles with different timeframes "
+                            f"({metadata['candleTimeframe']} and {candles.candleTimeframe}")
+        last_close_time = np.fromfile(self._column_path("closeTime"), dtype=np.int64, count=1,
+                                      offset=(metadata["length"] - 1) * np.dtype(np.int64).itemsize)[0]
+        if last_close_time > candles.openTime[0]:
+            raise Exception(f"Candlesticks being appended have open time before closing time of stored candlesticks")
+
+        self._write_columns(candles, metadata["length"])
+        # metadata is written last so an interrupted append leaves the previous length readable
+        self._write_metadata(metadata["length"] + len(candles), metadata["candleTimeframe"])
+        print(f"Appended {len(candles)} candles to: {self.path}. Length={metadata['length'] + len(candles)}")
+
+    def _write_columns(self, candles, length):
+        for column, dtype in Candlesticks.COLUMNS.items():
+            column_path = self._column_path(column)
+            with open(column_path, 'r+b' if os.path.exists(column_path) else 'wb') as file:
+                file.truncate(length * np.dtype(dtype).itemsize)  # drops records of any interrupted append
+                file.seek(0, os.SEEK_END)
+                file.write(np.ascontiguousarray(getattr(candles, column), dtype=dtype).tobytes())
+
+    def _metadata(self):
+        try:
+            with open(os.path.join(self.path, self.METADATA_FILE)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"length": 0, "candleTimeframe": "NONE"}
+
+    def _write_metadata(self, length, timeframe):
+        metadata_path = os.path.join(self.path, self.METADATA_FILE)
+        with open(f"{metadata_path}.tmp", 'w') as file:
+            json.dump({"length": length, "candleTimeframe": timeframe}, file)
+        os.replace(f"{metadata_path}.tmp", metadata_path)
+
+    def _column_path(self, column):
+        return os.path.join(self.path, f"{column}.bin")
+
+
+def migrate_pickle(pickle_path, store: CandleStore) -> Candlesticks:
+    """
+    One time migration of a pickled Candlesticks history (including the old list of strings layout) into a store
+
+    :param pickle_path: Path to e.g. candlestick_history.pkl
+    :param store: CandleStore to write to
+    :return: The stored Candlesticks
+    """
+    with open(pickle_path, 'rb') as file:
+        pickled = pickle.load(file)
+
+    candles = Candlesticks(**{column: np.asarray(getattr(pickled, column)).astype(dtype)
+                              for column, dtype in Candlesticks.COLUMNS.items()})
+    candles.candleTimeframe = pickled.candleTimeframe
+    store.write(candles)
+    print(f"Migrated {len(candles)} candles from {pickle_path} to {store.path}")
+    return store.read()
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import os
 from pprint import pprint
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 
-from src.utils.utils import epoch_to_date, convert_to_hours, Side
+from src.types.ma_crossover_engine import MACrossoverEngine
+from src.utils.utils import epoch_to_datetime_index, convert_to_hours, Side, min_max_decimation, plot_lock, \
+    price_decimals
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class Candlesticks:
@@ -17,21 +21,182 @@ class Candlesticks:
     Candlestick type derived from API: https://binance-docs.github.io/apidocs/#kline-candlestick-data
     """
 
+    # column name -> dtype, in the order Binance returns kline fields
+    COLUMNS = {
+        "openTime": np.int64,  # epoch time with 3 d.p
+        "open": np.float64,
+        "high": np.float64,
+        "low": np.float64,
+        "close": np.float64,
+        "volume": np.float64,
+        "closeTime": np.int64,  # epoch time with 3 d.p
+        "quoteAssetVolume": np.float64,
+        "numberOfTrades": np.int32,
+        "takerBuyBaseAssetVolume": np.float64,
+        "takerBuyQuoteAssetVolume": np.float64,
+        "ignore": np.float64,
+    }
+
     def __init__(self, **kwargs):
-        self.openTime = []  # epoch time with 3 d.p
-        self.open = []
-        self.high = []
-        self.low = []
-        self.close = []
-        self.volume = []
-        self.closeTime = []  # epoch time with 3 d.p
-        self.quoteAssetVolume = []
-        self.numberOfTrades = []
-        self.takerBuyBaseAssetVolume = []
-        self.takerBuyQuoteAssetVolume = []
-        self.ignore = []
-
-        self.candleTimeframe = "NONE"
+        for column, dtype in self.COLUMNS.items():
+            setattr(self, column, np.asarray(kwargs.get(column, []), dtype=dtype))
+
+        self.candleTimeframe = kwargs.get("candleTimeframe", "NONE")
+
+        self._ring = None  # column -> backing array, set by enable_ring_buffer
+        self._ring_capacity = 0
+        self._ring_count = 0  # candles written to the ring since it was enabled
+        self._invalidate_caches()
+
+    @classmethod
+    def from_klines(cls, klines, timeframe="NONE") -> Candlesticks:
+        """
+        Parse raw klines (as returned by the Binance API) into typed columns once at ingest
+
+        :param klines: list of kline lists e.g. [[1499040000000, "0.0163", ...], ...]
+        :param timeframe: the interval of the klines e.g. 1m, 15m, 1h
+        :return: Candlesticks object
+        """
+        candles = cls(candleTimeframe=timeframe)
+        if len(klines) == 0:
+            return candles
+
+        # one object array of the raw rows, then numpy parses each column into its dtype
+        rows = np.array(klines, dtype=object)
+        for i, (column, dtype) in enumerate(cls.COLUMNS.items()):
+            setattr(candles, column, rows[:, i].astype(dtype))
+        return candles
+
+    def enable_ring_buffer(self, capacity=43_200):  # default to 30 days of candles in 1m intervals
+        """
+        Switch to a fixed capacity ring buffer. add() then writes new candles in place and evicts the oldest beyond
+        capacity, so memory and the cost of each add stay constant however long the candles are kept.
+
+        Every value is written twice, at i and i + capacity of a backing array twice the capacity, so the latest
+        candles are always one contiguous view. Columns are views of the ring that later adds overwrite, use copy() to
+        keep candles beyond the next add.
+
+        :param capacity: Maximum number of candles kept
+        """
+        if type(capacity) is not int or capacity < 1:
+            raise ValueError(f"Capacity '{capacity}' is not a valid positive integer")
+        self._ring = {column: np.empty(2 * capacity, dtype=dtype) for column, dtype in self.COLUMNS.items()}
+        self._ring_capacity = capacity
+        self._ring_count = 0
+        self._write_to_ring(self.columns())
+
+    def _write_to_ring(self, columns: dict):
+        length = len(columns["openTime"])
+        start = max(0, length - self._ring_capacity)  # older candles would be evicted immediately
+        positions = (self._ring_count + start + np.arange(length - start)) % self._ring_capacity
+        for column, backing in self._ring.items():
+            values = columns[column][start:]
+            backing[positions] = values
+            backing[positions + self._ring_capacity] = values
+        self._ring_count += length
+
+        if self._ring_count < self._ring_capacity:
+            first, last = 0, self._ring_count
+        else:
+            first = self._ring_count % self._ring_capacity
+            last = first + self._ring_capacity
+        for column, backing in self._ring.items():
+            setattr(self, column, backing[first:last])
+        self._invalidate_caches()
+
+    def copy(self) -> Candlesticks:
+        """
+        Candles with their own copy of every column
+        """
+        candles = Candlesticks(**{column: values.copy() for column, values in self.columns().items()})
+        candles.candleTimeframe = self.candleTimeframe
+        return candles
+
+    def columns(self) -> dict:
+        return {column: getattr(self, column) for column in self.COLUMNS}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Zero-copy DataFrame view of the candle columns (edits to the DataFrame are not reflected back)
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.columns(), copy=False)
+
+    def time_range_indices(self, start=None, end=None) -> tuple[int, int]:
+        """
+        Binary search of openTime for the positions of candles with start <= openTime < end.
+        Correct across gaps in the candles (e.g. exchange maintenance) unlike counting candles back from the end.
+
+        :param start: epoch with 3 d.p, None for the first candle
+        :param end: epoch with 3 d.p (exclusive), None for after the last candle
+        :return: (first, last) positions to slice the columns with
+        """
+        first = 0 if start is None else int(np.searchsorted(self.openTime, start, side='left'))
+        last = len(self) if end is None else int(np.searchsorted(self.openTime, end, side='left'))
+        return first, max(first, last)
+
+    def time_slice(self, start=None, end=None) -> Candlesticks:
+        """
+        Candles with start <= openTime < end. Columns are views of these candles, not copies.
+
+        :param start: epoch with 3 d.p, None for the first candle
+        :param end: epoch with 3 d.p (exclusive), None for after the last candle
+        :return: Candlesticks
+        """
+        first, last = self.time_range_indices(start, end)
+        candles = Candlesticks(**{column: values[first:last] for column, values in self.columns().items()})
+        candles.candleTimeframe = self.candleTimeframe
+        return candles
+
+    def rolling_mean(self, window: int) -> np.ndarray:
+        """
+        Mean close over the trailing window of candles, NaN until the window is filled.
+        Same as pd.Series(close).rolling(window).mean() but each window is an O(n) subtraction of one shared cumulative
+        sum, memoized by window length in candles until the candles change.
+
+        Prices from Binance are summed as integer ticks, so the sums are exact and a flat window's means are exactly
+        equal, as they are with pandas (a rounding error either way would be a false Short > Long crossover).
+
+        :param window: Window size in candles
+        :return: read only array of means, one per candle
+        """
+        if type(window) is not int or window < 1:
+            raise ValueError(f"Window '{window}' is not a valid positive integer")
+        if self._cache_source is not self.close:
+            self._invalidate_caches()  # close was reassigned directly
+
+        if window not in self._rolling_means:
+            if self._close_cumsum is None:
+                self._close_cumsum, self._close_scale = self._cumulative_close()
+            means = np.full(len(self.close), np.nan)
+            if window <= len(self.close):
+                window_sums = self._close_cumsum[window:] - self._close_cumsum[:-window]
+                means[window - 1:] = window_sums / (window * self._close_scale)
+            means.flags.writeable = False
+            self._rolling_means[window] = means
+        return self._rolling_means[window]
+
+    def _cumulative_close(self):
+        """
+        :return: (cumulative sum of close from 0, scale of the sums to prices)
+        """
+        decimals = price_decimals(self.close)
+        if decimals is not None and len(self.close) > 0:
+            scale = 10 ** decimals
+            # the ticks and every sum of them are exact as int64 and as float64 while below 2^53
+            if float(np.abs(self.close).max()) * scale * len(self.close) < 2 ** 53:
+                ticks = np.rint(self.close * scale).astype(np.int64)
+                return np.concatenate(([0], np.cumsum(ticks))), scale
+        # prices with more than 8 decimals (computed, not from Binance) are summed in extended precision, which is
+        # float64 on some platforms e.g. Windows, so their flat windows may not tie exactly
+        return np.concatenate(([0], np.cumsum(self.close, dtype=np.longdouble))), 1
+
+    def _invalidate_caches(self):
+        self._cache_source = self.close
+        self._close_cumsum = None
+        self._close_scale = 1
+        self._rolling_means = {}  # window in candles -> means
 
     def __len__(self):
         return len(self.openTime)  # essentially equals No. candles
@@ -49,7 +214,7 @@ class Candlesticks:
             case _:
                 raise Exception(f"Timeframe '{self.candleTimeframe}' is not supported yet!")
 
-    def create_crossover_graph(self, window_min, window_max, units="days", save=True):
+    def create_crossover_graph(self, window_min, window_max, units="days", save=True, max_points=4_000):
         """
         Main function used to plot the MA crossover
 
@@ -57,43 +222,47 @@ class Candlesticks:
         :param window_max:  Long window size
         :param save: Toggles save or display of graph snapshot to plot
         :param units: units of window_min/max in days or hours
+        :param max_points: Points drawn per price line, each line keeps the min and max of equal buckets.
+                           None draws every candle
         :return: (void) Plots the MA crossover graph
         """
         main_df = self.create_ma_crossover_dataframe(window_min, window_max, units)
 
-        # 'buy/sell' signals
-        main_df['buy_sell_x'] = main_df['Position'].replace(0.0, np.NAN)
-        main_df['buy_y'] = main_df.apply(lambda x: x['Short'] if x['buy_sell_x'] == 1.0 else np.NAN, axis=1)
-        main_df['sell_y'] = main_df.apply(lambda x: x['Long'] if x['buy_sell_x'] == -1.0 else np.NAN, axis=1)
-
-        # PLOTTING
-        plt.figure(figsize=(20, 10))
-
-        main_df['Close'].plot(color='k', label='Close Price')
-        main_df['Short'].plot(color='b', label='Short Price')
-        main_df['Long'].plot(color='g', label='Long Price')
-
-        plt.plot(main_df['buy_sell_x'].index,
-                 main_df['buy_y'],
-                 '^', markersize=15, color='g', label='buy')
-
-        # plot 'sell' signals
-        plt.plot(main_df['buy_sell_x'].index,
-                 main_df['sell_y'],
-                 'v', markersize=15, color='r', label='sell')
-
-        # METADATA
-        plt.ylabel('Price of ETH (£)', fontsize=15)
-        plt.xlabel('Date', fontsize=15)
-        plt.title('ETH MA Crossover', fontsize=20)
-        plt.legend()
-        if save:
-            current_dir = os.path.dirname(os.path.realpath(__file__))
-            file_path = f"{current_dir}/../live/current_plot_snapshot.png"
-            print(f"Saved crossover image to {file_path}")
-            plt.savefig(file_path)
-        else:
-            plt.show()
+        # 'buy/sell' signals, only the signal rows are plotted
+        position = main_df['Position'].to_numpy()
+        buys = main_df[position == 1.0]
+        sells = main_df[position == -1.0]
+
+        import matplotlib.pyplot as plt
+
+        with plot_lock:
+            # PLOTTING
+            plt.figure(figsize=(20, 10))
+
+            for column, colour, label in [('Close', 'k', 'Close Price'), ('Short', 'b', 'Short Price'),
+                                          ('Long', 'g', 'Long Price')]:
+                values = main_df[column].to_numpy()
+                points = np.arange(len(values)) if max_points is None else min_max_decimation(values, max_points)
+                plt.plot(main_df.index[points], values[points], color=colour, label=label)
+
+            plt.plot(buys.index, buys['Short'], '^', markersize=15, color='g', label='buy')
+
+            # plot 'sell' signals
+            plt.plot(sells.index, sells['Long'], 'v', markersize=15, color='r', label='sell')
+
+            # METADATA
+            plt.ylabel('Price of ETH (£)', fontsize=15)
+            plt.xlabel('Date', fontsize=15)
+            plt.title('ETH MA Crossover', fontsize=20)
+            plt.legend()
+            if save:
+                current_dir = os.path.dirname(os.path.realpath(__file__))
+                file_path = f"{current_dir}/../live/current_plot_snapshot.png"
+                print(f"Saved crossover image to {file_path}")
+                plt.savefig(file_path)
+                plt.close()  # figures are otherwise kept open for the life of the live loop
+            else:
+                plt.show()
 
     def create_ma_crossover_dataframe(self, window_min, window_max, units):
         """
@@ -104,26 +273,44 @@ class Candlesticks:
         :param units: units of window_min/max in days or hours
         :return: MA Crossover dataframe
         """
-        main_df = pd.DataFrame(self.close, columns=['Close'])
-        df_close_time = pd.DataFrame(self.closeTime, columns=['CloseTime'])
-        number_candles_in_one_hour = self.number_candles_in_one_hour()
-
-        # convert window size into the smallest factor (hours)
-        window_min, window_max = convert_to_hours(window_min, window_max, units)
+        import pandas as pd
 
-        # adjust window size from hours to match intervals of 1m, 15m or 1h
-        window_min = window_min * number_candles_in_one_hour
-        window_max = window_max * number_candles_in_one_hour
+        main_df = pd.DataFrame(self.close, columns=['Close'])
+        window_min, window_max = self.window_sizes_in_candles(window_min, window_max, units)
 
-        main_df.index = df_close_time['CloseTime'].apply(epoch_to_date)
-        main_df['Short'] = main_df['Close'].rolling(window=window_min).mean()
-        main_df['Long'] = main_df['Close'].rolling(window=window_max).mean()
+        main_df.index = epoch_to_datetime_index(self.closeTime).rename('CloseTime')
+        main_df['Short'] = self.rolling_mean(window_min)
+        main_df['Long'] = self.rolling_mean(window_max)
         main_df.dropna(inplace=True)  # important to happen here or signal/position skewed
         main_df['Signal'] = np.where(main_df['Short'] > main_df['Long'], 1.0, 0.0)
         main_df['Position'] = main_df['Signal'].diff()
         main_df = main_df.astype(float)
         return main_df
 
+    def create_ma_crossover_engine(self, window_min, window_max, units) -> MACrossoverEngine:
+        """
+        Creates a streaming MA Crossover engine seeded with these candles. Feed it new candles with
+        MACrossoverEngine.update_candles rather than recomputing the whole dataframe.
+
+        :param window_min:  Short window size
+        :param window_max:  Long window size
+        :param units: units of window_min/max in days or hours
+        :return: MACrossoverEngine
+        """
+        window_min, window_max = self.window_sizes_in_candles(window_min, window_max, units)
+        engine = MACrossoverEngine(window_min, window_max)
+        engine.update_candles(self)
+        return engine
+
+    def window_sizes_in_candles(self, window_min, window_max, units):
+        number_candles_in_one_hour = self.number_candles_in_one_hour()
+
+        # convert window size into the smallest factor (hours)
+        window_min, window_max = convert_to_hours(window_min, window_max, units)
+
+        # adjust window size from hours to match intervals of 1m, 15m or 1h
+        return window_min * number_candles_in_one_hour, window_max * number_candles_in_one_hour
+
     def get_suggested_position(self, dataframe):
         # return the latest non 0 within values within a time frame
         match self.candleTimeframe:
@@ -163,57 +350,33 @@ class Candlesticks:
             raise Exception(
                 f"Cannot add candles with different timeframes ({self.candleTimeframe} and {candles.candleTimeframe}")
 
-        self.openTime += candles.openTime
-        self.open += candles.open
-        self.high += candles.high
-        self.low += candles.low
-        self.close += candles.close
-        self.volume += candles.volume
-        self.closeTime += candles.closeTime
-        self.quoteAssetVolume += candles.quoteAssetVolume
-        self.numberOfTrades += candles.numberOfTrades
-        self.takerBuyBaseAssetVolume += candles.takerBuyBaseAssetVolume
-        self.takerBuyQuoteAssetVolume += candles.takerBuyQuoteAssetVolume
-        self.ignore += candles.ignore
+        if self._ring is not None:
+            self._write_to_ring(candles.columns())  # in place, evicting the oldest candles
+            return
+
+        for column in self.COLUMNS:
+            setattr(self, column, np.concatenate((getattr(self, column), getattr(candles, column))))
+        self._invalidate_caches()
 
     def shorten(self, from_limit=43_200, to_limit=None):  # default to 30 days of candles in 1m intervals
         if type(from_limit) is not int:
             raise TypeError(f"Expected integer to shorten candles to but received '{type(from_limit)}'")
         if from_limit < 1:
             raise ValueError(f"Limit '{from_limit}' is not a valid positive integer to shorten the candle length to.")
-        if len(self) < from_limit:
-            pass  # no need to shorten
         if to_limit is not None:
             if to_limit > from_limit:
                 raise ValueError(f"To limit ({to_limit}) cannot be larger than from limit ({from_limit})")
 
-        # TODO - refactor into looping through a list of candlesticks attrs and calling a lamda to shorten to limit
-        self.openTime = self.openTime[-from_limit:]
-        self.open = self.open[-from_limit:]
-        self.high = self.high[-from_limit:]
-        self.low = self.low[-from_limit:]
-        self.close = self.close[-from_limit:]
-        self.volume = self.volume[-from_limit:]
-        self.closeTime = self.closeTime[-from_limit:]
-        self.quoteAssetVolume = self.quoteAssetVolume[-from_limit:]
-        self.numberOfTrades = self.numberOfTrades[-from_limit:]
-        self.takerBuyBaseAssetVolume = self.takerBuyBaseAssetVolume[-from_limit:]
-        self.takerBuyQuoteAssetVolume = self.takerBuyQuoteAssetVolume[-from_limit:]
-        self.ignore = self.ignore[-from_limit:]
+        if to_limit is None and len(self) <= from_limit:
+            return  # no need to shorten
+        self._ring = None  # the shortened columns are views, later adds concatenate
 
-        if to_limit is not None:
-            self.openTime = self.openTime[:-to_limit]
-            self.open = self.open[:-to_limit]
-            self.high = self.high[:-to_limit]
-            self.low = self.low[:-to_limit]
-            self.close = self.close[:-to_limit]
-            self.volume = self.volume[:-to_limit]
-            self.closeTime = self.closeTime[:-to_limit]
-            self.quoteAssetVolume = self.quoteAssetVolume[:-to_limit]
-            self.numberOfTrades = self.numberOfTrades[:-to_limit]
-            self.takerBuyBaseAssetVolume = self.takerBuyBaseAssetVolume[:-to_limit]
-            self.takerBuyQuoteAssetVolume = self.takerBuyQuoteAssetVolume[:-to_limit]
-            self.ignore = self.ignore[:-to_limit]
+        for column in self.COLUMNS:
+            values = getattr(self, column)[-from_limit:]
+            if to_limit is not None:
+                values = values[:-to_limit]
+            setattr(self, column, values)
+        self._invalidate_caches()
 
 
 if __name__ == "__main__":
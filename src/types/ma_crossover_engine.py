@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.utils.utils import epoch_to_datetime_index, MAX_PRICE_DECIMALS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class MACrossoverEngine:
+    """
+    Streaming MA Crossover which produces the same Short/Long/Signal/Position values as
+    Candlesticks.create_ma_crossover_dataframe, but in constant time per new candle.
+
+    Running sums are kept for the short and long windows over the last long window of closes. The closes are summed
+    as integer ticks so the sums are exact: windows with the same mean tie exactly, as they do in pandas, rather than
+    crossing on rounding noise.
+    Only the latest rows are retained, enough for Candlesticks.get_suggested_position to look back over.
+    """
+
+    COLUMNS = ['Close', 'Short', 'Long', 'Signal', 'Position']
+    PRICE_SCALE = 10 ** MAX_PRICE_DECIMALS  # ticks per unit of price
+
+    def __init__(self, short_window: int, long_window: int, history=10):
+        """
+        :param short_window: Short window size in candles
+        :param long_window: Long window size in candles
+        :param history: Number of latest rows to keep for dataframe()
+        """
+        if short_window < 1 or long_window < 1:
+            raise ValueError(f"Window sizes must be positive, received {short_window} and {long_window}")
+
+        self.short_window = short_window
+        self.long_window = long_window
+
+        self._buffer_size = max(short_window, long_window)
+        # ring of closes as integers of PRICE_SCALE, one longer than the window so the newest never overwrites a close
+        # still leaving a window
+        self._ticks = np.zeros(self._buffer_size + 1, dtype=np.int64)
+        self._count = 0  # total closes seen
+        self._short_sum = 0
+        self._long_sum = 0
+        self._signal = None
+
+        self.rows = deque(maxlen=history)  # (closeTime, Close, Short, Long, Signal, Position)
+
+    def update(self, close: float, close_time: int):
+        """
+        Add the next candle
+
+        :param close: Close price of the candle
+        :param close_time: Close time of the candle (epoch with 3 d.p)
+        :return: The new row as a tuple (closeTime, Close, Short, Long, Signal, Position) or None while windows fill
+        """
+        close = float(close)
+        tick = round(close * self.PRICE_SCALE)
+        index = self._count % len(self._ticks)
+
+        # drop the closes leaving each window, summed as python ints so the sums cannot overflow
+        if self._count >= self.short_window:
+            self._short_sum -= int(self._ticks[(index - self.short_window) % len(self._ticks)])
+        if self._count >= self.long_window:
+            self._long_sum -= int(self._ticks[(index - self.long_window) % len(self._ticks)])
+
+        self._ticks[index] = tick
+        self._short_sum += tick
+        self._long_sum += tick
+        self._count += 1
+
+        if self._count < self._buffer_size:
+            return None  # equivalent of dropna() on the rolling means
+
+        short = self._short_sum / (self.short_window * self.PRICE_SCALE)
+        long = self._long_sum / (self.long_window * self.PRICE_SCALE)
+        signal = 1.0 if short > long else 0.0
+        position = np.nan if self._signal is None else signal - self._signal
+        self._signal = signal
+
+        row = (int(close_time), close, short, long, signal, position)
+        self.rows.append(row)
+        return row
+
+    def update_candles(self, candles):
+        """
+        Add every candle within a Candlesticks object, in order
+
+        :param candles: Candlesticks object
+        :return: (void)
+        """
+        for close, close_time in zip(candles.close.tolist(), candles.closeTime.tolist()):
+            self.update(close, close_time)
+
+    def dataframe(self) -> pd.DataFrame:
+        """
+        Latest rows in the same format as Candlesticks.create_ma_crossover_dataframe
+
+        :return: MA Crossover dataframe of the latest rows
+        """
+        import pandas as pd
+
+        rows = list(self.rows)
+        df = pd.DataFrame([row[1:] for row in rows], columns=self.COLUMNS, dtype=float)
+        df.index = epoch_to_datetime_index([row[0] for row in rows]).rename('CloseTime')
+        return df
+
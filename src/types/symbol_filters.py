@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from decimal import Decimal
+
+
+def decimal_places(step: str) -> int:
+    """
+    Decimal places of a filter step e.g. '0.01000000' -> 2, '1.00000000' -> 0
+    """
+    return max(0, -Decimal(step).normalize().as_tuple().exponent)
+
+
+@dataclass(frozen=True)
+class SymbolFilters:
+    """
+    Trading rules of one symbol parsed from exchange_info, used to round order prices and quantities.
+    https://binance-docs.github.io/apidocs/spot/en/#filters
+    """
+    symbol: str
+    base_asset: str
+    quote_asset: str
+    quote_precision: int  # decimal places allowed in quoteOrderQty
+    tick_size: float  # PRICE_FILTER
+    min_price: float
+    price_decimals: int
+    step_size: float  # LOT_SIZE
+    min_qty: float
+    quantity_decimals: int
+    min_notional: float  # NOTIONAL or MIN_NOTIONAL
+
+    @classmethod
+    def from_exchange_info(cls, symbol_info) -> SymbolFilters:
+        """
+        :param symbol_info: one entry of exchange_info()['symbols']
+        :return: SymbolFilters
+        """
+        filters = {symbol_filter['filterType']: symbol_filter for symbol_filter in symbol_info['filters']}
+        price_filter = filters.get('PRICE_FILTER', {'tickSize': '0.00000001', 'minPrice': '0'})
+        lot_size = filters.get('LOT_SIZE', {'stepSize': '0.00000001', 'minQty': '0'})
+        notional = filters.get('NOTIONAL', filters.get('MIN_NOTIONAL', {'minNotional': '0'}))
+        return cls(symbol=symbol_info['symbol'],
+                   base_asset=symbol_info['baseAsset'],
+                   quote_asset=symbol_info['quoteAsset'],
+                   quote_precision=int(symbol_info.get('quoteAssetPrecision', symbol_info.get('quotePrecision', 8))),
+                   tick_size=float(price_filter['tickSize']),
+                   min_price=float(price_filter['minPrice']),
+                   price_decimals=decimal_places(price_filter['tickSize']),
+                   step_size=float(lot_size['stepSize']),
+                   min_qty=float(lot_size['minQty']),
+                   quantity_decimals=decimal_places(lot_size['stepSize']),
+                   min_notional=float(notional['minNotional']))
+
+    def round_price(self, price: float) -> float:
+        """
+        Price rounded to the nearest tick
+        """
+        return round(round(price / self.tick_size) * self.tick_size, self.price_decimals)
+
+    def round_quantity(self, quantity: float) -> float:
+        """
+        Base asset quantity rounded down to the lot step, never more than is held
+        """
+        steps = math.floor(round(quantity / self.step_size, 9))  # round first so 0.3/0.1 is not 2.999...
+        return round(steps * self.step_size, self.quantity_decimals)
+
+    def round_quote_quantity(self, quantity: float) -> float:
+        """
+        Quote asset quantity (quoteOrderQty) rounded down to the quote precision
+        """
+        factor = 10 ** self.quote_precision
+        return math.floor(round(quantity * factor, 9)) / factor
+
+    def format_price(self, price: float) -> str:
+        """
+        Price rounded to the nearest tick, as the string sent in orders e.g. 1234.5600000001 -> '1234.56'
+        """
+        return f"{self.round_price(price):.{self.price_decimals}f}"
+
+    def format_quantity(self, quantity: float) -> str:
+        """
+        Base asset quantity rounded down to the lot step, as the string sent in orders. Written in fixed point, as
+        str() of a small float is in scientific notation e.g. 1e-05, which Binance rejects.
+        """
+        return f"{self.round_quantity(quantity):.{self.quantity_decimals}f}"
+
+    def format_quote_quantity(self, quantity: float) -> str:
+        """
+        Quote asset quantity rounded down to the quote precision, as the string sent in orders
+        """
+        return f"{self.round_quote_quantity(quantity):.{self.quote_precision}f}"
+
+
+class SymbolFilterTable:
+    """
+    SymbolFilters of every symbol, indexed by symbol.
+
+    exchange_info is a large, heavily weighted request, so the parsed table is loaded once, saved to disk and reused
+    until it is older than refresh_seconds.
+    """
+
+    REFRESH_SECONDS = 24 * 60 * 60
+
+    def __init__(self, fetch_exchange_info, cache_path=None, refresh_seconds=REFRESH_SECONDS):
+        """
+        :param fetch_exchange_info: function returning the exchange_info response
+        :param cache_path: JSON file the parsed table is saved to, None to keep it in memory only
+        :param refresh_seconds: Age at which the table is fetched again
+        """
+        self.fetch_exchange_info = fetch_exchange_info
+        self.cache_path = cache_path
+        self.refresh_seconds = refresh_seconds
+        self._filters = None  # symbol -> SymbolFilters
+        self._fetched_time = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, symbol) -> SymbolFilters:
+        """
+        :param symbol: Symbol e.g. ETHUSDT
+        :return: SymbolFilters of the symbol
+        """
+        with self._lock:
+            if self._filters is None or self._is_stale():
+                self._load()
+            if symbol not in self._filters and time.time() - self._fetched_time > 60:
+                self._refresh()  # may be newly listed since the table was fetched
+        if symbol not in self._filters:
+            raise Exception(f"Symbol '{symbol}' was not found in exchange info")
+        return self._filters[symbol]
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def _is_stale(self):
+        return time.time() - self._fetched_time >= self.refresh_seconds
+
+    def _load(self):
+        if self.cache_path is not None and os.path.exists(self.cache_path):
+            with open(self.cache_path) as file:
+                cache = json.load(file)
+            self._fetched_time = cache['fetchedTime']
+            self._filters = {symbol: SymbolFilters(**filters) for symbol, filters in cache['symbols'].items()}
+            if not self._is_stale():
+                return
+        self._refresh()
+
+    def _refresh(self):
+        exchange_info = self.fetch_exchange_info()
+        self._filters = {symbol_info['symbol']: SymbolFilters.from_exchange_info(symbol_info)
+                         for symbol_info in exchange_info['symbols']}
+        self._fetched_time = time.time()
+        print(f"Loaded exchange filters for {len(self._filters)} symbols")
+        if self.cache_path is not None:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            cache = {'fetchedTime': self._fetched_time,
+                     'symbols': {symbol: asdict(filters) for symbol, filters in self._filters.items()}}
+            with open(self.cache_path, 'w') as file:
+                json.dump(cache, file)
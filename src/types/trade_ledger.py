@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def trade_sums(trades) -> dict:
+    """
+    Sums of each side of the trades, computed over columns of the trades rather than trade by trade
+
+    - Buys: commission is charged in the coin, so it is removed from QTY and valued at the trade price for FEE
+    - Sells: QTY is negative and commission is charged in the quote asset, so it is the FEE
+
+    :param trades: Response from Binance my_trades
+    :return: dict of side ('Buy' or 'Sell') -> {"QTY", "WAP", "FEE", "tradedQty"}, for the sides traded
+    """
+    price = np.array([trade['price'] for trade in trades], dtype=np.float64)
+    qty = np.array([trade['qty'] for trade in trades], dtype=np.float64)
+    commission = np.array([trade['commission'] for trade in trades], dtype=np.float64)
+    is_buyer = np.array([trade['isBuyer'] for trade in trades], dtype=bool)
+
+    trade_qty = np.where(is_buyer, qty - commission, -qty)
+    wap = price * trade_qty
+    fee = np.where(is_buyer, commission * price, commission)
+    traded_qty = np.where(is_buyer, 1, -1) * np.round(qty, 8)
+
+    sums = {}
+    for side, is_side in [('Buy', is_buyer), ('Sell', ~is_buyer)]:
+        if is_side.any():
+            sums[side] = {"QTY": float(trade_qty[is_side].sum()), "WAP": float(wap[is_side].sum()),
+                          "FEE": float(fee[is_side].sum()), "tradedQty": float(traded_qty[is_side].sum())}
+    return sums
+
+
+class TradeLedger:
+    """
+    Running aggregates of every trade of each symbol, persisted as JSON, so position and PnL reports only need the
+    trades made since the last sync rather than the whole account history.
+
+    Per symbol the ledger keeps the last trade ID seen and, for each side, the sums the PnL summary is built from:
+    - QTY: quantity, buys less their commission and sells negative
+    - WAP: price * QTY
+    - FEE: commission in the quote asset (buy commissions are charged in the coin so are valued at the trade price)
+    - tradedQty: quantity as traded, used for the net market position
+    With those sums the PnL of a side is live price * QTY - WAP - FEE, the same as summing the PnL of each trade.
+    """
+
+    COLUMNS = ['Symbol', 'Side', 'QTY', 'WAP', 'FEE', 'PnL']
+
+    def __init__(self, path=None):
+        """
+        :param path: JSON file the ledger is saved to, None to keep it in memory only
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._symbols = {}  # symbol -> {"lastTradeId": int, "sides": {side: {aggregate: float}}}
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                self._symbols = json.load(file)
+
+    def last_trade_id(self, symbol):
+        """
+        :return: ID of the latest trade added for the symbol, None if there are none
+        """
+        return self._symbols.get(symbol, {}).get("lastTradeId")
+
+    def add_trades(self, symbol, trades) -> int:
+        """
+        Adds trades to the running aggregates. Trades already in the ledger are skipped.
+
+        :param symbol: Symbol e.g. ETHGBP
+        :param trades: Response from Binance my_trades
+        :return: Number of trades added
+        """
+        with self._lock:
+            ledger = self._symbols.setdefault(symbol, {"lastTradeId": None, "sides": {}})
+            if ledger["lastTradeId"] is not None:
+                trades = [trade for trade in trades if trade['id'] > ledger["lastTradeId"]]
+            if len(trades) == 0:
+                return 0
+
+            for side, side_sums in trade_sums(trades).items():
+                sums = ledger["sides"].setdefault(side, {"QTY": 0.0, "WAP": 0.0, "FEE": 0.0, "tradedQty": 0.0})
+                for aggregate, value in side_sums.items():
+                    sums[aggregate] += value
+            ledger["lastTradeId"] = max(trade['id'] for trade in trades)
+            return len(trades)
+
+    def reset(self, symbol=None):
+        """
+        Forgets the trades of a symbol, or of every symbol, so they are added again from the first trade
+
+        :param symbol: Symbol e.g. ETHGBP, None for every symbol
+        """
+        with self._lock:
+            if symbol is None:
+                self._symbols = {}
+            else:
+                self._symbols.pop(symbol, None)
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, 'w') as file:
+                json.dump(self._symbols, file)
+            os.replace(temporary_path, self.path)  # never leaves a half written ledger
+
+    def net_quantity(self, symbol, precision=8) -> float:
+        """
+        Bought less sold quantity of the symbol
+        """
+        sides = self._symbols.get(symbol, {}).get("sides", {})
+        return round(sum(sums["tradedQty"] for sums in sides.values()), precision)
+
+    def held_quantity(self, symbol, precision=8) -> float:
+        """
+        Quantity the trades leave in the account: bought less the commission charged in the coin, less sold
+        """
+        sides = self._symbols.get(symbol, {}).get("sides", {})
+        return round(sum(sums["QTY"] for sums in sides.values()), precision)
+
+    def summary(self, symbol, live_px, precision=8) -> pd.DataFrame:
+        """
+        Position and PnL of each side, then a total row
+
+        :param symbol: Symbol e.g. ETHGBP
+        :param live_px: Current price of the symbol
+        :param precision: Decimal places the values are rounded to
+        :return: Dataframe of Symbol, Side, QTY, WAP, FEE and PnL
+        """
+        import pandas as pd
+
+        sides = self._symbols.get(symbol, {}).get("sides", {})
+        symbol_data = pd.DataFrame([[symbol, side, sides[side]["QTY"], sides[side]["WAP"], sides[side]["FEE"],
+                                     live_px * sides[side]["QTY"] - sides[side]["WAP"] - sides[side]["FEE"]]
+                                    for side in sorted(sides)], columns=self.COLUMNS)
+        symbol_data['WAP'] = abs(symbol_data['WAP'].astype(float) / symbol_data['QTY'].astype(float))
+        symbol_data[['QTY', 'WAP', 'FEE', 'PnL']] = (
+            symbol_data[['QTY', 'WAP', 'FEE', 'PnL']].astype(float)).round(precision)
+        total = pd.DataFrame([[symbol, 'Total', round(symbol_data.QTY.sum(), precision), np.nan,
+                               round(symbol_data.FEE.sum(), precision), round(symbol_data.PnL.sum(), precision)]],
+                             columns=self.COLUMNS)
+        if len(symbol_data) == 0:
+            return total
+        return pd.concat([symbol_data, total], ignore_index=True)
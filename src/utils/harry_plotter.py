@@ -1,12 +1,9 @@
-import time
-
-import plotly.graph_objects as go
-
 from src.client.binance_client import BinanceClient
 from src.types.candlesticks import Candlesticks
+from src.utils.utils import epoch_to_datetime_index
 
 
-def plotly_plot(candles: Candlesticks):
+def plotly_plot(candles: Candlesticks, start=None, end=None):
     """
     Main plot function for any Candlesticks object
 
@@ -15,10 +12,15 @@ def plotly_plot(candles: Candlesticks):
     - Uses openTime for plots and not close
 
     :param candles: Input type of Candlesticks object
+    :param start: Only plot candles opening at or after this epoch (3 d.p)
+    :param end: Only plot candles opening before this epoch (3 d.p)
     :return: void function but plots a plotly graph in browser
     """
+    import plotly.graph_objects as go
+
+    candles = candles.time_slice(start, end)
     fig = go.Figure(
-        data=[go.Candlestick(x=[time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(x / 1000)) for x in candles.openTime],
+        data=[go.Candlestick(x=epoch_to_datetime_index(candles.openTime),
                              open=candles.open,
                              high=candles.high,
                              low=candles.low,
@@ -1,12 +1,14 @@
+import asyncio
 import datetime
 import time
 import traceback
 
+from src.client.async_binance_client import AsyncBinanceClient
+from src.client.execution import OrderExecutor
 from src.notify import notifier, slack_image_upload
-from src.utils.utils import Side, OrderType, add_spacing, bruce_buffer
+from src.utils.utils import add_spacing, bruce_buffer
 
 STOP_LOSS_MULTIPLIER = 0.9
-ETH_PRECISION = 8
 
 
 def notify_current_transaction(message, latest_row, units, window_max, window_min):
@@ -21,60 +23,52 @@ def notify_current_transaction(message, latest_row, units, window_max, window_mi
         "prod-trades")
 
 
-def buy(window_min, window_max, units, latest_row, client):
-    message = "MA Crossover buy process executed: "
-    notify_current_transaction(message, latest_row, units, window_max, window_min)
+def buy(window_min, window_max, units, latest_row, client, executor=None, signal_time=None):
+    """
+    Buys with the full quote balance then places a stop at STOP_LOSS_MULTIPLIER of the buy price.
+    The order is sent first, the transaction is notified after.
 
+    :param executor: OrderExecutor to reuse, otherwise one is created for the client
+    :param signal_time: Epoch seconds the signal was known, for the execution latency
+    """
     try:
-        # 1. Buy all
-        full_quantity_fiat: float = client.account_balance_by_symbol("GBP")
-        client.market_order(Side.buy, full_quantity_fiat)
-
-        # 2. Replace stops
-        stop_price = round(client.avg_price() * STOP_LOSS_MULTIPLIER, ETH_PRECISION)
-        client.place_stop_order(stop_price)
+        if executor is None:
+            executor = OrderExecutor(client, stop_multiplier=STOP_LOSS_MULTIPLIER)
+        executor.buy(signal_time=signal_time)
+        message = "MA Crossover buy process executed: "
+        notify_current_transaction(message, latest_row, units, window_max, window_min)
     except Exception as e:
         print(f"Exception: {e}")
         traceback.print_exc()
-        notifier.slack_notify("MA Crossover buy process failed - please investigate!!", "prod-trades")
+        if executor is None:  # otherwise the executor has already sent the failure to prod-trades
+            notifier.slack_notify("MA Crossover buy process failed - please investigate!!", "prod-trades")
 
 
-def sell(window_min, window_max, units, latest_row, client):
-    message = "MA Crossover sell process executed: "
-    notify_current_transaction(message, latest_row, units, window_max, window_min)
+def sell(window_min, window_max, units, latest_row, client, executor=None, signal_time=None):
+    """
+    Sells the full balance, replacing the stop if there is one. The order is sent first, the transaction is notified
+    after.
 
+    :param executor: OrderExecutor to reuse, otherwise one is created for the client
+    :param signal_time: Epoch seconds the signal was known, for the execution latency
+    """
     try:
-        # 1. Get STOP order IDs
-        open_stop_order_ids = client.get_open_order_ids(order_type_filter=OrderType.stop_loss_limit)
-
-        # Case 1 stop found
-        if len(open_stop_order_ids) == 1:
-            # 1. Get full crypto balance locked and free
-            full_quantity_crypto = client.account_balance_by_symbol("ETH", include_locked=True)
-            # 2. Cancel stop and replace with sell market order
-            client.cancel_and_replace_with_sell(order_id_to_cancel=open_stop_order_ids[0],
-                                                qty_to_sell=full_quantity_crypto)
-
-        # Case many or no stops
-        else:
-            print("Cancelling stops then selling full balance")
-            # 1. Remove all stops (many or none)
-            client.cancel_all_open_orders_for_type(OrderType.stop_loss_limit)
-            # 2. Sell all
-            full_quantity_crypto = client.account_balance_by_symbol("ETH")
-            client.market_order(Side.sell, full_quantity_crypto)
-
+        if executor is None:
+            executor = OrderExecutor(client, stop_multiplier=STOP_LOSS_MULTIPLIER)
+        executor.sell(signal_time=signal_time)
+        message = "MA Crossover sell process executed: "
+        notify_current_transaction(message, latest_row, units, window_max, window_min)
     except Exception as e:
         print(f"Exception: {e}")
         traceback.print_exc()
-        notifier.slack_notify("MA Crossover sell process failed - please investigate!!", "prod-trades")
+        if executor is None:  # otherwise the executor has already sent the failure to prod-trades
+            notifier.slack_notify("MA Crossover sell process failed - please investigate!!", "prod-trades")
 
 
 def send_update_snapshot(all_candles, client, window_min, window_max, units):
     all_candles.create_crossover_graph(window_min, window_max, units)
     slack_image_upload.upload_current_plot(window_min, window_max, units)
-    client.position_summary()
-    client.show_open_orders()
+    asyncio.run(AsyncBinanceClient(client).snapshot())  # summary and open orders are fetched concurrently
 
 
 def sleep_until_next_candle_released(new_start_time):
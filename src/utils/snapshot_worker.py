@@ -0,0 +1,106 @@
+import collections
+import threading
+import time
+import traceback
+
+
+class SnapshotWorker:
+    """
+    Runs snapshot jobs (plots, reports and their Slack uploads) on a background thread, so rendering never delays the
+    next candle check of the live loop.
+
+    The queue is bounded and keyed: a job submitted while another with the same key is still waiting replaces it, as
+    only the latest snapshot is worth rendering. When the queue is full the oldest waiting job is dropped.
+    """
+
+    def __init__(self, max_queue=4):
+        """
+        :param max_queue: Maximum number of jobs waiting to run
+        """
+        import matplotlib
+
+        matplotlib.use("Agg")  # pyplot is drawn off the main thread, which only a non GUI backend supports
+        self.max_queue = max_queue
+        self._jobs = collections.OrderedDict()  # key -> (function, args, kwargs, submitted time), oldest first
+        self._condition = threading.Condition()
+        self._running = False
+        self._stopped = False
+        self._latencies = collections.deque(maxlen=100)  # seconds from submit to finish of recent jobs
+        self._counts = {"submitted": 0, "coalesced": 0, "dropped": 0, "completed": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._run, name="snapshot-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, function, *args, **kwargs):
+        """
+        Queue function(*args, **kwargs) to run in the background. Arguments are used as they are when the job runs,
+        so pass copies of anything the caller keeps changing e.g. Candlesticks.copy()
+
+        :param key: Jobs with the same key replace each other while waiting e.g. "snapshot"
+        :param function: Job to run
+        """
+        with self._condition:
+            if self._stopped:
+                raise Exception("Snapshot worker has been stopped")
+            self._counts["submitted"] += 1
+            if key in self._jobs:
+                del self._jobs[key]
+                self._counts["coalesced"] += 1
+            elif len(self._jobs) >= self.max_queue:
+                self._jobs.popitem(last=False)
+                self._counts["dropped"] += 1
+            self._jobs[key] = (function, args, kwargs, time.monotonic())
+            self._condition.notify_all()  # join() waits on the same condition
+
+    def metrics(self) -> dict:
+        """
+        :return: dict of queue depth, job counts and latency (ms) from submit to finish of recent jobs
+        """
+        with self._condition:
+            latencies = list(self._latencies)
+            return {"queue_depth": len(self._jobs),
+                    "running": self._running,
+                    **self._counts,
+                    "mean_latency_ms": round(1000 * sum(latencies) / len(latencies), 1) if latencies else None,
+                    "max_latency_ms": round(1000 * max(latencies), 1) if latencies else None}
+
+    def join(self, timeout=None) -> bool:
+        """
+        Wait for every queued job to finish
+
+        :return: True if the queue emptied within the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._jobs and not self._running, timeout)
+
+    def stop(self, timeout=None):
+        """
+        Finish the queued jobs then stop the thread
+        """
+        self.join(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs or self._stopped)
+                if not self._jobs:
+                    return  # stopped
+                _, (function, args, kwargs, submitted_time) = self._jobs.popitem(last=False)
+                self._running = True
+
+            succeeded = True
+            try:
+                function(*args, **kwargs)
+            except Exception as e:
+                succeeded = False
+                print(f"Snapshot job {getattr(function, '__name__', function)} failed with exception: {e}")
+                traceback.print_exc()
+
+            with self._condition:
+                self._running = False
+                self._counts["completed" if succeeded else "failed"] += 1
+                self._latencies.append(time.monotonic() - submitted_time)
+                self._condition.notify_all()
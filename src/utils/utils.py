@@ -1,13 +1,19 @@
+from __future__ import annotations
+
 import datetime
 import datetime as dt
 import math
 import os
+import threading
 import time
 from enum import Enum
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 """
 HELPER FUNCTIONS
 
@@ -53,13 +59,55 @@ epoch_to_date_ms = lambda epoch: datetime.datetime.fromtimestamp(epoch / 1000).s
 
 epoch_to_minutes = lambda epoch: int(epoch_to_date(epoch)[-5:-3])
 
-format_markdown = lambda markdown_table: "```\n" + markdown_table.to_markdown() + "\n```"
+
+def epoch_to_datetime_index(epochs) -> pd.DatetimeIndex:
+    """
+    Vectorized epoch_to_date for arrays of epochs (3 d.p), as local times
+    Important: Will round 14:03:59 > 14:04:00 for graph readability, like epoch_to_date
+
+    :param epochs: array of epochs with 3 d.p e.g. Candlesticks.closeTime
+    :return: DatetimeIndex of local times to the second
+    """
+    import pandas as pd
+
+    seconds = -(-np.asarray(epochs, dtype=np.int64) // 1000)  # integer ceil
+    # the local UTC offset only changes on a quarter hour, so it is looked up once per quarter hour
+    quarter_hours, quarter_hour_of_each = np.unique(seconds // 900, return_inverse=True)
+    offsets = np.array([time.localtime(quarter_hour * 900).tm_gmtoff for quarter_hour in quarter_hours.tolist()],
+                       dtype=np.int64)
+    return pd.DatetimeIndex((seconds + offsets[quarter_hour_of_each]).astype('datetime64[s]'))
+
+
+def format_markdown(markdown_table) -> str:
+    """
+    Table as a markdown code block, plain text when the optional tabulate package is not installed
+    """
+    try:
+        table = markdown_table.to_markdown()
+    except ImportError:
+        table = markdown_table.to_string()
+    return "```\n" + table + "\n```"
+
 
 add_spacing = lambda text: f"\n{text}\n"
 
 one_minute_as_epoch = 60 * 1000
 
 
+def timeframe_to_epoch(timeframe):
+    """
+    Length of a candle interval in epoch milliseconds
+
+    :param timeframe: the interval of candlestick, e.g 1s, 1m, 15m, 1h, 1d, 1w
+    :return: int milliseconds
+    """
+    unit_as_epoch = {"s": 1000, "m": one_minute_as_epoch, "h": 60 * one_minute_as_epoch,
+                     "d": 24 * 60 * one_minute_as_epoch, "w": 7 * 24 * 60 * one_minute_as_epoch}
+    if timeframe[-1:] not in unit_as_epoch or not timeframe[:-1].isdigit():
+        raise Exception(f"Timeframe '{timeframe}' is not supported yet!")
+    return int(timeframe[:-1]) * unit_as_epoch[timeframe[-1]]
+
+
 def enum_equality_check(original, other):
     if other is None:
         return False
@@ -107,7 +155,57 @@ def round_down_to_decimal_place(input_float, decimal_points):
     return ((input_float * 10 ** decimal_points) // 1) / decimal_to_int_factor
 
 
-def create_image_from_dataframe(df, file_path, name):
+MAX_PRICE_DECIMALS = 8  # Binance prices and quantities have at most 8 decimal places
+
+
+def price_decimals(values) -> int | None:
+    """
+    Fewest decimal places the prices are written to, so they can be summed exactly as integer ticks of 10^-decimals
+
+    :param values: array of prices e.g. Candlesticks.close
+    :return: decimal places, at most MAX_PRICE_DECIMALS, None if the prices have more e.g. computed prices
+    """
+    values = np.asarray(values, dtype=np.float64)
+    for decimals in range(MAX_PRICE_DECIMALS + 1):
+        scaled = values * 10 ** decimals
+        if np.all(np.abs(scaled - np.rint(scaled)) <= 1e-6 + np.abs(scaled) * 1e-12):
+            return decimals
+    return None
+
+
+def min_max_decimation(values, max_points) -> np.ndarray:
+    """
+    Positions of the lowest and highest value in each of max_points / 2 equal buckets, plus the first and last.
+    Plotting only these keeps every peak and trough of a line at a fraction of the points.
+
+    :param values: array of values to plot
+    :param max_points: Roughly the maximum number of positions returned
+    :return: sorted array of positions
+    """
+    length = len(values)
+    if length <= max_points:
+        return np.arange(length)
+    buckets = max(1, max_points // 2)
+    bucket_size = -(-length // buckets)
+    padded = np.pad(values, (0, buckets * bucket_size - length), mode='edge').reshape(buckets, bucket_size)
+    bucket_starts = np.arange(buckets) * bucket_size
+    positions = np.concatenate(([0, length - 1],
+                                bucket_starts + padded.argmin(axis=1),
+                                bucket_starts + padded.argmax(axis=1)))
+    return np.unique(np.minimum(positions, length - 1))
+
+
+plot_lock = threading.Lock()  # pyplot state is global, so figures are drawn one thread at a time
+
+
+def create_image_from_dataframe(df, file_path, name, dpi=500):
+    with plot_lock:
+        _draw_dataframe_image(df, file_path, name, dpi)
+
+
+def _draw_dataframe_image(df, file_path, name, dpi):
+    import matplotlib.pyplot as plt
+
     fig_background_color = 'lightgrey'
     fig_border = 'black'
 
@@ -143,8 +241,9 @@ def create_image_from_dataframe(df, file_path, name):
     plt.savefig(file_path,
                 edgecolor=fig.get_edgecolor(),
                 facecolor=fig.get_facecolor(),
-                dpi=500
+                dpi=dpi
                 )
+    plt.close()
     print(add_spacing(f"Saved image to {file_path}"))
 
 